@@ -28,6 +28,8 @@ setup(
     "sympy>=1",
     "matplotlib>=3"
     ],  
+    # optimize, dynamics and limit need scipy; modal, foundation and pdelta use its sparse solvers if present
+    extras_require={"analysis": ["scipy>=1.6"]},
     project_urls={  
         "Source": "https://github.com/Ashim-Paudel/Python-Beam-Analysis",
         "Bug Reports": "https://github.com/Ashim-Paudel/Python-Beam-Analysis/issues",
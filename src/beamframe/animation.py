@@ -0,0 +1,173 @@
+"""
+Module for animated shear force and bending moment diagrams under a moving vehicle
+
+All frames are computed up front in one vectorised batch (`UnitResponse.respond`), the figure is laid
+out once like `Beam.generate_graph`, and every frame only changes the data of the diagram lines and axle
+markers (blitting): the static background is rendered once and restored for every frame. GIF files are
+written with Pillow (which keeps the palette frames until the file is written); MP4 frames are piped to
+`ffmpeg` one by one, which must be on the path.
+
+#### Example
+```
+b = Beam(20)
+supports = (Reaction(0, 'h', 'A'), Reaction(20, 'r', 'B'))
+anim = MovingLoadAnimation(b, supports, offsets=(0, 3, 4.5), weights=(50, 100, 100))
+anim.save('crossing.gif', fps=25)
+```
+"""
+import subprocess
+
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib import animation
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from .monitoring import UnitResponse
+
+
+class MovingLoadAnimation:
+    """
+    ## Description
+    Animation of SFD and/or BMD while a train of axle loads crosses the beam.
+
+    ### Arguments
+    - `beam` = `Beam` object
+    - `supports` = List or tuple of `Reaction` (and optional `Hinge`) objects
+    - `offsets` = Distance of every axle behind the leading axle
+    - `weights` = Axle weights acting downward
+    - `positions = None` = Position of leading axle in every frame. Default is 100 frames from entering to leaving the beam.
+    - `ndivs:int = None` = Stations per diagram, default `beam.ndivs`
+    - `which:str = 'both'` = `'sfd'`, `'bmd'` or `'both'` (as in `Beam.generate_graph`)
+
+    ### Attributes
+    - `x` = Stations
+    - `shear, moment` = Arrays of shape `(n_frames, len(x))`
+    - `axles` = Axle positions of shape `(n_frames, n_axles)`
+    """
+
+    def __init__(self, beam: object, supports: object, offsets: object, weights: object, positions: object = None,
+                 ndivs: int = None, which: str = 'both'):
+        if which.lower() not in ('sfd', 'bmd', 'both'):
+            raise ValueError(f"Unexpected graph type {which}")
+        self.beam = beam
+        self.which = which.lower()
+        offsets = np.atleast_1d(np.asarray(offsets, dtype=float))
+        weights = np.broadcast_to(np.asarray(weights, dtype=float), offsets.shape)
+        if positions is None:
+            positions = np.linspace(0, beam.length + offsets.max(), 100)
+        positions = np.atleast_1d(np.asarray(positions, dtype=float))
+
+        self.x = np.linspace(0, beam.length, ndivs or beam.ndivs)
+        response = UnitResponse(beam, supports, self.x)
+        self.axles = positions[:, None] - offsets[None, :]
+        self.shear, self.moment = response.respond(self.axles, np.broadcast_to(weights, self.axles.shape))
+
+    def __len__(self):
+        return len(self.axles)
+
+    def figure(self, dpi: int = 100):
+        """
+        ### Description
+        Creates the static part of the figure (titles, axes, limits, beam line) once.
+        Returns tuple `(fig, artists)` where `artists` are the animated lines and markers.
+        """
+        plt.rc('font', family='serif', size=12)
+        panels = {'sfd': ("SFD", "Shear Force (kN)", self.shear, 'orange'),
+                  'bmd': ("BMD", "Bending Moment (kNm)", self.moment, 'green')}
+        names = ('sfd', 'bmd') if self.which == 'both' else (self.which,)
+        fig, axs = plt.subplots(nrows=len(names), ncols=1, figsize=(10, 5*len(names)), sharex=True,
+                                edgecolor='w', facecolor='w', dpi=dpi, squeeze=False)
+        if self.which == 'both':
+            fig.suptitle("Comparison of BMD and SFD")
+
+        self._lines, self._markers = [], []
+        for ax, name in zip(axs[:, 0], names):
+            title, ylabel, values, color = panels[name]
+            ax.set_title(title)
+            ax.set_ylabel(ylabel)
+            ax.set_xlim(-0.5, self.beam.length+0.5)
+            low, high = min(values.min(), 0), max(values.max(), 0)
+            margin = 0.1*(high - low) or 1.0
+            ax.set_ylim(low - margin, high + margin)
+            ax.axhline(y=0, linewidth=3, color='k')
+            ax.grid(linewidth=1, color='gainsboro')
+            line, = ax.plot([], [], color=color, animated=True)
+            marker, = ax.plot([], [], 'v', color='k', ms=8, animated=True)
+            self._lines.append((line, values))
+            self._markers.append(marker)
+        axs[-1, 0].set_xlabel("x (m)")
+        return fig, [line for (line, _) in self._lines] + self._markers
+
+    def _update(self, i: int):
+        for (line, values) in self._lines:
+            line.set_data(self.x, values[i])
+        axles = self.axles[i]
+        axles = axles[(axles >= 0) & (axles <= self.beam.length)]
+        for marker in self._markers:
+            marker.set_data(axles, np.zeros_like(axles))
+        return [line for (line, _) in self._lines] + self._markers
+
+    def animate(self, fps: float = 20, dpi: int = 100):
+        """Returns `matplotlib.animation.FuncAnimation` (blitted) e.g. for display in a notebook"""
+        fig, artists = self.figure(dpi)
+
+        def init():
+            for artist in artists:
+                artist.set_data([], [])
+            return artists
+
+        return animation.FuncAnimation(fig, self._update, frames=len(self), init_func=init,
+                                       interval=1000/fps, blit=True)
+
+    def frames(self, dpi: int = 100):
+        """
+        ### Description
+        Generator of rendered frames as RGBA arrays of shape `(height, width, 4)` (copies of the canvas,
+        so frames can be kept). The static background is drawn once; each frame restores it and draws only the animated artists.
+        """
+        fig, _ = self.figure(dpi)
+        canvas = FigureCanvasAgg(fig)
+        canvas.draw()
+        background = canvas.copy_from_bbox(fig.bbox)
+        try:
+            for i in range(len(self)):
+                canvas.restore_region(background)
+                for artist in self._update(i):
+                    artist.axes.draw_artist(artist)
+                yield np.array(canvas.buffer_rgba())
+        finally:
+            plt.close(fig)
+
+    def save(self, filename: str, fps: float = 20, dpi: int = 100):
+        """
+        ### Description
+        Writes all frames to a `.gif` (Pillow) or `.mp4` (piped to ffmpeg) file.
+        """
+        extension = str(filename).rsplit('.', 1)[-1].lower()
+        if extension == 'gif':
+            from PIL import Image
+            frames = self.frames(dpi)
+            # one palette for all frames (colours of the static layout and the lines do not change)
+            first = Image.fromarray(next(frames)).convert('RGB').quantize(colors=255)
+            images = (Image.fromarray(frame).convert('RGB').quantize(palette=first, dither=Image.Dither.NONE)
+                      for frame in frames)
+            first.save(filename, save_all=True, append_images=images, duration=1000/fps, loop=0, optimize=False)
+        elif extension == 'mp4':
+            if not animation.writers.is_available('ffmpeg'):
+                raise ValueError("Writing mp4 requires ffmpeg. Use a .gif file name instead")
+            frames = self.frames(dpi)
+            first = next(frames)
+            height, width = first.shape[:2]
+            command = [mpl.rcParams['animation.ffmpeg_path'], '-y', '-loglevel', 'error', '-f', 'rawvideo',
+                       '-pix_fmt', 'rgba', '-s', f'{width}x{height}', '-r', str(fps), '-i', '-',
+                       '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-pix_fmt', 'yuv420p', str(filename)]
+            with subprocess.Popen(command, stdin=subprocess.PIPE) as proc:
+                proc.stdin.write(first.tobytes())
+                for frame in frames:
+                    proc.stdin.write(frame.tobytes())
+                proc.stdin.close()
+            if proc.returncode:
+                raise RuntimeError(f"ffmpeg failed with exit code {proc.returncode}")
+        else:
+            raise ValueError(f"Unknown animation format {extension}\n Supported formats are: ('gif', 'mp4')")
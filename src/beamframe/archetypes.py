@@ -0,0 +1,176 @@
+"""
+Module for closed form solutions of the standard support arrangements
+
+Most beams are simply supported, overhanging, cantilevered or propped. For these the reactions have
+textbook closed forms in two sums over the loads, `S0 = sum(F)` and `S1 = sum(F*x) + sum(C)` (resultants
+and their moments about the origin), and the diagrams are sums of Macaulay terms `c*<x - a>**n`:
+
+- two supports `a < b` without moment restraint: `R_b = (a*S0 - S1)/(b - a)`, `R_a = -S0 - R_b`
+- one fixed support at `p` (cantilever): `R = -S0`, `M = p*S0 - S1`
+- fixed end and a roller at `r` (propped cantilever, uniform `EI`): the tip deflection of the released
+    cantilever, `sum(c*<r - a>**(n + 2)/((n + 1)*(n + 2)))`, must vanish, which gives
+    `R_r = -3*(D - S0*r**3/6 + S1*r**2/2)/r**3` (a fixed right end is mirrored to the left)
+
+`closed_form_solve` recognises these from the `Reaction` objects and evaluates everything in a few numpy
+operations; the sympy expressions `shear_fn` and `mom_fn` are only built if they are accessed.
+`Beam.fast_solve` tries it first (propped beams only for uniform `E` and `I`) and falls back to the general
+(symbolic) path for anything else, e.g. internal hinges.
+
+#### Example
+```
+b = Beam(8)
+elements = (Reaction(0, 'f', 'A'), Reaction(8, 'r', 'B'), UDL(0, 10, 8))
+archetype(8, elements)                  # 'propped'
+closed_form_solve(b, elements)          # elements[1].ry_val == 30 (3wL/8)
+```
+"""
+import numpy as np
+
+from .beam import UDL, UVL, PointLoad, PointMoment, Reaction
+
+ARCHETYPES = ('simply_supported', 'overhanging', 'cantilever', 'propped')
+
+
+def archetype(length: float, elements: object):
+    """
+    ### Description
+    Name of the support arrangement of `elements` (one of `ARCHETYPES`), or `None` if it has no closed form
+    here (internal hinges, unknown elements, other supports).
+
+    - `'simply_supported'` = Two supports without moment restraint at both ends
+    - `'overhanging'` = Two supports without moment restraint, at least one inside the span
+    - `'cantilever'` = One fixed support
+    - `'propped'` = Fixed support at one end and a roller elsewhere (statically indeterminate)
+    """
+    if not all(isinstance(e, (Reaction, PointLoad, UDL, UVL, PointMoment)) for e in elements):
+        return None
+    rxns = [e for e in elements if isinstance(e, Reaction)]
+    types = sorted(r.type for r in rxns)
+    if types == ['fixed']:
+        return 'cantilever'
+    if len(rxns) != 2 or rxns[0].pos == rxns[1].pos:
+        return None
+    if 'fixed' not in types:
+        ends = {float(r.pos) for r in rxns} == {0.0, float(length)}
+        return 'simply_supported' if ends else 'overhanging'
+    if types == ['fixed', 'roller']:
+        fixed = rxns[0] if rxns[0].type == 'fixed' else rxns[1]
+        if fixed.pos in (0, length):
+            return 'propped'
+    return None
+
+
+def _loads(elements, length, mirror):
+    """Macaulay terms `(c, a, n)` of moment due to the loads, and their resultant `S0` and moment `S1`"""
+    terms, S0, S1 = [], 0.0, 0.0
+    for e in elements:
+        if isinstance(e, PointLoad):
+            pos = length - e.pos if mirror else e.pos
+            terms.append((e.load_y, pos, 1))
+            S0, S1 = S0 + e.load_y, S1 + e.load_y*pos
+        elif isinstance(e, PointMoment):
+            pos, mom = (length - e.pos, -e.mom) if mirror else (e.pos, e.mom)
+            terms.append((-mom, pos, 0))
+            S1 += mom
+        elif isinstance(e, (UDL, UVL)):
+            w0, w1 = (e.loadpm, e.loadpm) if isinstance(e, UDL) else (e.startload, e.endload)
+            start, end = e.start, e.end
+            if mirror:
+                start, end, w0, w1 = length - end, length - start, w1, w0
+            grad = (w1 - w0)/(end - start) if end != start else 0.0
+            terms += [(w0/2, start, 2), (grad/6, start, 3), (-w1/2, end, 2), (-grad/6, end, 3)]
+            force = (w0 + w1)*(end - start)/2
+            S0 += force
+            # moment of a trapezoid about its start: w0*s**2/2 + (w1 - w0)*s**2/3
+            S1 += force*start + (end - start)**2*(w0/2 + (w1 - w0)/3)
+    c, a, n = (np.array(v, dtype=float) for v in zip(*terms)) if terms else (np.zeros(0),)*3
+    return c, a, n, S0, S1
+
+
+def _macaulay(x, c, a, n, derivative=0):
+    """`sum(c*d^k/dx^k <x - a>**n)` at every `x`; a derivative of a step (`n = 0`) is dropped"""
+    arm = np.asarray(x, dtype=float)[:, None] - a
+    if derivative:
+        c, n = c*n, n - 1
+        keep = n >= 0
+        arm, c, n = arm[:, keep], c[keep], n[keep]
+    return ((arm >= 0)*np.abs(arm)**n*c).sum(axis=1)
+
+
+def closed_form_reactions(length: float, elements: object):
+    """
+    ### Description
+    Reactions of a recognised arrangement (see `archetype`) from the closed forms.
+
+    Returns tuple `(name, rx, ry, mom)` with one value per `Reaction` in order, or `None` if not recognised.
+    The first `'hinge'` or `'fixed'` support resists horizontal load, as in `BeamArrays.solve_reactions`.
+    """
+    name = archetype(length, elements)
+    if name is None:
+        return None
+    rxns = [e for e in elements if isinstance(e, Reaction)]
+    ry, mom = np.zeros(len(rxns)), np.zeros(len(rxns))
+
+    if name == 'propped':
+        f, r = (0, 1) if rxns[0].type == 'fixed' else (1, 0)
+        mirror = rxns[f].pos != 0
+        c, a, n, S0, S1 = _loads(elements, length, mirror)
+        p = length - rxns[r].pos if mirror else rxns[r].pos
+        D = (c*np.maximum(p - a, 0)**(n + 2)/((n + 1)*(n + 2))).sum()
+        ry[r] = -3*(D - S0*p**3/6 + S1*p**2/2)/p**3
+        ry[f] = -S0 - ry[r]
+        mom[f] = -S1 - p*ry[r]
+        if mirror:
+            mom[f] = -mom[f]
+    else:
+        _, _, _, S0, S1 = _loads(elements, length, False)
+        if name == 'cantilever':
+            ry[0], mom[0] = -S0, rxns[0].pos*S0 - S1
+        else:
+            pa, pb = rxns[0].pos, rxns[1].pos
+            ry[1] = (pa*S0 - S1)/(pb - pa)
+            ry[0] = -S0 - ry[1]
+
+    rx = np.zeros(len(rxns))
+    restrained = [i for i, e in enumerate(rxns) if e.type != 'roller']
+    if restrained:
+        rx[restrained[0]] = -sum(e.load_x for e in elements if isinstance(e, PointLoad))
+    return name, rx, ry, mom
+
+
+def closed_form_solve(beam: object, loads_list: object):
+    """
+    ### Description
+    Same results as `Beam.fast_solve` from closed forms, for the arrangements recognised by `archetype`:
+    sets `rx_val, ry_val, mom_val` of the `Reaction` objects and `reactions_list`, `solved_rxns`,
+    `shear_values`, `moment_values` of `beam` (over `beam.xbeam`). The symbolic `shear_fn` and `mom_fn`
+    are built from the solved reactions when first accessed. A `'propped'` beam is solved for uniform `EI`.
+
+    #### Arguments
+    - `beam` = `Beam` object
+    - `loads_list` = List (or tuple) of beam objects like Reactions, Loads, Moments
+
+    Returns the name of the archetype, or `None` (and nothing is changed) if it is not recognised
+    """
+    solved = closed_form_reactions(beam.length, loads_list)
+    if solved is None:
+        return None
+    name, rx, ry, mom = solved
+    rxns = [e for e in loads_list if isinstance(e, Reaction)]
+    beam.solved_rxns = {}
+    for r, values in zip(rxns, zip(rx, ry, mom)):
+        for (var, val), value in zip((('rx_var', 'rx_val'), ('ry_var', 'ry_val'), ('mom_var', 'mom_val')), values):
+            if hasattr(r, var):
+                setattr(r, val, float(value))
+                beam.solved_rxns[getattr(r, var)] = float(value)
+    beam.reactions_list = rxns
+    beam._defer_equations(loads_list)
+
+    c, a, n, _, _ = _loads(loads_list, beam.length, False)
+    pos = np.array([r.pos for r in rxns], dtype=float)
+    c = np.concatenate([c, ry, -mom])
+    a = np.concatenate([a, pos, pos])
+    n = np.concatenate([n, np.ones(len(rxns)), np.zeros(len(rxns))])
+    beam.moment_values = _macaulay(beam.xbeam, c, a, n)
+    beam.shear_values = _macaulay(beam.xbeam, c, a, n, derivative=1)
+    return name
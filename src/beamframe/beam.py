@@ -1,3 +1,4 @@
+import copy
 import os
 
 import __main__
@@ -5,6 +6,7 @@ import matplotlib.pyplot as plt
 import numpy as np
 import sympy as sp
 
+from .decimate import axes_width, minmax_decimate
 from .SingularityFunction import SingularityFunction
 
 """
@@ -38,6 +40,9 @@ class Beam:
         `kwargs`: Here are few optional keyword arguments
         - `E(float)` = Modulus of Elasticity of beam material 
         - `I(float)` = 2nd moment of area of the cross section of beam
+        - `mass(float)` = Mass per unit length of beam (kg/m), needed for `modal.modal_analysis`
+        - `foundation` = Modulus of an elastic (Winkler) foundation in kN/m per m of length, a number, array or
+            function of x, used by `foundation.foundation_solve`
 
         #### Example
         ```
@@ -58,8 +63,11 @@ class Beam:
         self.beam_0 = np.argwhere(self.xbeam >= 0)[0][0]
 
         # modulus of elasticity of the material
-        self.E = kwargs.get('E') or kwargs.get('Elasticity')
-        self.I = kwargs.get('I') or kwargs.get('MOA')  # second moment of area
+        # E and I may be arrays or functions of x (non-prismatic beams), so no truth testing here
+        self.E = kwargs['E'] if kwargs.get('E') is not None else kwargs.get('Elasticity')
+        self.I = kwargs['I'] if kwargs.get('I') is not None else kwargs.get('MOA')  # second moment of area
+        self.mass = kwargs.get('mass')  # mass per length (kg/m)
+        self.foundation = kwargs.get('foundation')  # modulus of elastic foundation (kN/m per m)
 
         self.supports = kwargs.get('supports')
         # self.reactions
@@ -78,16 +86,50 @@ class Beam:
         # initialize variable to store all support reactions in that beam
         self.reactions_list = []
         self.solved_rxns = None  # initialize variable to store solved values for reactions
+        self._deferred_equations = None  # loads of a closed form solution whose equations are not built yet
         self.mom_fn = 0  # initialize variable to store bending moment values in numpy array
         self.shear_fn = 0  # initialize variable to store shear values in numpy array
 
         # this variables will hold numpy array of shear and moment values
         self.shear_values = None
         self.moment_values = None
+        self.deflection_values = None  # set by solvers which compute deflection
 
         self.max_bm, self.posx_maxbm, self.min_bm, self.posx_minbm = 0.0, 0.0, 0.0, 0.0
         self.max_sf, self.posx_maxsf, self.min_sf, self.posx_minsf = 0.0, 0.0, 0.0, 0.0
 
+    @property
+    def shear_fn(self):
+        """Macaulay expression of shear force (after a closed form solution it is built on first access)"""
+        self._build_deferred_equations()
+        return self._shear_fn
+
+    @shear_fn.setter
+    def shear_fn(self, value):
+        self._shear_fn = value
+
+    @property
+    def mom_fn(self):
+        """Macaulay expression of bending moment (after a closed form solution it is built on first access)"""
+        self._build_deferred_equations()
+        return self._mom_fn
+
+    @mom_fn.setter
+    def mom_fn(self, value):
+        self._mom_fn = value
+
+    def _defer_equations(self, loads_list: object):
+        """Builds `shear_fn` and `mom_fn` of a numeric solution on first access, from copies of the elements
+        as solved now (the same `Reaction` objects may be solved again for another beam meanwhile)"""
+        self._deferred_equations = [copy.copy(e) for e in loads_list]
+
+    def _build_deferred_equations(self):
+        loads, self._deferred_equations = self._deferred_equations, None
+        if loads is not None:
+            self._shear_fn, self._mom_fn = 0, 0
+            self.generate_shear_equation(loads)
+            self.generate_moment_equation(loads)
+
     def add_loads(self, load_list: object):
         """
         ### Description:
@@ -417,7 +459,7 @@ class Beam:
         self.max_sf, self.posx_maxsf, self.min_sf, self.posx_minsf = np.max(self.shear_values), self.xbeam[np.argmax(
             self.shear_values)], np.min(self.shear_values), self.xbeam[np.argmin(self.shear_values)]
 
-    def fast_solve(self, loads_list: object, n: int = 1000):
+    def fast_solve(self, loads_list: object, n: int = 1000, closed_form: bool = True):
         """
         ### Description
         This function will:
@@ -427,10 +469,27 @@ class Beam:
         4. generate shear force values (can be accessed by `shear_values`)
         5. generate bending moment values (can be accessed by `moment_values`)
 
+        Simply supported, overhanging, cantilever and propped beams are solved from closed forms instead
+        (`archetypes.closed_form_solve`); their `shear_fn` and `mom_fn` are built on first access.
+
         #### Arguments
         - `loads_list` = List (or tuple) of every possible beam objects like Reactions, Loads, Moments, Internal Hinge
         - `n:int = 1000` = Number of shear and moment values to create
+        - `closed_form:bool = True` = Use the closed forms for the standard support arrangements
+
+        Raises `ValueError` before any solving if the beam is statically indeterminate or unstable,
+        except a propped cantilever of uniform `E` and `I` (solved by its closed form)
         """
+        from .archetypes import archetype, closed_form_solve
+        from .stability import require_determinate
+        name = archetype(self.length, loads_list) if closed_form else None
+        uniform = not any(callable(v) or np.ndim(v) for v in (self.E, self.I))
+        if name != 'propped' or not uniform:
+            require_determinate(self.length, loads_list)
+        if name is not None and (name != 'propped' or uniform):
+            closed_form_solve(self, loads_list)
+            return
+
         hin = None
         rxns = [rxn for rxn in loads_list if isinstance(rxn, Reaction)]
         for obj in loads_list:
@@ -456,10 +515,13 @@ class Beam:
         - `save_fig:bool` = To specify whether or not to save the generated image locally
         - `filename:str` = Name of file or file path to specify the location to save the generated image
         - `extension: str = 'png' ` = File extension to save the generate image. Supported extensions are ` ('png', 'pdf', 'eps', 'svg')`. By default `png`.
+            For exact vector diagrams (lines and Bezier curves instead of samples) see `vector.export_diagrams`.
         - `details: bool` = To specify whether or not to show salient features in graph like contraflexure, inflexion
         - `res: str = 'low'` = Resolution of graph to be shown or saved.
         - `show_graph: bool = True` Whether or not to show the generate graph.
             - Note: Don't use res(values other than low) and `show_graph=True` together. It will create render error.
+        - `decimate: bool = True` = Plot only a few points per pixel column (peaks and jumps are kept exactly).
+            Makes rendering time and file size independent of `ndivs`.
         """
         # Rc parameters:
         plt.rc('font', family='serif', size=12)
@@ -486,12 +548,14 @@ class Beam:
             raise ValueError(
                 f"Unknown image extension {extension}\n Supported extensions are: {formats}")
 
+        decimate = kwargs.get('decimate', True)
+
         # (y,x) in matplotib graph for maximum bending moment
 
         if which == 'bmd':
             fig, ax = plt.subplots(
                 facecolor='w', edgecolor='w', num="Bending Moment Diagram", dpi=DPI)
-            ax.plot(self.xbeam, self.moment_values,
+            ax.plot(*self._plot_data(ax, self.moment_values, decimate),
                     color='orange', label="BMD")
             ax.set_xticks(range(0, self.length+1, 1))
             ax.set_xlim(-0.5, self.length+0.5)
@@ -521,7 +585,7 @@ class Beam:
         if which == 'sfd':
             fig, ax = plt.subplots(
                 facecolor='w', edgecolor='w', num="Shear Force Diagram", dpi=DPI)
-            ax.plot(self.xbeam, self.shear_values, color='orange', label="SFD")
+            ax.plot(*self._plot_data(ax, self.shear_values, decimate), color='orange', label="SFD")
             ax.set_xticks(range(0, self.length+1, 1))
             ax.set_xlim(-0.5, self.length+0.5)
             ax.axhline(y=0, linewidth=3, color='k', label='Beam')
@@ -547,10 +611,10 @@ class Beam:
         if which == 'both':
             fig, axs = plt.subplots(nrows=2, ncols=1, figsize=(
                 10, 10), edgecolor='w', facecolor='w', sharex=True, num="SFD vs BMD", dpi=DPI)
-            axs[0].plot(self.xbeam, self.shear_values, color='orange')
+            axs[0].plot(*self._plot_data(axs[0], self.shear_values, decimate), color='orange')
             axs[0].set_title("SFD")
             axs[0].set_ylabel("Shear Force (kN)")
-            axs[1].plot(self.xbeam, self.moment_values, color='green')
+            axs[1].plot(*self._plot_data(axs[1], self.moment_values, decimate), color='green')
             axs[1].set_xticks(range(0, self.length+1, 1))
             axs[1].set_title("BMD")
             axs[1].set_xlabel("x (m)")
@@ -613,6 +677,12 @@ class Beam:
         if show_graph:
             plt.show()
 
+    def _plot_data(self, ax, values, decimate: bool = True):
+        """`xbeam` and `values` reduced to a few points per pixel column of `ax` (see `decimate.py`)"""
+        if not decimate:
+            return self.xbeam, values
+        return minmax_decimate(self.xbeam, values, axes_width(ax))
+
     def save_data(self, fname: str, fformat: str = 'txt'):
         """
         ### Description
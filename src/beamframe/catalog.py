@@ -0,0 +1,202 @@
+"""
+Module for section catalogs and selection of the lightest adequate member
+
+A catalog stores section properties as arrays (one entry per section), so the bending, shear and
+deflection checks of every section are a single broadcasted numpy expression instead of one `Beam`
+per candidate. Deflection is linear in `1/(E*I)`, so `EI*y` is computed once for the loads and scaled.
+
+Units follow the rest of the library: m, kN, kN/m² (and kg/m for mass).
+
+#### Example
+```
+b = Beam(6)
+elements = (Reaction(0, 'h', 'A'), Reaction(6, 'r', 'B'), UDL(0, 20, 6))
+result = select_section(steel_ipe(), **demands(b, elements))
+result.name, result.utilization['bending']
+```
+"""
+import numpy as np
+
+from .section import ISection, Rectangle
+from .superposition import BeamArrays
+
+# IPE sections: name, depth, flange width, web thickness, flange thickness (mm)
+IPE_DIMENSIONS = (
+    ('IPE80', 80, 46, 3.8, 5.2), ('IPE100', 100, 55, 4.1, 5.7), ('IPE120', 120, 64, 4.4, 6.3),
+    ('IPE140', 140, 73, 4.7, 6.9), ('IPE160', 160, 82, 5.0, 7.4), ('IPE180', 180, 91, 5.3, 8.0),
+    ('IPE200', 200, 100, 5.6, 8.5), ('IPE220', 220, 110, 5.9, 9.2), ('IPE240', 240, 120, 6.2, 9.8),
+    ('IPE270', 270, 135, 6.6, 10.2), ('IPE300', 300, 150, 7.1, 10.7), ('IPE330', 330, 160, 7.5, 11.5),
+    ('IPE360', 360, 170, 8.0, 12.7), ('IPE400', 400, 180, 8.6, 13.5), ('IPE450', 450, 190, 9.4, 14.6),
+    ('IPE500', 500, 200, 10.2, 16.0), ('IPE550', 550, 210, 11.1, 17.2), ('IPE600', 600, 220, 12.0, 19.0),
+)
+
+# common sawn timber sizes (mm)
+TIMBER_WIDTHS = (38, 47, 63, 75, 100)
+TIMBER_DEPTHS = (75, 100, 125, 150, 175, 200, 225, 250, 275, 300)
+
+
+class SectionCatalog:
+    """
+    ## Description
+    Table of sections of one material.
+
+    ### Arguments
+    - `names` = Name of every section
+    - `area, I, Z` = Area (m²), second moment of area (m⁴) and smaller elastic section modulus (m³)
+    - `shear_area` = Area such that maximum shear stress is `V/shear_area` (m²)
+    - `mass` = Mass per length (kg/m)
+    - `E:float` = Modulus of elasticity (kN/m²)
+    - `bending_strength:float`, `shear_strength:float` = Allowable stresses (kN/m²)
+    - `material:str = ''`
+    """
+
+    def __init__(self, names, area, I, Z, shear_area, mass, E: float, bending_strength: float,
+                 shear_strength: float, material: str = ''):
+        self.names = np.asarray(names)
+        self.area, self.I, self.Z, self.shear_area, self.mass = (
+            np.asarray(v, dtype=float) for v in (area, I, Z, shear_area, mass))
+        if len(set(len(v) for v in (self.names, self.area, self.I, self.Z, self.shear_area, self.mass))) != 1:
+            raise ValueError("All section properties must have one value per section")
+        self.E = E
+        self.bending_strength = bending_strength
+        self.shear_strength = shear_strength
+        self.material = material
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def from_sections(cls, names, sections, density: float, **kwargs):
+        """
+        ### Description
+        Catalog from `Section` objects of `section.py`. Maximum shear stress is taken at the centroid
+        (`shear_area = I*t/Q`). `kwargs` are `E, bending_strength, shear_strength, material`.
+
+        #### Arguments
+        - `density:float` = kg/m³
+        """
+        area = np.array([s.area for s in sections])
+        I = np.array([s.I for s in sections])
+        Z = np.array([min(s.Z_top, s.Z_bottom) for s in sections])
+        shear_area = np.array([s.I*s.width_at(s.centroid)/s.Q(s.centroid) for s in sections])
+        return cls(names, area, I, Z, shear_area, density*area, **kwargs)
+
+    def to_records(self):
+        """Numpy structured array with one row per section"""
+        return np.rec.fromarrays([self.names, self.area, self.I, self.Z, self.shear_area, self.mass],
+                                 names=['name', 'area', 'I', 'Z', 'shear_area', 'mass'])
+
+
+def steel_ipe(E: float = 200e6, bending_strength: float = 165e3, shear_strength: float = 100e3):
+    """
+    ### Description
+    European IPE sections (S275, allowable stresses about `0.66 fy` and `0.4 fy`).
+    Properties are computed from plate dimensions; root radii are neglected, which is slightly conservative.
+    """
+    sections = [ISection(h/1000, b/1000, tf/1000, tw/1000) for (_, h, b, tw, tf) in IPE_DIMENSIONS]
+    return SectionCatalog.from_sections([d[0] for d in IPE_DIMENSIONS], sections, 7850, E=E,
+                                        bending_strength=bending_strength, shear_strength=shear_strength,
+                                        material='steel')
+
+
+def timber_rectangles(widths=TIMBER_WIDTHS, depths=TIMBER_DEPTHS, E: float = 11e6, bending_strength: float = 24e3,
+                      shear_strength: float = 4e3, density: float = 420):
+    """
+    ### Description
+    Rectangular sawn timber sections of all `widths` x `depths` (mm), strength class C24 values by default.
+    """
+    sizes = [(w, d) for w in widths for d in depths]
+    return SectionCatalog.from_sections([f"{w}x{d}" for (w, d) in sizes],
+                                        [Rectangle(w/1000, d/1000) for (w, d) in sizes], density, E=E,
+                                        bending_strength=bending_strength, shear_strength=shear_strength,
+                                        material='timber')
+
+
+def demands(beam: object = None, elements: object = None, envelope: object = None, ndivs: int = 1001):
+    """
+    ### Description
+    Peak absolute moment, shear and `EI*y` to be passed to `select_section`.
+
+    #### Arguments
+    - `beam` = `Beam` object. If solved and no `elements` are given, its `moment_values` and `shear_values` are used.
+    - `elements = None` = Objects passed to `Beam.fast_solve`, needed for deflection
+    - `envelope = None` = `PatternEnvelope` (or any object with `envelopes` dict) instead of a beam
+    - `ndivs:int = 1001` = Stations used with `elements`
+
+    Returns dict with keys `moment`, `shear` and (when known) `EIy`, `span`
+    """
+    if envelope is not None:
+        env = envelope.envelopes
+        return {'moment': float(max(np.abs(env['max_moment']).max(), np.abs(env['min_moment']).max())),
+                'shear': float(max(np.abs(env['max_shear']).max(), np.abs(env['min_shear']).max()))}
+    if elements is None:
+        if beam is None or beam.moment_values is None:
+            raise ValueError("Give a solved beam, a beam with elements, or an envelope")
+        return {'moment': float(np.abs(beam.moment_values).max()), 'shear': float(np.abs(beam.shear_values).max())}
+
+    arrays = BeamArrays.from_elements(beam.length, elements)
+    _, ry, mom = arrays.solve_reactions()
+    x = arrays.candidate_points(ndivs)
+    EIy, _ = arrays.deflection_at(x, ry, mom, 1.0)  # deflection times EI, shared by all sections
+    return {'moment': float(np.abs(arrays.moment_at(x, ry, mom)).max()),
+            'shear': float(np.abs(arrays.shear_at(x, ry)).max()),
+            'EIy': float(np.abs(EIy).max()), 'span': beam.length}
+
+
+class SelectionResult:
+    """
+    ## Description
+    Result of `select_section`
+
+    ### Attributes
+    - `catalog` = `SectionCatalog` checked
+    - `utilization:dict` = `'bending'`, `'shear'`, `'deflection'` ratios of demand to limit for every section
+    - `governing` = Largest utilization of every section
+    - `passes` = Boolean array, `governing <= 1`
+    - `index:int` = Index of lightest passing section (`None` if none passes)
+    - `name:str` = Name of that section
+    """
+
+    def __init__(self, catalog, utilization: dict):
+        self.catalog = catalog
+        self.utilization = utilization
+        self.governing = np.max(np.stack(list(utilization.values())), axis=0)
+        self.passes = self.governing <= 1
+        if self.passes.any():
+            mass = np.where(self.passes, catalog.mass, np.inf)
+            self.index = int(np.argmin(mass))
+            self.name = str(catalog.names[self.index])
+        else:
+            self.index, self.name = None, None
+
+    def ranking(self):
+        """Indices of passing sections from lightest to heaviest"""
+        passing = np.flatnonzero(self.passes)
+        return passing[np.argsort(self.catalog.mass[passing], kind='stable')]
+
+
+def select_section(catalog: SectionCatalog, moment, shear, EIy=None, span: float = None,
+                   deflection_limit: float = 360):
+    """
+    ### Description
+    Checks every section of `catalog` for bending stress `M/Z`, shear stress `V/shear_area` and deflection
+    `EIy/(E*I) <= span/deflection_limit` in one broadcasted pass.
+
+    #### Arguments
+    - `catalog` = `SectionCatalog`
+    - `moment, shear` = Peak absolute demands, scalars or arrays (e.g. one per load case)
+    - `EIy = None`, `span:float = None` = Peak absolute `EI*y` and span, to check deflection
+    - `deflection_limit:float = 360` = Allowed deflection is `span/deflection_limit`
+
+    Returns `SelectionResult`
+    """
+    moment = np.abs(np.atleast_1d(np.asarray(moment, dtype=float)))[:, None]
+    shear = np.abs(np.atleast_1d(np.asarray(shear, dtype=float)))[:, None]
+    utilization = {'bending': (moment/(catalog.Z*catalog.bending_strength)).max(axis=0),
+                   'shear': (shear/(catalog.shear_area*catalog.shear_strength)).max(axis=0)}
+    if EIy is not None:
+        if span is None:
+            raise ValueError("Deflection check requires the span")
+        EIy = np.abs(np.atleast_1d(np.asarray(EIy, dtype=float)))[:, None]
+        utilization['deflection'] = (EIy/(catalog.E*catalog.I)/(span/deflection_limit)).max(axis=0)
+    return SelectionResult(catalog, utilization)
@@ -0,0 +1,247 @@
+"""
+Module for compiled parametric shear force and bending moment functions
+
+`Beam.generate_shear_equation` and `Beam.generate_moment_equation` rebuild sympy expressions with the
+numeric positions and magnitudes baked in, so two beams which differ only in numbers share no work.
+Here the Macaulay expressions (and the equations of equilibrium) are built once per *topology* (the kinds
+of elements, support types and hinge sides, in order) with every position and magnitude as a symbol,
+and lambdified to numpy. Compiled topologies are cached, so any later beam with the same topology only
+binds a row of parameters, and a whole batch of beams is evaluated by one call of the compiled functions.
+
+#### Example
+```
+elements = (Reaction(0, 'h', 'A'), Reaction(5, 'r', 'B'), PointLoad(2, 10, True))
+compiled = compile_elements(elements)                # built once, later calls hit the cache
+P = compiled.bind([5, 6], [elements, (Reaction(0, 'h', 'A'), Reaction(6, 'r', 'B'), PointLoad(1, 4, True))])
+R = compiled.solve_reactions(P)
+V, M = compiled.shear(x, P, R), compiled.moment(x, P, R)      # shape (2, len(x))
+```
+"""
+from functools import lru_cache
+
+import numpy as np
+import sympy as sp
+
+from .beam import UDL, UVL, Hinge, PointLoad, PointMoment, Reaction
+from .superposition import _support_type
+
+# parameters of every kind of element, in the order they are bound
+PARAMETERS = {'Reaction': ('pos',), 'Hinge': ('pos',), 'PointLoad': ('pos', 'fy', 'fx'),
+              'PointMoment': ('pos', 'mom'), 'UDL': ('start', 'end', 'w'), 'UVL': ('start', 'end', 'w0', 'w1')}
+
+
+def topology(elements: object):
+    """
+    ### Description
+    Cache key of `elements`: kind of every element in order, with support type (`Reaction`) or side (`Hinge`).
+    """
+    key = []
+    for e in elements:
+        if isinstance(e, Reaction):
+            key.append(('Reaction', _support_type(e.type)))
+        elif isinstance(e, Hinge):
+            key.append(('Hinge', e.side[0]))
+        elif isinstance(e, (PointLoad, PointMoment, UDL, UVL)):
+            key.append((type(e).__name__, ''))
+        else:
+            raise ValueError(f"Unknown beam element {e!r}")
+    return tuple(key)
+
+
+def parameters(length: float, elements: object):
+    """Numeric parameters of one beam in the order of `CompiledBeam.symbols`"""
+    values = [length]
+    for e in elements:
+        if isinstance(e, (Reaction, Hinge)):
+            values.append(e.pos)
+        elif isinstance(e, PointLoad):
+            values += [e.pos, e.load_y, e.load_x]
+        elif isinstance(e, PointMoment):
+            values += [e.pos, e.mom]
+        elif isinstance(e, UDL):
+            values += [e.start, e.end, e.loadpm]
+        elif isinstance(e, UVL):
+            values += [e.start, e.end, e.startload, e.endload]
+    return values
+
+
+class CompiledBeam:
+    """
+    ## Description
+    Parametric shear force, bending moment and equilibrium equations of one topology, lambdified to numpy.
+    Use `compile_topology` (cached) instead of creating objects directly.
+
+    ### Arguments
+    - `key:tuple` = Topology as returned by `topology`
+
+    ### Attributes
+    - `symbols:list` = Parameter symbols (`L` first, then element parameters like `pos_0, fy_2, ...`)
+    - `unknowns:list` = Symbols of unknown vertical reactions and reaction moments
+    - `shear_expr, moment_expr` = Symbolic `V(x)` and `M(x)` in terms of `symbols` and `unknowns`
+    """
+
+    def __init__(self, key: tuple):
+        self.key = key
+        x = sp.Symbol('x')
+        L = sp.Symbol('L')
+        self.symbols = [L]
+        self.unknowns = []
+        self._restrained = None  # column of first hinge/fixed support, takes horizontal load
+        shear, moment, fx, hinges = 0, 0, 0, []
+        macaulay = sp.SingularityFunction
+
+        for i, (kind, flag) in enumerate(key):
+            p = sp.symbols([f"{name}_{i}" for name in PARAMETERS[kind]])
+            self.symbols += p
+            if kind == 'Reaction':
+                ry = sp.Symbol(f"ry_{i}")
+                self.unknowns.append(ry)
+                shear += ry*macaulay(x, p[0], 0)
+                moment += ry*macaulay(x, p[0], 1)
+                if flag == 'fixed':
+                    mom = sp.Symbol(f"mom_{i}")
+                    self.unknowns.append(mom)
+                    moment -= mom*macaulay(x, p[0], 0)
+                if flag != 'roller' and self._restrained is None:
+                    self._restrained = i
+            elif kind == 'Hinge':
+                hinges.append(p[0])
+            elif kind == 'PointLoad':
+                shear += p[1]*macaulay(x, p[0], 0)
+                moment += p[1]*macaulay(x, p[0], 1)
+                fx += p[2]
+            elif kind == 'PointMoment':
+                moment -= p[1]*macaulay(x, p[0], 0)
+            else:
+                start, end, w0 = p[:3]
+                w1 = w0 if kind == 'UDL' else p[3]
+                gradient = (w1 - w0)/(end - start)
+                shear += w0*macaulay(x, start, 1) + gradient*macaulay(x, start, 2)/2 - \
+                    w1*macaulay(x, end, 1) - gradient*macaulay(x, end, 2)/2
+                moment += w0*macaulay(x, start, 2)/2 + gradient*macaulay(x, start, 3)/6 - \
+                    w1*macaulay(x, end, 2)/2 - gradient*macaulay(x, end, 3)/6
+
+        # sum(Fy) = 0 and sum(M) = 0 just right of the end, M = 0 at each internal hinge
+        # (elements exactly at a hinge count as left of it)
+        equations = sp.Matrix([shear.subs(x, L), moment.subs(x, L)] + [moment.subs(x, h) for h in hinges])
+        if equations.shape[0] != len(self.unknowns):
+            raise ValueError(f"Beam is not statically determinate: {equations.shape[0]} equations for "
+                             f"{len(self.unknowns)} unknown reactions")
+        self.shear_expr, self.moment_expr = shear, moment
+
+        # flat lists of entries: lambdified matrices mix scalars and arrays
+        self._matrix = sp.lambdify(self.symbols, list(equations.jacobian(self.unknowns)), 'numpy')
+        self._vector = sp.lambdify(self.symbols, list(equations.subs({u: 0 for u in self.unknowns})), 'numpy')
+        self._shear = sp.lambdify([x] + self.symbols + self.unknowns, shear, 'numpy')
+        self._moment = sp.lambdify([x] + self.symbols + self.unknowns, moment, 'numpy')
+        self._fx = sp.lambdify(self.symbols, fx, 'numpy')
+
+    def bind(self, length, elements_list: object):
+        """
+        ### Description
+        Parameter array of shape `(batch, len(symbols))` of beams with this topology.
+
+        #### Arguments
+        - `length` = Length of each beam, scalar or one per beam
+        - `elements_list` = One list of elements (as passed to `Beam.fast_solve`) per beam
+        """
+        elements_list = list(elements_list)
+        length = np.broadcast_to(np.asarray(length, dtype=float), (len(elements_list),))
+        for elements in elements_list:
+            if topology(elements) != self.key:
+                raise ValueError("All beams must have the topology this function was compiled for")
+        return np.array([parameters(L, e) for (L, e) in zip(length, elements_list)], dtype=float)
+
+    def _columns(self, P):
+        P = np.atleast_2d(np.asarray(P, dtype=float))
+        return P, [P[:, j:j+1] for j in range(P.shape[1])]
+
+    def solve_reactions(self, P):
+        """
+        ### Description
+        Solves the compiled equations of equilibrium for every row of `P`.
+
+        Returns array of shape `(batch, len(unknowns))`
+        """
+        P, cols = self._columns(P)
+        n = len(self.unknowns)
+        A = _stack(self._matrix(*cols), P.shape[0]).reshape(-1, n, n)
+        b = _stack(self._vector(*cols), P.shape[0])
+        try:
+            return np.linalg.solve(A, -b[..., None])[..., 0]
+        except np.linalg.LinAlgError:
+            raise ValueError("Beam is geometrically unstable: equilibrium equations are singular") from None
+
+    def horizontal_reaction(self, P):
+        """Horizontal reaction of the first `'hinge'` or `'fixed'` support (zero without one), shape `(batch,)`"""
+        P, cols = self._columns(P)
+        if self._restrained is None:
+            return np.zeros(P.shape[0])
+        return -np.broadcast_to(np.asarray(self._fx(*cols), dtype=float).reshape(-1), (P.shape[0],))
+
+    def _evaluate(self, fn, x, P, R):
+        P, cols = self._columns(P)
+        R = self.solve_reactions(P) if R is None else np.atleast_2d(R)
+        x = np.asarray(x, dtype=float)
+        values = fn(x, *cols, *[R[:, j:j+1] for j in range(R.shape[1])])
+        return np.broadcast_to(values, (P.shape[0],) + x.shape[-1:]).astype(float)
+
+    def shear(self, x, P, R=None):
+        """Shear force at positions `x` for every row of `P` (reactions `R` are solved if not given), shape `(batch, nx)`"""
+        return self._evaluate(self._shear, x, P, R)
+
+    def moment(self, x, P, R=None):
+        """Bending moment at positions `x` for every row of `P` (reactions `R` are solved if not given), shape `(batch, nx)`"""
+        return self._evaluate(self._moment, x, P, R)
+
+
+def _stack(entries, batch: int):
+    """Array of shape `(batch, len(entries))` from lambdified entries (scalars or arrays of shape `(batch, 1)`)"""
+    return np.stack([np.broadcast_to(np.asarray(v, dtype=float), (batch, 1))[:, 0] for v in entries], axis=1)
+
+
+@lru_cache(maxsize=256)
+def compile_topology(key: tuple):
+    """Cached `CompiledBeam` of topology `key` (`compile_topology.cache_info()` reports hits)"""
+    return CompiledBeam(key)
+
+
+def compile_elements(elements: object):
+    """Cached `CompiledBeam` for the topology of `elements`"""
+    return compile_topology(topology(elements))
+
+
+def compiled_solve(beam: object, loads_list: object):
+    """
+    ### Description
+    Same results as `Beam.fast_solve` from the cached compiled functions: sets `rx_val, ry_val, mom_val` of
+    the `Reaction` objects and `reactions_list`, `solved_rxns`, `shear_values`, `moment_values` of `beam`
+    (over `beam.xbeam`). `shear_fn` and `mom_fn` are built from the solved reactions when first accessed.
+
+    #### Arguments
+    - `beam` = `Beam` object
+    - `loads_list` = List (or tuple) of beam objects like Reactions, Loads, Moments, Internal Hinge
+    """
+    compiled = compile_elements(loads_list)
+    P = compiled.bind(beam.length, [loads_list])
+    R = compiled.solve_reactions(P)
+    rx = compiled.horizontal_reaction(P)[0]
+
+    values = dict(zip(compiled.unknowns, R[0]))
+    for i, e in enumerate(loads_list):
+        if isinstance(e, Reaction):
+            e.ry_val = float(values[sp.Symbol(f"ry_{i}")])
+            if e.type == 'fixed':
+                e.mom_val = float(values[sp.Symbol(f"mom_{i}")])
+            if i == compiled._restrained:
+                e.rx_val = float(rx)
+    beam.reactions_list = [e for e in loads_list if isinstance(e, Reaction)]
+    beam.solved_rxns = {}
+    for r in beam.reactions_list:
+        for var, val in (('rx_var', 'rx_val'), ('ry_var', 'ry_val'), ('mom_var', 'mom_val')):
+            if hasattr(r, var):
+                beam.solved_rxns[getattr(r, var)] = float(getattr(r, val))
+    beam._defer_equations(loads_list)
+    beam.shear_values = compiled.shear(beam.xbeam, P, R)[0]
+    beam.moment_values = compiled.moment(beam.xbeam, P, R)[0]
+    return beam.shear_values, beam.moment_values
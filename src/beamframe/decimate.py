@@ -0,0 +1,70 @@
+"""
+Module for decimation of diagrams before plotting
+
+A line plot cannot show more than one vertical stroke per pixel column, so a diagram with millions of
+stations is reduced to a few points per column: the first and last sample, the minimum and maximum, and
+both samples of the largest step (a jump at a point load or point moment). The rendered line is the same
+as with all samples, global peaks (the values marked with `details=True`) are kept exactly, and the cost
+of rendering depends on the pixel width instead of `ndivs`.
+"""
+import numpy as np
+
+
+def _first_per_group(mask, group):
+    """Index of first `True` of `mask` in every group (groups are contiguous and sorted)"""
+    idx = np.flatnonzero(mask)
+    _, first = np.unique(group[idx], return_index=True)
+    return idx[first]
+
+
+def minmax_indices(x, y, width: int, keep=None):
+    """
+    ### Description
+    Indices of samples to plot for `width` pixel columns.
+
+    #### Arguments
+    - `x` = Sorted positions
+    - `y` = Values at `x`
+    - `width:int` = Number of pixel columns
+    - `keep = None` = Extra indices always kept
+
+    Returns sorted array of indices (at most `6*width` plus `keep`)
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    n = len(x)
+    if n <= 6*width:
+        return np.arange(n)
+
+    edges = np.linspace(x[0], x[-1], int(width) + 1)[1:-1]
+    starts = np.unique(np.concatenate([[0], np.searchsorted(x, edges)]))
+    starts = starts[starts < n]
+    group = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, n)))
+
+    high = np.maximum.reduceat(y, starts)
+    low = np.minimum.reduceat(y, starts)
+    step = np.abs(np.diff(y, append=y[-1]))  # step to next sample
+    big = np.maximum.reduceat(step, starts)
+    jump = _first_per_group(step == big[group], group)
+
+    chosen = [starts, np.append(starts[1:] - 1, n - 1),
+              _first_per_group(y == high[group], group), _first_per_group(y == low[group], group),
+              jump, np.minimum(jump + 1, n - 1)]
+    if keep is not None:
+        chosen.append(np.asarray(keep, dtype=int).ravel())
+    return np.unique(np.concatenate(chosen))
+
+
+def minmax_decimate(x, y, width: int, keep=None):
+    """
+    ### Description
+    Reduces `(x, y)` to the samples returned by `minmax_indices`.
+
+    Returns tuple `(x, y)` of decimated arrays
+    """
+    idx = minmax_indices(x, y, width, keep)
+    return np.asarray(x)[idx], np.asarray(y)[idx]
+
+
+def axes_width(ax):
+    """Width of matplotlib axes in pixels"""
+    return max(1, int(np.ceil(ax.get_window_extent().width)))
@@ -0,0 +1,338 @@
+"""
+Module for distributed execution of large batches of beam models through a shared work queue
+
+Overnight design space runs outgrow one machine. Here a batch of JSON models (the format of
+`server.parse_model`) is split into shards that are written to a queue directory on a shared file system,
+and any number of worker processes, on this machine or others mounting the same directory, take shards
+from it until none are left. The protocol only needs atomic `os.rename` and `os.replace`:
+
+- `pending/<index>.json` = shard waiting for a worker, with its attempt count
+- `claimed/<index>.json.<worker>` = shard being solved; a worker claims it by renaming the pending file
+- `done/<index>.json` = results of the shard
+- `failed/<index>.json` = shard given up after `max_attempts` failures
+
+A shard whose solver raises is put back to `pending` with one more attempt, and a claim older than
+`lease` seconds (a worker that died or lost its machine) is returned to `pending` by `requeue_stale`.
+Results are merged in shard order, so the merged list is the same whichever worker solved which shard
+and however often shards were retried. Models of a shard are solved by `server.solve_batch`
+(vectorised superposition) or one by one with `Beam.fast_solve`.
+
+#### Example
+```
+results = run_local(models, 'queue_dir', workers=4, shard_size=500)
+
+# on every machine mounting /shared/queue (after `WorkQueue('/shared/queue').submit(models)`):
+python -m beamframe.distributed worker /shared/queue
+# then on any of them
+WorkQueue('/shared/queue').merge()
+```
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import socket
+import time
+
+import numpy as np
+
+from .beam import Beam, Reaction
+from .server import EXTREMA, _reaction_values, parse_model, solve_batch
+
+METHODS = ('arrays', 'fast_solve')
+
+
+def solve_fast(models: list):
+    """
+    ### Description
+    Solves JSON models one by one with `Beam.fast_solve`; results have the format of `server.solve_batch`,
+    with extrema taken over the `ndivs` stations of the beam (default `1000`). A model which fails in any
+    way only gives an error result for itself.
+    """
+    results = []
+    for model in models:
+        try:
+            results.append(_solve_one(model))
+        except Exception as e:
+            results.append({'error': str(e) or repr(e)})
+    return results
+
+
+def _solve_one(model: dict):
+    length, elements, _, _ = parse_model(model)
+    beam = Beam(length, ndivs=int(model.get('ndivs', 1000)))
+    with contextlib.redirect_stdout(io.StringIO()):
+        beam.fast_solve(elements)
+    x = beam.xbeam[beam.beam_0:]
+    values = {'moment': beam.moment_values[beam.beam_0:], 'shear': beam.shear_values[beam.beam_0:]}
+    extrema = {}
+    for name, v in values.items():
+        i, j = np.argmax(v), np.argmin(v)
+        extrema.update({f'max_{name}': v[i], f'x_max_{name}': x[i], f'min_{name}': v[j], f'x_min_{name}': x[j]})
+    reactions = [e for e in elements if isinstance(e, Reaction)]
+    rx, ry, mom = ([float(getattr(r, attr)) for r in reactions] for attr in ('rx_val', 'ry_val', 'mom_val'))
+    return {'reactions': _reaction_values(reactions, rx, ry, mom),
+            'extrema': {label: float(extrema[label]) for label in EXTREMA}}
+
+
+def solve_shard(models: list, method: str = 'arrays'):
+    """Results of the models of one shard with `method` (`'arrays'` or `'fast_solve'`)"""
+    if method not in METHODS:
+        raise ValueError(f"Unknown method {method}. Use one of {METHODS}")
+    return solve_batch(models) if method == 'arrays' else solve_fast(models)
+
+
+def worker_name():
+    """Default worker name: host name and process id"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class WorkQueue:
+    """
+    ## Description
+    Shard queue in a directory of a (shared) file system, see module docstring.
+
+    ### Arguments
+    - `path:str` = Queue directory
+    - `lease:float = 600.0` = Seconds after which a claimed shard is assumed lost and requeued
+    - `max_attempts:int = 3` = Attempts of a shard before it is moved to `failed`
+    """
+
+    STATES = ('pending', 'claimed', 'done', 'failed')
+
+    def __init__(self, path: str, lease: float = 600.0, max_attempts: int = 3):
+        self.path = str(path)
+        self.lease = float(lease)
+        self.max_attempts = int(max_attempts)
+
+    def _dir(self, state: str):
+        return os.path.join(self.path, state)
+
+    def _write(self, state: str, name: str, data: dict):
+        path = os.path.join(self._dir(state), name)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    def _names(self, state: str):
+        if not os.path.isdir(self._dir(state)):
+            return []
+        return sorted(n for n in os.listdir(self._dir(state)) if not n.endswith('.tmp'))
+
+    def submit(self, models: list, shard_size: int = 1000, method: str = 'arrays'):
+        """
+        ### Description
+        Splits `models` into shards of `shard_size` and queues them. The directory must not hold a job yet.
+
+        Returns number of shards
+        """
+        if method not in METHODS:
+            raise ValueError(f"Unknown method {method}. Use one of {METHODS}")
+        if shard_size < 1:
+            raise ValueError("shard_size must be positive")
+        if os.path.exists(os.path.join(self.path, 'job.json')):
+            raise ValueError(f"{self.path} already holds a job")
+        for state in self.STATES:
+            os.makedirs(self._dir(state), exist_ok=True)
+        models = list(models)
+        starts = range(0, len(models), int(shard_size))
+        for index, start in enumerate(starts):
+            self._write('pending', f"{index:06d}.json",
+                        {'index': index, 'attempts': 0, 'models': models[start:start + shard_size]})
+        job = {'shards': len(starts), 'models': len(models), 'method': method, 'max_attempts': self.max_attempts}
+        with open(os.path.join(self.path, 'job.json'), 'w') as f:
+            json.dump(job, f)
+        return len(starts)
+
+    def job(self):
+        """Job description written by `submit`"""
+        with open(os.path.join(self.path, 'job.json')) as f:
+            return json.load(f)
+
+    def claim(self, worker: str):
+        """
+        ### Description
+        Takes the first pending shard for `worker`. Renaming is atomic, so two workers never get the same claim.
+
+        Returns tuple `(claim_name, shard)` or `None` if no shard is pending
+        """
+        for name in self._names('pending'):
+            claim = f"{name}.{worker}"
+            try:
+                os.rename(os.path.join(self._dir('pending'), name), os.path.join(self._dir('claimed'), claim))
+            except FileNotFoundError:
+                continue  # taken by another worker
+            # the lease starts now, not when the shard was written
+            os.utime(os.path.join(self._dir('claimed'), claim))
+            with open(os.path.join(self._dir('claimed'), claim)) as f:
+                return claim, json.load(f)
+        return None
+
+    def complete(self, claim: str, shard: dict, results: list):
+        """Stores the results of a claimed shard and releases the claim"""
+        self._write('done', f"{shard['index']:06d}.json", {'index': shard['index'], 'results': results})
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(os.path.join(self._dir('claimed'), claim))
+
+    def fail(self, claim: str, shard: dict, error: str):
+        """Returns a claimed shard to `pending` with one more attempt, or to `failed` after `max_attempts`"""
+        self._release(claim, dict(shard, attempts=shard['attempts'] + 1, error=error))
+
+    def _release(self, claim: str, shard: dict):
+        name = f"{shard['index']:06d}.json"
+        if not os.path.exists(os.path.join(self._dir('done'), name)):
+            self._write('failed' if shard['attempts'] >= self.max_attempts else 'pending', name, shard)
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(os.path.join(self._dir('claimed'), claim))
+
+    def requeue_stale(self):
+        """Returns claims older than `lease` seconds to `pending` (counting an attempt). Returns their number"""
+        count = 0
+        now = time.time()
+        for claim in self._names('claimed'):
+            path = os.path.join(self._dir('claimed'), claim)
+            try:
+                if now - os.path.getmtime(path) < self.lease:
+                    continue
+                with open(path) as f:
+                    shard = json.load(f)
+            except FileNotFoundError:
+                continue  # completed meanwhile
+            self._release(claim, dict(shard, attempts=shard['attempts'] + 1, error='lease expired'))
+            count += 1
+        return count
+
+    def status(self):
+        """Number of shards in each state"""
+        return {state: len(self._names(state)) for state in self.STATES}
+
+    def finished(self):
+        """Whether every shard is done or failed"""
+        return len(set(self._names('done')) | set(self._names('failed'))) >= self.job()['shards']
+
+    def merge(self):
+        """
+        ### Description
+        Results of all models in submission order. Models of failed shards get `{"error": ...}`.
+        Raises `ValueError` while shards are still pending or claimed.
+        """
+        if not self.finished():
+            raise ValueError(f"Job is not finished: {self.status()}")
+        results = []
+        for index in range(self.job()['shards']):
+            name = f"{index:06d}.json"
+            done = os.path.join(self._dir('done'), name)
+            if os.path.exists(done):
+                with open(done) as f:
+                    results.extend(json.load(f)['results'])
+            else:
+                with open(os.path.join(self._dir('failed'), name)) as f:
+                    shard = json.load(f)
+                error = f"Shard {index} failed after {shard['attempts']} attempts: {shard['error']}"
+                results.extend({'error': error} for _ in shard['models'])
+        return results
+
+
+def run_worker(path: str, worker: str = None, poll: float = 0.2, idle_timeout: float = None, max_shards: int = None,
+               lease: float = 600.0):
+    """
+    ### Description
+    Solves shards of the queue at `path` until the job is finished (or `max_shards` were solved, or nothing
+    was claimable for `idle_timeout` seconds). Stale claims of other workers are requeued while waiting.
+
+    Returns number of shards solved
+    """
+    worker = worker or worker_name()
+    job = WorkQueue(path).job()
+    queue = WorkQueue(path, lease, job['max_attempts'])
+    solved, idle = 0, time.monotonic()
+    while max_shards is None or solved < max_shards:
+        claimed = queue.claim(worker)
+        if claimed is None:
+            if queue.finished() or (idle_timeout is not None and time.monotonic() - idle > idle_timeout):
+                break
+            queue.requeue_stale()
+            time.sleep(poll)
+            continue
+        claim, shard = claimed
+        try:
+            results = solve_shard(shard['models'], job['method'])
+        except Exception as e:  # models fail into their own results, so this is an infrastructure failure: retry
+            queue.fail(claim, shard, f"{type(e).__name__}: {e}")
+        else:
+            queue.complete(claim, shard, results)
+        solved += 1
+        idle = time.monotonic()
+    return solved
+
+
+def run_local(models: list, path: str, workers: int = 4, shard_size: int = 1000, method: str = 'arrays',
+              lease: float = 600.0, max_attempts: int = 3, timeout: float = None):
+    """
+    ### Description
+    Submits `models` to a new queue at `path`, solves it with `workers` local worker processes and merges.
+    Shards left after all workers have exited (e.g. killed) are solved in this process.
+
+    Returns list of results in the order of `models`
+    """
+    queue = WorkQueue(path, lease, max_attempts)
+    queue.submit(models, shard_size, method)
+    procs = [multiprocessing.Process(target=run_worker, args=(path, f"{worker_name()}-{k}"), kwargs={'lease': lease})
+             for k in range(workers)]
+    for p in procs:
+        p.start()
+    start = time.monotonic()
+    try:
+        while not queue.finished():
+            if timeout is not None and time.monotonic() - start > timeout:
+                raise TimeoutError(f"Job not finished after {timeout} s: {queue.status()}")
+            if not any(p.is_alive() for p in procs):
+                run_worker(path, lease=lease)
+                continue
+            queue.requeue_stale()
+            time.sleep(0.05)
+    finally:
+        for p in procs:
+            p.join(timeout=1.0)
+            if p.is_alive():
+                p.terminate()
+    return queue.merge()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Worker and tools for a distributed beam work queue")
+    sub = parser.add_subparsers(dest='command', required=True)
+    worker = sub.add_parser('worker', help="solve shards until the job is finished")
+    worker.add_argument('path')
+    worker.add_argument('--name', default=None)
+    worker.add_argument('--lease', type=float, default=600.0)
+    worker.add_argument('--idle-timeout', type=float, default=None)
+    submit = sub.add_parser('submit', help="queue a JSON file with a list of models")
+    submit.add_argument('path')
+    submit.add_argument('models')
+    submit.add_argument('--shard-size', type=int, default=1000)
+    submit.add_argument('--method', choices=METHODS, default='arrays')
+    merge = sub.add_parser('merge', help="write merged results of a finished job as JSON")
+    merge.add_argument('path')
+    merge.add_argument('output')
+    status = sub.add_parser('status', help="print number of shards in each state")
+    status.add_argument('path')
+    args = parser.parse_args(argv)
+
+    if args.command == 'worker':
+        run_worker(args.path, args.name, lease=args.lease, idle_timeout=args.idle_timeout)
+    elif args.command == 'submit':
+        with open(args.models) as f:
+            print(WorkQueue(args.path).submit(json.load(f), args.shard_size, args.method))
+    elif args.command == 'merge':
+        with open(args.output, 'w') as f:
+            json.dump(WorkQueue(args.path).merge(), f)
+    else:
+        print(json.dumps(WorkQueue(args.path).status()))
+
+
+if __name__ == '__main__':
+    main()
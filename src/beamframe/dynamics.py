@@ -0,0 +1,163 @@
+"""
+Module for time history response to loads crossing a beam
+
+A train of axle loads moves at constant speed and the beam responds dynamically. The response is a
+superposition of the lowest modes of `modal.modal_analysis`: every modal coordinate obeys
+`q'' + 2 zeta w q' + w**2 q = p(t)`, which is integrated exactly for a load varying linearly within each
+time step (first order hold). The step recurrence of each mode is a second order digital filter
+(`scipy.signal.lfilter`), so whole chunks of time steps are processed in compiled code and only the
+filter state is carried from one chunk to the next: memory is constant however long the record is.
+
+Bending moment and shear force use the mode acceleration method: the exact static response
+(`monitoring.UnitResponse`) plus the dynamic part of every mode, `R_j*(q_j - p_j/w_j**2)`. This keeps
+jumps of shear force under the axles, which truncated mode shapes cannot represent.
+
+#### Example
+```
+b = Beam(20, E=200e6, I=8e-4, mass=500)
+supports = (Reaction(0, 'h', 'A'), Reaction(20, 'r', 'B'))
+history = MovingLoadHistory(b, supports, offsets=(0, 3), weights=(50, 50), speed=25, sections=[10])
+for t, deflection, moment, shear in history.iter_chunks(chunk=100_000):
+    ...
+history.envelope()['max_moment'] / history.static_envelope()['max_moment']   # dynamic amplification
+```
+"""
+import numpy as np
+
+from .modal import modal_analysis
+from .monitoring import UnitResponse
+
+
+class MovingLoadHistory:
+    """
+    ## Description
+    Time history of deflection, bending moment and shear force at chosen sections while a train of
+    axle loads crosses the beam at constant speed. The leading axle is at `x = 0` at `t = 0`.
+
+    ### Arguments
+    - `beam` = `Beam` object with `E`, `I` and `mass`
+    - `elements` = `Reaction` and `Hinge` objects (beam must be statically determinate)
+    - `offsets` = Distance of every axle behind the leading axle
+    - `weights` = Axle weights acting downward (kN)
+    - `speed:float` = Speed of the train (m/s)
+    - `sections` = Positions where the response is computed
+    - `k:int = 10` = Number of modes
+    - `damping = 0.02` = Damping ratio, scalar or one value per mode
+    - `dt:float = None` = Time step, default a twentieth of the shortest period used
+    - `after:float = 0` = Duration of free vibration recorded after the last axle has left the beam
+    - `nelems:int = 200`, `mass:float = None` = Passed to `modal_analysis`
+
+    ### Attributes
+    - `modes` = `ModalResult`
+    - `n_steps:int` = Number of time steps, `t = dt*arange(n_steps)`
+    """
+
+    def __init__(self, beam: object, elements: object, offsets: object, weights: object, speed: float,
+                 sections: object, k: int = 10, damping: object = 0.02, dt: float = None, after: float = 0.0,
+                 nelems: int = 200, mass: float = None):
+        try:
+            from scipy import signal
+        except ImportError:
+            raise ImportError("MovingLoadHistory requires scipy") from None
+        if speed <= 0:
+            raise ValueError("Speed must be positive")
+        self.length = beam.length
+        self.offsets = np.atleast_1d(np.asarray(offsets, dtype=float))
+        self.weights = np.broadcast_to(np.asarray(weights, dtype=float), self.offsets.shape)
+        self.speed = float(speed)
+        self.sections = np.atleast_1d(np.asarray(sections, dtype=float))
+
+        self.modes = modal_analysis(beam, elements, k, nelems, mass)
+        self.static = UnitResponse(beam, elements, self.sections)
+        omega = self.modes.omega
+        self.damping = np.broadcast_to(np.asarray(damping, dtype=float), omega.shape)
+        self.dt = float(dt) if dt else 0.05*2*np.pi/omega.max()
+        duration = (self.length + self.offsets.max() - min(self.offsets.min(), 0))/self.speed + after
+        self.n_steps = int(np.ceil(duration/self.dt)) + 1
+
+        # section values of every mode: deflection, and moment/shear per unit modal coordinate
+        self._deflection = self.modes.shape_at(self.sections)
+        self._moment = self.modes.moment_at(self.sections)
+        self._shear = self.modes.shear_at(self.sections)
+
+        # exact first order hold discretisation of every mode as a digital filter
+        self._filters = []
+        for w, zeta in zip(omega, self.damping):
+            system = (np.array([[0, 1], [-w**2, -2*zeta*w]]), np.array([[0], [1]]), np.array([[1, 0]]), np.zeros((1, 1)))
+            num, den = signal.ss2tf(*signal.cont2discrete(system, self.dt, method='foh')[:4])
+            self._filters.append((num[0], den))
+        self._lfilter = signal.lfilter
+
+    def axle_positions(self, start: int, stop: int):
+        """Positions of all axles at time steps `start:stop`, shape `(stop - start, n_axles)`"""
+        t = np.arange(start, stop)*self.dt
+        return self.speed*t[:, None] - self.offsets[None, :]
+
+    def modal_forces(self, positions):
+        """Modal forces (N per unit modal coordinate) for axle `positions` of shape `(n, n_axles)`"""
+        on_beam = (positions >= 0) & (positions <= self.length)
+        shapes = self.modes.shape_at(np.where(on_beam, positions, 0).ravel()).reshape((-1,) + positions.shape)
+        return np.einsum('kna,na->nk', shapes, np.where(on_beam, -1e3*self.weights, 0))
+
+    def iter_chunks(self, chunk: int = 100_000):
+        """
+        ### Description
+        Yields `(t, deflection, moment, shear)` for consecutive chunks of time steps.
+        `t` has shape `(n,)`, the others `(n, n_sections)` (m, kNm, kN).
+        """
+        if chunk < 1:
+            raise ValueError("chunk must be positive")
+        state = [np.zeros(2) for _ in self._filters]
+        omega2 = self.modes.omega**2
+        for start in range(0, self.n_steps, chunk):
+            stop = min(start + chunk, self.n_steps)
+            positions = self.axle_positions(start, stop)
+            p = self.modal_forces(positions)
+            q = np.empty_like(p)
+            for j, (num, den) in enumerate(self._filters):
+                q[:, j], state[j] = self._lfilter(num, den, p[:, j], zi=state[j])
+            dynamic = q - p/omega2
+            shear, moment = self.static.respond(positions, np.broadcast_to(self.weights, positions.shape))
+            yield (np.arange(start, stop)*self.dt, q @ self._deflection,
+                   moment + dynamic @ self._moment, shear + dynamic @ self._shear)
+
+    def envelope(self, chunk: int = 100_000):
+        """
+        ### Description
+        Streams the whole record and returns the extremes at every section: dict with keys
+        `max_deflection, min_deflection, max_moment, min_moment, max_shear, min_shear`.
+        """
+        result = {}
+        for (_, deflection, moment, shear) in self.iter_chunks(chunk):
+            _update_extremes(result, deflection=deflection, moment=moment, shear=shear)
+        return result
+
+    def static_envelope(self, chunk: int = 100_000):
+        """Extremes of the quasi static moment and shear (`max_moment, min_moment, max_shear, min_shear`) for the same positions"""
+        result = {}
+        for start in range(0, self.n_steps, chunk):
+            positions = self.axle_positions(start, min(start + chunk, self.n_steps))
+            shear, moment = self.static.respond(positions, np.broadcast_to(self.weights, positions.shape))
+            _update_extremes(result, moment=moment, shear=shear)
+        return result
+
+    def to_memmap(self, filename: str, chunk: int = 100_000, dtype=np.float64):
+        """
+        ### Description
+        Writes the record to a `.npy` file of shape `(n_steps, 3, n_sections)` (deflection, moment, shear)
+        chunk by chunk; time of row `i` is `i*dt`. Returns the memory mapped array (flushed).
+        """
+        out = np.lib.format.open_memmap(filename, mode='w+', dtype=dtype, shape=(self.n_steps, 3, len(self.sections)))
+        for (t, deflection, moment, shear) in self.iter_chunks(chunk):
+            start = int(round(t[0]/self.dt))
+            out[start:start + len(t)] = np.stack([deflection, moment, shear], axis=1)
+        out.flush()
+        return out
+
+
+def _update_extremes(result: dict, **values):
+    """Updates `max_<name>` and `min_<name>` of `result` with the extremes over axis 0 of every array"""
+    for name, v in values.items():
+        high, low = v.max(axis=0), v.min(axis=0)
+        result[f'max_{name}'] = np.maximum(result[f'max_{name}'], high) if f'max_{name}' in result else high
+        result[f'min_{name}'] = np.minimum(result[f'min_{name}'], low) if f'min_{name}' in result else low
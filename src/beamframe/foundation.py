@@ -0,0 +1,289 @@
+"""
+Module for beams on an elastic (Winkler) foundation
+
+The foundation pushes back on the beam in proportion to the local deflection, `p(x) = -k(x)*y(x)`, so
+`EI*y'''' + k*y = q`. For a constant modulus the solution is built from Hetényi's closed form responses of
+an infinite beam to a point force, a point moment and a linearly varying load, which decay like
+`exp(-lambda*|x - a|)` with `lambda = (k/(4*EI))**0.25`. Between breakpoints (load positions) the response is
+a sum of these exact pieces. Four conditioning loads just outside the ends make both ends free; they and the
+unknown support reactions are found from one small system (4 + number of support unknowns) whatever the
+number of loads, so thousands of point loads only add columns to a vectorised sum.
+
+A modulus varying along the beam (an array or a function of x) or an internal hinge is handled by a
+finite element model (`modal.FEModel`, nodes at all load positions) with a consistent foundation
+matrix, solved as one banded sparse system.
+
+Units: m, kN, `E` in kN/m², modulus in kN/m per m of beam (kN/m²).
+
+#### Example
+```
+b = Beam(30, E=30e6, I=0.02, foundation=20e3)
+loads = [PointLoad(x, 100, inverted=True) for x in np.arange(1, 30, 0.6)]
+result = foundation_solve(b, loads)
+result.deflection, result.moment, result.shear, result.pressure
+```
+"""
+import numpy as np
+
+from .beam import Hinge, Reaction
+from .modal import FEModel
+from .superposition import BeamArrays, along_beam
+
+# first and second antiderivatives of the Hetényi functions, in terms of each other
+_FIRST = {'A': (-1.0, 'D'), 'B': (-0.5, 'A'), 'C': (1.0, 'B'), 'D': (-0.5, 'C')}
+_SECOND = {'A': (0.5, 'C'), 'B': (0.5, 'D'), 'C': (-0.5, 'A'), 'D': (-0.5, 'B')}
+QUANTITIES = ('deflection', 'slope', 'moment', 'shear')
+
+# sums over loads are evaluated in blocks of about this many entries
+_BLOCK = 2**20
+# loads further than REACH/lambda from a station contribute less than exp(-REACH) of their near value
+REACH = 40.0
+
+
+class FoundationResult:
+    """
+    ## Description
+    Result of `foundation_solve`. Arrays are over `beam.xbeam` (zero left of the beam) like `Beam.shear_values`.
+
+    ### Attributes
+    - `x` = Positions
+    - `deflection, slope` = Deflection (m, upward positive) and slope
+    - `moment, shear` = Bending moment (kNm, sagging positive) and shear force (kN)
+    - `pressure` = Foundation reaction on the beam per length (kN/m, upward positive), `-k*y`
+    - `method:str` = `'closed'` (Hetényi) or `'fe'` (finite elements)
+    """
+
+    def __init__(self, x, deflection, slope, moment, shear, pressure, method: str):
+        self.x = x
+        self.deflection = deflection
+        self.slope = slope
+        self.moment = moment
+        self.shear = shear
+        self.pressure = pressure
+        self.method = method
+
+
+def hetenyi_functions(t):
+    """Dict of Hetényi functions `A, B, C, D` of `t >= 0` from one exponential, sine and cosine"""
+    e, c, s = np.exp(-t), np.cos(t), np.sin(t)
+    return {'A': e*(c + s), 'B': e*s, 'C': e*(c - s), 'D': e*c}
+
+
+class Hetenyi:
+    """
+    ## Description
+    Responses of an infinite beam on a Winkler foundation to unit loads, as dicts of `QUANTITIES`
+    (`'deflection'`, `'slope'`, `'moment'`, `'shear'`).
+
+    ### Arguments
+    - `EI:float` = Flexural rigidity (kNm²)
+    - `modulus:float` = Foundation modulus (kN/m²)
+    """
+
+    def __init__(self, EI: float, modulus: float):
+        if EI <= 0 or modulus <= 0:
+            raise ValueError("EI and foundation modulus must be positive")
+        lam = (modulus/(4*EI))**0.25
+        k = modulus
+        self.lam = lam
+        # (function, factor, odd in x - a) for an upward unit force and a counter clockwise unit moment
+        self.force = {'deflection': ('A', lam/(2*k), False), 'slope': ('B', -lam**2/k, True),
+                      'moment': ('C', -1/(4*lam), False), 'shear': ('D', 0.5, True)}
+        self.couple = {'deflection': ('B', lam**2/k, True), 'slope': ('C', lam**3/k, False),
+                       'moment': ('D', -0.5, True), 'shear': ('A', lam/2, False)}
+
+    def point(self, x, pos, couple: bool = False, side=None, strict: bool = False):
+        """
+        ### Description
+        Responses at `x` (rows) to unit loads at `pos` (columns), arrays of shape `(len(x), len(pos))`.
+
+        #### Arguments
+        - `couple:bool = False` = Unit moments instead of unit forces
+        - `side = None` = Make the loads count as left (`1`) or right (`-1`) of every `x`
+        - `strict:bool = False` = Loads exactly at `x` count as right of it (else left, as in `Beam`)
+        """
+        x, pos = np.asarray(x, dtype=float)[:, None], np.asarray(pos, dtype=float)[None, :]
+        f = hetenyi_functions(self.lam*np.abs(x - pos))
+        if side is None:
+            side = np.where(x > pos, 1.0, -1.0) if strict else np.where(x >= pos, 1.0, -1.0)
+        table = self.couple if couple else self.force
+        return {q: factor*f[name]*side if odd else factor*f[name] for q, (name, factor, odd) in table.items()}
+
+    def distributed(self, x, start, end, wstart, wend):
+        """Responses at `x` to linearly varying loads (per meter `wstart` to `wend` over `[start, end]`), shape `(len(x), n)`"""
+        x = np.asarray(x, dtype=float)[:, None]
+        start, end, wstart, wend = (np.asarray(v, dtype=float)[None, :] for v in (start, end, wstart, wend))
+        lam = self.lam
+        span = end - start
+        grad = np.divide(wend - wstart, span, out=np.zeros(span.shape), where=span != 0)
+        c0 = wstart + grad*(x - start)  # load extended linearly to x
+
+        # loaded part left of x (a = x - t/lam) and right of x (a = x + t/lam), as ranges of t
+        hi, lo = np.minimum(end, x), np.maximum(start, x)
+        parts = [(hi > start, lam*np.clip(x - hi, 0, None), lam*np.clip(x - start, 0, None), -grad/lam),
+                 (end > lo, lam*np.clip(lo - x, 0, None), lam*np.clip(end - x, 0, None), grad/lam)]
+        out = {}
+        for sign, (loaded, t1, t2, c1) in zip((1.0, -1.0), parts):
+            f1, f2 = hetenyi_functions(t1), hetenyi_functions(t2)
+            for q, (name, factor, odd) in self.force.items():
+                # integral of (c0 + c1*t)*f(t) over [t1, t2] with t*f integrated by parts
+                (a, g1), (b, g2) = _FIRST[name], _SECOND[name]
+                G = [c0*a*f[g1] + c1*(t*a*f[g1] - b*f[g2]) for (f, t) in ((f1, t1), (f2, t2))]
+                value = np.where(loaded, factor*(G[1] - G[0])/lam, 0)
+                out[q] = out.get(q, 0) + (sign*value if odd else value)
+        return out
+
+
+def foundation_solve(beam: object, loads_list: object, modulus: object = None, method: str = 'auto',
+                     nelems: int = 400):
+    """
+    ### Description
+    Solves a beam resting on an elastic foundation, with or without supports. Sets `rx_val, ry_val, mom_val`
+    of the `Reaction` objects and `reactions_list`, `shear_values`, `moment_values` and `deflection_values` of
+    `beam` (over `beam.xbeam`).
+
+    #### Arguments
+    - `beam` = `Beam` object with `E` and `I`
+    - `loads_list` = List (or tuple) of beam objects like Reactions, Loads, Moments, Internal Hinge
+    - `modulus = None` = Foundation modulus (kN/m²): number, array of values at equally spaced points from
+        `0` to `length`, or function of x. Default `beam.foundation`
+    - `method:str = 'auto'` = `'closed'` (Hetényi, constant modulus and no hinges), `'fe'` (finite elements),
+        or `'auto'` to use `'closed'` when possible
+    - `nelems:int = 400` = Approximate number of finite elements besides nodes at loads (`'fe'` only)
+
+    Returns `FoundationResult`
+    """
+    modulus = beam.foundation if modulus is None else modulus
+    if modulus is None:
+        raise ValueError("Foundation modulus is required (argument or Beam(..., foundation=))")
+    if beam.E is None or beam.I is None:
+        raise ValueError("Beam on elastic foundation requires E and I of the beam")
+    if any(callable(v) or np.ndim(v) for v in (beam.E, beam.I)):
+        raise ValueError("Beam on elastic foundation requires constant E and I")
+    constant = not callable(modulus) and np.ndim(modulus) == 0
+    hinges = any(isinstance(e, Hinge) for e in loads_list)
+    if method == 'auto':
+        method = 'closed' if constant and not hinges else 'fe'
+    if method == 'closed' and (not constant or hinges):
+        raise ValueError("Closed form solution requires a constant modulus and no internal hinge")
+    if method not in ('closed', 'fe'):
+        raise ValueError(f"Unknown method {method}")
+
+    arrays = BeamArrays.from_elements(beam.length, loads_list)
+    rxns = [e for e in loads_list if isinstance(e, Reaction)]
+    x = beam.xbeam[beam.beam_0:]
+    solver = _solve_closed if method == 'closed' else _solve_fe
+    values, ry, mom = solver(arrays, beam.E*beam.I, modulus, x, nelems)
+
+    rx, _, _ = arrays.scatter_reactions(np.zeros((1, len(arrays.unknowns))))
+    for i, r in enumerate(rxns):
+        r.rx_val, r.ry_val, r.mom_val = float(rx[0, i]), float(ry[i]), float(mom[i])
+    full = {}
+    for name, v in values.items():
+        full[name] = np.zeros(len(beam.xbeam))
+        full[name][beam.beam_0:] = v
+    beam.reactions_list = rxns
+    beam.shear_values, beam.moment_values = full['shear'], full['moment']
+    beam.deflection_values = full['deflection']
+    return FoundationResult(beam.xbeam, full['deflection'], full['slope'], full['moment'], full['shear'],
+                            full['pressure'], method)
+
+
+def _applied(kernel: Hetenyi, arrays: BeamArrays, x, strict: bool = False):
+    """
+    Dict of summed responses at `x` to all loads of `arrays`. Stations are taken in chunks and only loads
+    within `REACH/lambda` of a chunk are summed, in blocks of loads.
+    """
+    x = np.atleast_1d(np.asarray(x, dtype=float))
+    total = {q: np.zeros(len(x)) for q in QUANTITIES}
+    reach = REACH/kernel.lam
+    points = []
+    for (pos, val, couple) in ((arrays.point_pos[0], arrays.point_fy[0], False),
+                               (arrays.moment_pos[0], arrays.moment_val[0], True)):
+        order = np.argsort(pos)
+        points.append((pos[order], val[order], couple))
+    dist = np.stack([arrays.dist_start[0], arrays.dist_end[0], arrays.dist_wstart[0], arrays.dist_wend[0]])
+
+    chunk = 256
+    for i in range(0, len(x), chunk):
+        xc = x[i:i+chunk]
+        lo, hi = xc.min() - reach, xc.max() + reach
+        block = max(1, _BLOCK//len(xc))
+        for (pos, val, couple) in points:
+            first, last = np.searchsorted(pos, lo), np.searchsorted(pos, hi, side='right')
+            for j in range(first, last, block):
+                stop = min(j + block, last)
+                for q, v in kernel.point(xc, pos[j:stop], couple, strict=strict).items():
+                    total[q][i:i+chunk] += v @ val[j:stop]
+        near = dist[:, (dist[1] >= lo) & (dist[0] <= hi)]
+        for j in range(0, near.shape[1], block):
+            for q, v in kernel.distributed(xc, *near[:, j:j+block]).items():
+                total[q][i:i+chunk] += v.sum(axis=1)
+    return total
+
+
+def _solve_closed(arrays: BeamArrays, EI: float, modulus: float, x, nelems: int):
+    """Hetényi solution: conditioning loads at both ends plus support reactions from one small system"""
+    kernel = Hetenyi(EI, float(modulus))
+    L = float(arrays.length[0])
+    # unknowns: (position, couple, side) of conditioning force and moment at each end, then support unknowns
+    unknowns = [(0.0, False, 1.0), (0.0, True, 1.0), (L, False, -1.0), (L, True, -1.0)]
+    unknowns += [(arrays.support_pos[0, i], kind == 'mom', None) for (i, kind) in arrays.unknowns]
+    # equations: free shear and moment just outside both ends, zero deflection (and slope if fixed) at supports
+    equations = [('shear', 0.0, True), ('moment', 0.0, True), ('shear', L, False), ('moment', L, False)]
+    for (i, kind) in arrays.unknowns:
+        equations.append(('deflection' if kind == 'ry' else 'slope', arrays.support_pos[0, i], False))
+
+    A = np.zeros((len(equations), len(unknowns)))
+    b = np.zeros(len(equations))
+    for row, (quantity, at, strict) in enumerate(equations):
+        for col, (pos, couple, side) in enumerate(unknowns):
+            A[row, col] = kernel.point([at], [pos], couple, side, strict)[quantity][0, 0]
+        b[row] = -_applied(kernel, arrays, at, strict)[quantity][0]
+    try:
+        sol = np.linalg.solve(A, b)
+    except np.linalg.LinAlgError:
+        raise ValueError("Supports of the beam on elastic foundation are singular") from None
+
+    values = _applied(kernel, arrays, x)
+    for (pos, couple, side), s in zip(unknowns, sol):
+        for q, v in kernel.point(x, [pos], couple, side).items():
+            values[q] += s*v[:, 0]
+    values['pressure'] = -float(modulus)*values['deflection']
+    _, ry, mom = arrays.scatter_reactions(sol[None, 4:])
+    return values, ry[0], mom[0]
+
+
+def _solve_fe(arrays: BeamArrays, EI: float, modulus: object, x, nelems: int):
+    """Finite elements with nodes at every load position and a consistent foundation stiffness matrix"""
+    L = float(arrays.length[0])
+    k = along_beam(modulus, L)
+    fe = FEModel.from_arrays(arrays, EI, nelems)
+
+    # 4 point Gauss quadrature on every element for foundation stiffness
+    xg, weights, dofs, N = fe.gauss(4)
+    kg = k(xg)
+    if np.any(kg < 0):
+        raise ValueError("Foundation modulus must not be negative")
+    K = fe.K/1e3 + fe.scatter(np.einsum('eg,egi,egj->eij', weights*kg, N, N))
+    f = fe.load_vector(arrays)
+    u = fe.solve(K, f)
+    if not np.all(np.isfinite(u)):
+        raise ValueError("Beam on elastic foundation is unstable")
+    ry, mom = fe.support_reactions(K @ u - f, arrays)  # residual is the support reactions on the beam
+
+    values = {}
+    for quantity, derivative in (('deflection', 0), ('slope', 1)):
+        d, n = fe.interpolation(x, derivative)
+        values[quantity] = (u[d]*n).sum(-1)
+    values['pressure'] = -k(x)*values['deflection']
+
+    # shear and moment from equilibrium of loads, reactions and foundation pressure integrated on a fine grid
+    grid = np.unique(np.concatenate([x, np.linspace(0, L, 8*len(fe.x) + 1)]))
+    d, n = fe.interpolation(grid)
+    p = -k(grid)*(u[d]*n).sum(-1)
+    Vf = np.concatenate([[0], np.cumsum(np.diff(grid)*(p[1:] + p[:-1])/2)])
+    Mf = np.concatenate([[0], np.cumsum(np.diff(grid)*(Vf[1:] + Vf[:-1])/2)])
+    values['shear'] = arrays.shear_at(x, ry[None])[0] + np.interp(x, grid, Vf)
+    values['moment'] = arrays.moment_at(x, ry[None], mom[None])[0] + np.interp(x, grid, Mf)
+    return values, ry, mom
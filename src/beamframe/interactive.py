@@ -0,0 +1,305 @@
+"""
+Module for low latency interactive SFD and BMD (e.g. a load moved by a slider in a notebook)
+
+`Beam.fast_solve` followed by `Beam.generate_graph` rebuilds the symbolic equations and the whole figure
+for every change. `InteractiveBeam` instead keeps the solved state of a statically determinate beam:
+
+- shear, moment and equilibrium right hand side of every load are kept separately, and their sums
+- the equilibrium matrix of the supports is inverted once, and the diagrams of unit reactions are stored
+- changing one load subtracts its old contribution and adds the new one (one `BeamArrays` evaluation),
+    reactions are a small matrix product, the diagrams two more
+- the figure is laid out once (like `Beam.generate_graph`); updates only change the data of the lines,
+    which are blitted over the saved background. Only when the axis limits must grow is the whole figure
+    redrawn (`canvas.draw_idle()`)
+
+Rapid events (slider drags) go through `request`, which only remembers the latest change of every
+element and applies all of them once the events pause for `debounce` seconds. With a figure the pause is
+timed by the canvas (`canvas.new_timer`), so changes and drawing run in the thread of the GUI event loop
+(matplotlib is not thread safe); non-interactive backends have no event loop, so there `flush` applies
+them. Without a figure a background thread applies them. Changing supports or hinges rebuilds the whole
+state.
+
+#### Example
+```
+b = Beam(10)
+session = InteractiveBeam(b, [Reaction(0, 'h', 'A'), Reaction(10, 'r', 'B'), PointLoad(5, 20, True)])
+fig = session.figure()
+slider = ipywidgets.FloatSlider(min=0, max=10, value=5)
+slider.observe(lambda change: session.request(2, PointLoad(change['new'], 20, True)), 'value')
+```
+"""
+import threading
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from .beam import Hinge, Reaction
+from .stability import require_determinate_arrays
+from .superposition import BeamArrays
+
+
+class InteractiveBeam:
+    """
+    ## Description
+    Solved state of a statically determinate beam which is cheap to update one element at a time.
+
+    ### Arguments
+    - `beam` = `Beam` object; its `shear_values`, `moment_values` and `reactions_list` are kept up to date
+    - `elements` = List or tuple of `Reaction, Hinge, PointLoad, UDL, UVL, PointMoment` objects
+    - `which:str = 'both'` = Diagrams drawn by `figure`: `'sfd'`, `'bmd'` or `'both'`
+    - `debounce:float = 0.05` = Seconds without new `request` after which pending changes are applied
+
+    ### Attributes
+    - `elements:list` = Current elements (indices are used by `update` and `request`)
+    - `x` = Stations (`beam.xbeam` from the origin of the beam)
+    - `shear, moment` = Current diagrams at `x`
+    - `rx, ry, mom` = Current reactions, one per `Reaction` in order
+    """
+
+    def __init__(self, beam: object, elements: object, which: str = 'both', debounce: float = 0.05):
+        if which.lower() not in ('sfd', 'bmd', 'both'):
+            raise ValueError(f"Unexpected graph type {which}")
+        self.beam = beam
+        self.which = which.lower()
+        self.debounce = debounce
+        self.elements = list(elements)
+        self.x = beam.xbeam[beam.beam_0:]
+        self._lines = []
+        self._pending = {}
+        self._timer = None
+        self._lock = threading.RLock()
+        self._build()
+
+    def _build(self):
+        """Factors the support layout and evaluates every load (done again if supports or hinges change)"""
+        self._rxns = [e for e in self.elements if isinstance(e, Reaction)]
+        hinges = [e for e in self.elements if isinstance(e, Hinge)]
+        self._structure = self._rxns + hinges
+        self._supports = BeamArrays(self.beam.length, [r.type for r in self._rxns], [r.pos for r in self._rxns],
+                                    [h.side for h in hinges], [h.pos for h in hinges])
+        require_determinate_arrays(self._supports)
+        self._inverse = np.linalg.inv(self._supports.equilibrium_matrix()[0])
+
+        # diagrams of every unknown reaction of unit value, shape (n_unknowns, len(x))
+        n = len(self._supports.unknowns)
+        _, ry, mom = self._supports.scatter_reactions(np.eye(n)[:, None, :])
+        self._unit_ry, self._unit_mom = ry[:, 0], mom[:, 0]
+        self._unit_shear = np.vstack([self._supports.shear_at(self.x, ry[j]) for j in range(n)])
+        self._unit_moment = np.vstack([self._supports.moment_at(self.x, ry[j], mom[j]) for j in range(n)])
+
+        self._zeros = np.zeros((1, len(self._rxns)))
+        self._parts = {}
+        self._shear = np.zeros(len(self.x))
+        self._moment = np.zeros(len(self.x))
+        self._rhs = np.zeros(len(self._inverse))
+        self._fx = 0.0
+        for element in self.elements:
+            self._add(element)
+        self._solve()
+
+    def _contribution(self, element):
+        arrays = BeamArrays.from_elements(self.beam.length, self._structure + [element])
+        return (arrays.shear_at(self.x, self._zeros)[0], arrays.moment_at(self.x, self._zeros, self._zeros)[0],
+                arrays.load_vector()[0], float(arrays.point_fx.sum()))
+
+    def _add(self, element):
+        if isinstance(element, (Reaction, Hinge)):
+            return
+        part = self._contribution(element)
+        self._parts[id(element)] = part
+        self._shear += part[0]
+        self._moment += part[1]
+        self._rhs += part[2]
+        self._fx += part[3]
+
+    def _remove(self, element):
+        part = self._parts.pop(id(element), None)
+        if part is not None:
+            self._shear -= part[0]
+            self._moment -= part[1]
+            self._rhs -= part[2]
+            self._fx -= part[3]
+
+    def _solve(self):
+        sol = -self._inverse @ self._rhs
+        self.ry, self.mom = sol @ self._unit_ry, sol @ self._unit_mom
+        self.rx = np.zeros(len(self._rxns))
+        restrained = [i for i, r in enumerate(self._rxns) if r.type != 'roller']
+        if restrained:
+            self.rx[restrained[0]] = -self._fx
+        self.shear = self._shear + sol @ self._unit_shear
+        self.moment = self._moment + sol @ self._unit_moment
+
+        for r, rx, ry, mom in zip(self._rxns, self.rx, self.ry, self.mom):
+            r.rx_val, r.ry_val, r.mom_val = float(rx), float(ry), float(mom)
+        beam = self.beam
+        beam.reactions_list = self._rxns
+        beam.shear_values = np.zeros(len(beam.xbeam))
+        beam.moment_values = np.zeros(len(beam.xbeam))
+        beam.shear_values[beam.beam_0:] = self.shear
+        beam.moment_values[beam.beam_0:] = self.moment
+
+    def _index(self, element):
+        if isinstance(element, (int, np.integer)):
+            return int(element)
+        for i, e in enumerate(self.elements):
+            if e is element:
+                return i
+        raise ValueError("Element is not part of this beam")
+
+    def update(self, element, new: object = None, draw: bool = True):
+        """
+        ### Description
+        Applies one change immediately: replaces `element` (an object of `elements` or its index) by `new`,
+        or, without `new`, re-evaluates `element` after its attributes were changed in place.
+        Only this element is evaluated again unless it is a `Reaction` or `Hinge`.
+        """
+        with self._lock:
+            i = self._index(element)
+            old = self.elements[i]
+            new = old if new is None else new
+            self.elements[i] = new
+            if isinstance(old, (Reaction, Hinge)) or isinstance(new, (Reaction, Hinge)):
+                self._build()
+            else:
+                self._remove(old)
+                self._add(new)
+                self._solve()
+        if draw:
+            self.draw()
+
+    def add(self, element: object, draw: bool = True):
+        """Adds an element (a load, or a support or hinge which rebuilds the state)"""
+        with self._lock:
+            self.elements.append(element)
+            if isinstance(element, (Reaction, Hinge)):
+                self._build()
+            else:
+                self._add(element)
+                self._solve()
+        if draw:
+            self.draw()
+
+    def remove(self, element: object, draw: bool = True):
+        """Removes an element (an object of `elements` or its index)"""
+        with self._lock:
+            old = self.elements.pop(self._index(element))
+            if isinstance(old, (Reaction, Hinge)):
+                self._build()
+            else:
+                self._remove(old)
+                self._solve()
+        if draw:
+            self.draw()
+
+    def request(self, element, new: object = None):
+        """
+        ### Description
+        Debounced `update` for event callbacks: only the latest change of every element is kept, and all
+        pending changes are applied (and drawn once) when no request came for `debounce` seconds.
+        `element` should be an index when `new` replaces it, since earlier requests replace the object.
+        """
+        with self._lock:
+            self._pending[self._index(element)] = new
+            self._stop_timer()
+            if self._lines:
+                self._timer = self._figure.canvas.new_timer(interval=int(1000*self.debounce))
+                self._timer.single_shot = True
+                self._timer.add_callback(self.flush)
+            else:
+                # no artists to touch: applying the changes in another thread is safe
+                self._timer = threading.Timer(self.debounce, self.flush)
+                self._timer.daemon = True
+            self._timer.start()
+
+    def _stop_timer(self):
+        if isinstance(self._timer, threading.Timer):
+            self._timer.cancel()
+        elif self._timer is not None:
+            self._timer.stop()
+        self._timer = None
+
+    def flush(self):
+        """Applies pending requests now; returns the number of elements changed"""
+        with self._lock:
+            self._stop_timer()
+            pending, self._pending = self._pending, {}
+            for i, new in pending.items():
+                self.update(i, new, draw=False)
+        if pending:
+            self.draw()
+        return len(pending)
+
+    def figure(self, dpi: int = 100):
+        """
+        ### Description
+        Creates the figure once (titles, axes, beam line) with the current diagrams.
+        Later changes only update the data of its lines. Returns `matplotlib.figure.Figure`
+        """
+        self.flush()  # pending requests of a background timer must not touch the new artists
+        plt.rc('font', family='serif', size=12)
+        panels = {'sfd': ("Shear Force Diagram", "Shear Force (kN)", 'shear', "SFD"),
+                  'bmd': ("Bending Moment Diagram", "Bending Moment (kNm)", 'moment', "BMD")}
+        names = ('sfd', 'bmd') if self.which == 'both' else (self.which,)
+        fig, axs = plt.subplots(nrows=len(names), ncols=1, figsize=(10, 5*len(names)), sharex=True,
+                                edgecolor='w', facecolor='w', dpi=dpi, squeeze=False)
+        if self.which == 'both':
+            fig.suptitle("Comparison of BMD and SFD")
+
+        self._lines = []
+        for ax, name in zip(axs[:, 0], names):
+            title, ylabel, attr, label = panels[name]
+            ax.set_title(title)
+            ax.set_ylabel(ylabel)
+            ax.set_xlim(-0.5, self.beam.length+0.5)
+            ax.axhline(y=0, linewidth=3, color='k', label='Beam')
+            ax.grid(linewidth=1, color='gainsboro')
+            line, = ax.plot(self.x, getattr(self, attr), color='orange', label=label, animated=True)
+            ax.legend(fontsize=8)
+            self._lines.append((line, attr))
+            self._rescale(ax, getattr(self, attr))
+        axs[-1, 0].set_xlabel("x (m)")
+        self._figure = fig
+        self._background = None
+        fig.canvas.mpl_connect('draw_event', self._on_draw)
+        return fig
+
+    def _on_draw(self, event):
+        # a full redraw leaves out the (animated) lines: keep it as background for blitting, then add them
+        canvas = self._figure.canvas
+        self._background = canvas.copy_from_bbox(self._figure.bbox)
+        for line, _ in self._lines:
+            line.axes.draw_artist(line)
+
+    @staticmethod
+    def _rescale(ax, values):
+        # limits grow with headroom (and shrink only when far too wide) so that most events are blitted
+        low, high = min(values.min(), 0), max(values.max(), 0)
+        margin = 0.2*(high - low) or 1.0
+        bottom, top = ax.get_ylim()
+        if low < bottom or high > top or (top - bottom) > 4*(high - low + 2*margin):
+            ax.set_ylim(low - margin, high + margin)
+            return True
+        return False
+
+    def draw(self):
+        """
+        ### Description
+        Updates the lines of `figure` in place (nothing without a figure). While the axis limits stay the
+        same only the lines are redrawn over the saved background (blitting), else a redraw is scheduled.
+        """
+        if not self._lines:
+            return
+        rescaled = False
+        for line, attr in self._lines:
+            values = getattr(self, attr)
+            line.set_ydata(values)
+            rescaled |= self._rescale(line.axes, values)
+        canvas = self._figure.canvas
+        if rescaled or self._background is None:
+            canvas.draw_idle()
+        else:
+            canvas.restore_region(self._background)
+            for line, _ in self._lines:
+                line.axes.draw_artist(line)
+            canvas.blit(self._figure.bbox)
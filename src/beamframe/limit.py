@@ -0,0 +1,171 @@
+"""
+Module for plastic collapse (limit) analysis of ductile beams
+
+By the lower bound theorem the collapse load factor is the largest factor `lambda` of the loads for which
+some bending moment distribution is in equilibrium with them and nowhere exceeds the plastic moment
+capacity `M_p(x)`. With the unknown reactions `R` (as in `BeamArrays.equilibrium_matrix`, whose hinge
+rows make the moment vanish at internal hinges) the moment at any point is linear in `(lambda, R)`:
+
+`M(x) = lambda*M_loads(x) + sum(R_j*M_j(x))`
+
+so the collapse factor is a small linear programme (`scipy.optimize.linprog`, HiGHS) with one pair of
+constraints `-M_p <= M <= M_p` per check point. Check points are the breakpoints of the beam (both
+sides), `ndivs` equally spaced stations and the joints of capacity segments; within distributed loads the
+moment peaks where shear vanishes, so those points are added and the programme solved again until the
+moment nowhere exceeds the capacity. The dual values of the active constraints are the plastic hinge
+rotations of the collapse mechanism. Statically indeterminate beams need no special treatment.
+
+#### Example
+```
+elements = (Reaction(0, 'f', 'A'), Reaction(8, 'r', 'B'), Reaction(14, 'r', 'C'),
+            UDL(0, 30, 8), PointLoad(11, 80, True))
+result = limit_analysis(14, elements, [(0, 8, 250), (8, 14, 150)])     # M_p per segment (kNm)
+result.load_factor, result.hinges, result.rotations
+```
+"""
+import numpy as np
+
+from .stability import classify_arrays
+from .superposition import BeamArrays, along_beam
+
+
+class LimitResult:
+    """
+    ## Description
+    Result of `limit_analysis`.
+
+    ### Attributes
+    - `load_factor` = Collapse load factor (multiple of the given loads), `inf` if the loads cause no moment
+    - `hinges` = Positions of plastic hinges of the collapse mechanism
+    - `rotations` = Plastic hinge rotations (sagging positive), scaled so the loads do unit work
+        (`sum(M_p*abs(rotations)) = load_factor`)
+    - `x, moment` = Check points and a bending moment distribution at collapse (unique where the beam
+        is a mechanism; in parts that stay rigid any admissible distribution)
+    - `capacity` = Plastic moment capacity at `x`
+    - `rx, ry, mom` = Reactions at collapse, for `load_factor` times the loads
+    """
+
+    def __init__(self, load_factor, hinges, rotations, x, moment, capacity, rx, ry, mom):
+        self.load_factor = load_factor
+        self.hinges = hinges
+        self.rotations = rotations
+        self.x = x
+        self.moment = moment
+        self.capacity = capacity
+        self.rx, self.ry, self.mom = rx, ry, mom
+
+
+def plastic_capacity(Mp: object, length: float):
+    """
+    ### Description
+    Function of x giving the plastic moment capacity and the positions where it jumps. `Mp` is a number,
+    an array of values at equally spaced points from `0` to `length`, a function of x, or a list of
+    `(start, end, Mp)` segments (at a joint of two segments the weaker one governs).
+    """
+    if not callable(Mp) and np.ndim(Mp) == 2:
+        start, end, values = np.asarray(Mp, dtype=float).T
+        if np.any(values <= 0):
+            raise ValueError("Plastic moment capacity must be positive")
+
+        def capacity(x):
+            x = np.asarray(x, dtype=float)[..., None]
+            inside = (x >= start - 1e-12*length) & (x <= end + 1e-12*length)
+            if not inside.any(axis=-1).all():
+                raise ValueError("Plastic moment capacity segments do not cover the beam")
+            return np.where(inside, values, np.inf).min(axis=-1)
+        return capacity, np.concatenate([start, end])
+    return along_beam(Mp, length), np.zeros(0)
+
+
+def limit_analysis(length: float, elements: object, Mp: object, ndivs: int = 201, tol: float = 1e-9):
+    """
+    ### Description
+    Collapse load factor and plastic mechanism of a beam under proportionally increasing loads.
+
+    #### Arguments
+    - `length:float` = Length of the beam
+    - `elements` = List (or tuple) of beam objects like Reactions, Loads, Moments, Internal Hinge
+    - `Mp` = Plastic moment capacity (kNm), see `plastic_capacity`; e.g. `section.Z_plastic*f_y`
+    - `ndivs:int = 201` = Equally spaced check points besides breakpoints
+    - `tol:float = 1e-9` = Relative excess of moment over capacity accepted between check points
+
+    Returns `LimitResult`
+    """
+    try:
+        from scipy.optimize import linprog
+    except ImportError:
+        raise ImportError("Limit analysis requires scipy") from None
+    arrays = BeamArrays.from_elements(length, elements)
+    if classify_arrays(arrays, horizontal=False)['freedom'][0] > 0:
+        raise ValueError("Beam is geometrically unstable: it is a mechanism without any plastic hinge")
+    capacity, joints = plastic_capacity(Mp, float(length))
+
+    # moment of the loads (column 0) and of every unknown reaction of unit value (one column each)
+    n = len(arrays.unknowns)
+    zeros = np.zeros((1, len(arrays.support_types)))
+    _, unit_ry, unit_mom = arrays.scatter_reactions(np.eye(n)[:, None, :])
+    supports = BeamArrays(length, arrays.support_types, arrays.support_pos, arrays.hinge_sides, arrays.hinge_pos)
+
+    def columns(x, field):
+        if field == 'moment':
+            parts = [arrays.moment_at(x, zeros, zeros)] + [supports.moment_at(x, unit_ry[j], unit_mom[j])
+                                                           for j in range(n)]
+        else:
+            parts = [arrays.shear_at(x, zeros)] + [supports.shear_at(x, unit_ry[j]) for j in range(n)]
+        return np.vstack(parts).T
+
+    L = float(length)
+    x = np.unique(np.concatenate([arrays.candidate_points(ndivs)[0], np.clip(joints, 0, L)]))
+    A_eq = np.column_stack([arrays.load_vector()[0], arrays.equilibrium_matrix()[0]])
+    bounds = [(0, None)] + [(None, None)]*n
+    for _ in range(20):
+        G, cap = columns(x, 'moment'), capacity(x)
+        result = linprog(np.eye(n + 1)[0]*-1, A_ub=np.vstack([G, -G]), b_ub=np.concatenate([cap, cap]),
+                         A_eq=A_eq, b_eq=np.zeros(len(A_eq)), bounds=bounds, method='highs')
+        if result.status == 3:
+            load_factor = np.inf
+            break
+        if result.status != 0:
+            raise ValueError(f"Limit analysis failed: {result.message}")
+        z = result.x
+        load_factor = z[0]
+        # moment peaks between check points where shear changes sign without a jump
+        V = columns(x, 'shear') @ z
+        V_left = columns(x[1:] - 1e-9*L, 'shear') @ z
+        crossing = (np.sign(V[:-1]) != np.sign(V_left)) & (V[:-1] != 0)
+        roots = x[:-1][crossing] + (x[1:] - x[:-1])[crossing]*V[:-1][crossing]/(V[:-1] - V_left)[crossing]
+        roots = roots[np.abs(columns(roots, 'moment') @ z) > (1 + tol)*capacity(roots)]
+        if not len(roots):
+            break
+        x = np.unique(np.concatenate([x, roots]))
+    else:
+        raise ValueError("Limit analysis did not converge: refine with a larger ndivs")
+
+    if np.isinf(load_factor):
+        return LimitResult(np.inf, np.zeros(0), np.zeros(0), x, np.zeros(len(x)), cap, *(zeros[0],)*3)
+    moment = G @ z
+    # dual values of active moment constraints are hinge rotations (sagging for upper, hogging for lower)
+    duals = -result.ineqlin.marginals
+    rotation = duals[:len(x)] - duals[len(x):]
+    active = np.abs(rotation) > 1e-9*np.abs(rotation).max(initial=0.0)
+    hinges, rotations = x[active], rotation[active]
+    # the two sides of a breakpoint are one hinge, at the breakpoint
+    if len(hinges):
+        group = np.concatenate([[0], np.cumsum(np.diff(hinges) > 1e-6*L)])
+        rotations = np.bincount(group, rotations)
+        hinges = hinges[np.concatenate([np.flatnonzero(np.diff(group)), [len(group) - 1]])]
+        bp = np.unique(np.concatenate([np.clip(arrays.breakpoints()[0], 0, L), joints]))
+        nearest = bp[np.argmin(np.abs(hinges[:, None] - bp), axis=1)]
+        hinges = np.where(np.abs(hinges - nearest) <= 1e-6*L, nearest, hinges)
+        # hinges inside distributed loads lie where shear of the final solution vanishes
+        h = 1e-4*L
+        for k in np.flatnonzero(np.abs(hinges - nearest) > 1e-6*L):
+            V0, V1 = columns(hinges[k] + np.array([-h, h]), 'shear') @ z
+            if V0*V1 < 0:
+                hinges[k] += h*(V0 + V1)/(V0 - V1)
+    work = np.sum(capacity(hinges)*np.abs(rotations))
+    if work > 0:
+        rotations = rotations*load_factor/work
+    rx, ry, mom = arrays.scatter_reactions(z[None, 1:])
+    rx = rx*load_factor
+    return LimitResult(load_factor, hinges, rotations, x, moment, cap, rx[0], ry[0], mom[0])
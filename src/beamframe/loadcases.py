@@ -0,0 +1,204 @@
+"""
+Module for streaming very large files of load cases
+
+A load generator writes one load case per row (CSV with a header line, or a 2d `.npy` array) for a single
+beam geometry. Instead of building `PointLoad`/`UDL` objects for every case, columns of the file are
+mapped to attributes of a template beam (as in `ParameterSweep.vary`), rows are read lazily `chunk` at a
+time and every chunk is solved as one batch of `BeamArrays`. Reactions and diagram extrema are written
+into a memory mapped `.npy` store as they are computed, and a small JSON checkpoint records how far the
+input has been processed, so an interrupted run continues where it stopped.
+
+#### Example
+```
+b = Beam(10)
+ra, rb = Reaction(0, 'h', 'A'), Reaction(10, 'r', 'B')
+p, w = PointLoad(5, 0, inverted=True), UDL(0, 0, 10)
+cases = LoadCaseStream(b, (ra, rb, p, w))
+cases.column('P', p, 'load')
+cases.column('x', p, 'pos')
+cases.column('w', w, 'loadpm')
+out = cases.run('cases.csv', 'results.npy', chunk=100_000)     # rerun the same call to resume
+out[:, cases.output_labels().index('max_moment')]
+```
+"""
+import io
+import json
+import os
+from itertools import islice
+
+import numpy as np
+
+from .sweep import ParameterSweep
+
+
+def count_rows(path: str):
+    """Number of load cases in a CSV file (non-empty lines after the header) or `.npy` file"""
+    if str(path).endswith('.npy'):
+        return np.load(path, mmap_mode='r').shape[0]
+    with open(path, 'rb') as f:
+        f.readline()
+        return sum(1 for line in f if line.strip())
+
+
+def csv_header(path: str):
+    """Column names of the header line of a CSV file"""
+    with open(path, 'rb') as f:
+        return [name.strip() for name in f.readline().decode().split(',')]
+
+
+def iter_csv(path: str, usecols: list, chunk: int = 100_000, offset: int = None):
+    """
+    ### Description
+    Yields `(values, offset)` for consecutive chunks of rows of a CSV file: `values` of shape `(n, len(usecols))`
+    and the byte offset just after the chunk, from which a later call continues.
+
+    #### Arguments
+    - `usecols:list` = Indices of columns to read
+    - `chunk:int = 100_000` = Rows per chunk
+    - `offset:int = None` = Byte offset to start from, default just after the header
+    """
+    with open(path, 'rb') as f:
+        if offset is None:
+            f.readline()
+        else:
+            f.seek(offset)
+        while True:
+            lines = [line for line in islice(f, chunk) if line.strip()]
+            if not lines:
+                return
+            values = np.loadtxt(io.BytesIO(b''.join(lines)), delimiter=',', usecols=usecols, ndmin=2)
+            yield values, f.tell()
+
+
+def iter_npy(path: str, usecols: list, chunk: int = 100_000, offset: int = 0):
+    """Same as `iter_csv` for a 2d `.npy` file read through a memory map; `offset` is a row index"""
+    data = np.load(path, mmap_mode='r')
+    if data.ndim != 2:
+        raise ValueError("Load case array must be 2 dimensional")
+    for start in range(offset, data.shape[0], chunk):
+        stop = min(start + chunk, data.shape[0])
+        yield np.asarray(data[start:stop, usecols], dtype=float), stop
+
+
+class LoadCaseStream:
+    """
+    ## Description
+    Solves every row of a load case file for one beam geometry, in chunks of vectorised superposition.
+
+    ### Arguments
+    - `beam` = `Beam` object
+    - `elements` = List or tuple of all objects that would be passed to `Beam.fast_solve` (values not given by
+        a column stay as they are)
+    - `ndivs:int = None` = Stations per beam checked for extrema besides load and support positions. Default
+        `2` when shear is piecewise linear (exact, see `ParameterSweep.linear_shear`), else `201`
+
+    Use `column` to map file columns to attributes, then `run`.
+    """
+
+    def __init__(self, beam: object, elements: object, ndivs: int = None):
+        self.sweep = ParameterSweep(beam, elements)
+        self.ndivs = ndivs
+        self.columns = []  # (name, index) of file columns in the order of `sweep.varied`
+
+    def column(self, name: str, obj: object, attr: str, index: int = None):
+        """
+        ### Description
+        Takes attribute `attr` of `obj` (the beam or one of the elements) from a file column.
+        Attributes and values are as for `ParameterSweep.vary`.
+
+        #### Arguments
+        - `name:str` = Column name in the CSV header
+        - `index:int = None` = Column index, needed for `.npy` files (default: order of `column` calls)
+        """
+        self.sweep.vary(obj, attr, [np.nan], name)
+        self.columns.append((name, len(self.columns) if index is None else int(index)))
+
+    def output_labels(self):
+        """Labels of the columns of the output store (reactions, then extrema)"""
+        return self.sweep.output_labels()
+
+    def solve(self, values):
+        """Reactions and extrema for `values` of shape `(n, n_columns)`, shape `(n, len(output_labels()))`"""
+        ndivs = self.ndivs
+        if ndivs is None:
+            ndivs = 2 if self.sweep.linear_shear() else 201
+        return self.sweep.evaluate(values, ndivs)
+
+    def _usecols(self, path: str):
+        if str(path).endswith('.npy'):
+            return [index for (_, index) in self.columns]
+        header = csv_header(path)
+        missing = [name for (name, _) in self.columns if name not in header]
+        if missing:
+            raise ValueError(f"Columns {missing} are not in the header of {path}")
+        return [header.index(name) for (name, _) in self.columns]
+
+    def iter_chunks(self, path: str, chunk: int = 100_000, offset: int = None):
+        """
+        ### Description
+        Yields `(values, results, offset)` for consecutive chunks of a CSV or `.npy` file, where `results`
+        are the solved outputs and `offset` is where the next chunk starts (see `iter_csv`).
+        """
+        if not self.columns:
+            raise ValueError("No columns. Use `column` to map file columns to attributes")
+        if chunk < 1:
+            raise ValueError("chunk must be positive")
+        usecols = self._usecols(path)
+        if str(path).endswith('.npy'):
+            reader = iter_npy(path, usecols, chunk, offset or 0)
+        else:
+            reader = iter_csv(path, usecols, chunk, offset)
+        for values, next_offset in reader:
+            yield values, self.solve(values), next_offset
+
+    def run(self, path: str, output: str, chunk: int = 100_000, checkpoint: str = None, resume: bool = True,
+            max_chunks: int = None):
+        """
+        ### Description
+        Solves all load cases of `path` and writes the results to the `.npy` store `output`, shape
+        `(n_cases, len(output_labels()))`. After every chunk the store is flushed and the checkpoint updated.
+
+        #### Arguments
+        - `path:str` = CSV file with header line, or 2d `.npy` file
+        - `output:str` = Path of output `.npy` store
+        - `chunk:int = 100_000` = Load cases solved together (memory is proportional to it)
+        - `checkpoint:str = None` = Path of JSON checkpoint, default `output + '.json'`
+        - `resume:bool = True` = Continue from an existing checkpoint of the same input, else start over
+        - `max_chunks:int = None` = Stop after this many chunks; a later call continues
+
+        Returns the memory mapped output store
+        """
+        checkpoint = output + '.json' if checkpoint is None else checkpoint
+        labels = self.output_labels()
+        state = None
+        if resume and os.path.exists(checkpoint) and os.path.exists(output):
+            with open(checkpoint) as f:
+                state = json.load(f)
+            if state['source'] != os.path.abspath(path) or state['labels'] != labels:
+                raise ValueError(f"Checkpoint {checkpoint} belongs to another input; use resume=False to start over")
+        if state is None:
+            state = {'source': os.path.abspath(path), 'labels': labels, 'rows': count_rows(path),
+                     'done': 0, 'offset': None}
+            out = np.lib.format.open_memmap(output, mode='w+', dtype=np.float64, shape=(state['rows'], len(labels)))
+            _write_checkpoint(checkpoint, state)
+        else:
+            out = np.load(output, mmap_mode='r+')
+        if state['done'] >= state['rows']:
+            return out
+
+        for n, (_, results, offset) in enumerate(self.iter_chunks(path, chunk, state['offset'])):
+            out[state['done']:state['done'] + len(results)] = results
+            out.flush()
+            state['done'] += len(results)
+            state['offset'] = offset
+            _write_checkpoint(checkpoint, state)
+            if max_chunks is not None and n + 1 >= max_chunks:
+                break
+        return out
+
+
+def _write_checkpoint(path: str, state: dict):
+    """Replaces the checkpoint atomically, so an interruption never leaves a partial file"""
+    with open(path + '.tmp', 'w') as f:
+        json.dump(state, f)
+    os.replace(path + '.tmp', path)
@@ -0,0 +1,310 @@
+"""
+Module for natural frequencies and mode shapes
+
+The beam is discretised into Euler-Bernoulli (Hermite cubic) elements with consistent mass. Nodes are
+placed at every support and internal hinge; supports restrain the deflection (and the rotation of
+`'fixed'` supports) and a `Hinge` gives the elements on its two sides separate rotations. Degrees of
+freedom are numbered node by node so the matrices are banded, and only the lowest `k` modes are found
+with a sparse shift-invert Lanczos solver (`scipy.sparse.linalg.eigsh`), so fine meshes stay cheap.
+
+Units: `E` in kN/m², `I` in m⁴ and mass in kg/m (as `Beam(..., mass=)`); frequencies are in Hz.
+
+#### Example
+```
+b = Beam(20, E=200e6, I=8e-4, mass=500)
+modes = modal_analysis(b, (Reaction(0, 'h', 'A'), Reaction(20, 'r', 'B')), k=3)
+modes.frequencies, modes.shape_at(np.linspace(0, 20, 101))
+```
+"""
+import numpy as np
+
+from .beam import Hinge, Reaction
+
+
+class FEModel:
+    """
+    ## Description
+    Finite element discretisation of a beam: nodes, degree of freedom numbering and banded stiffness and mass.
+
+    ### Arguments
+    - `length:float`
+    - `elements` = `Reaction` and `Hinge` objects (loads are ignored)
+    - `EI:float` = Flexural rigidity in kNm²
+    - `mass:float = None` = Mass per length in kg/m (`M` is `None` without it)
+    - `nelems:int = 200` = Approximate number of elements
+    - `breakpoints = ()` = Further positions where nodes are placed (e.g. load positions)
+
+    ### Attributes
+    - `x` = Node positions
+    - `element_dofs` = Array of shape `(n_elements, 4)`: deflection and rotation at both ends of each element
+    - `deflection_dofs` = Deflection degree of freedom of every node
+    - `rotation_dofs` = Rotation degrees of freedom (left and right, different only at hinges) of every node, shape `(n_nodes, 2)`
+    - `free` = Unrestrained degrees of freedom
+    - `K, M` = Stiffness (N/m) and mass matrices, `scipy.sparse` if scipy is installed else dense
+    """
+
+    def __init__(self, length: float, elements: object, EI: float, mass: float = None, nelems: int = 200,
+                 breakpoints=()):
+        if not EI:
+            raise ValueError("Finite element model requires E and I of the beam")
+        self.length, self.EI = float(length), float(EI)
+        self.mass = float(mass) if mass else None
+        rxns = [e for e in elements if isinstance(e, Reaction)]
+        hinges = [e for e in elements if isinstance(e, Hinge)]
+
+        # nodes at ends, supports, hinges and breakpoints; gaps between them are split evenly so that no
+        # element is much shorter than length/nelems unless two of these points are that close
+        x = np.unique(np.clip(np.concatenate([[0, length], [e.pos for e in rxns + hinges],
+                                              np.asarray(breakpoints, dtype=float).ravel()]), 0, length))
+        x = x[np.concatenate([[True], np.diff(x) > 1e-9*length])]
+        x[-1] = length
+        gaps = np.diff(x)
+        parts = np.maximum(1, np.ceil(gaps*int(nelems)/length - 1e-9)).astype(int)
+        self.x = np.append(np.repeat(x[:-1], parts) + np.repeat(gaps/parts, parts)*_ranges(parts), length)
+
+        def node(pos):
+            return int(np.argmin(np.abs(self.x - pos)))
+
+        # dofs per node: deflection, rotation (left) and a second rotation (right) at internal hinges
+        released = {node(h.pos) for h in hinges}
+        self.deflection_dofs, left, right, n = [], [], [], 0
+        for i in range(len(self.x)):
+            self.deflection_dofs.append(n)
+            left.append(n + 1)
+            right.append(n + 2 if i in released else n + 1)
+            n = right[-1] + 1
+        self.ndofs = n
+        self.deflection_dofs = np.array(self.deflection_dofs)
+        self.rotation_dofs = np.column_stack([left, right])
+        self.element_dofs = np.column_stack([self.deflection_dofs[:-1], right[:-1],
+                                             self.deflection_dofs[1:], left[1:]])
+
+        fixed = set()
+        for r in rxns:
+            i = node(r.pos)
+            fixed.add(self.deflection_dofs[i])
+            if r.type == 'fixed':
+                fixed.update((left[i], right[i]))
+        self.free = np.array([d for d in range(self.ndofs) if d not in fixed])
+        self.K, self.M = self._assemble()
+
+    def _assemble(self):
+        """Element matrices (EI in N m²) scattered to the global stiffness and mass matrices"""
+        l = np.diff(self.x)[:, None, None]
+        k = np.array([[12, 6, -12, 6], [6, 4, -6, 2], [-12, -6, 12, -6], [6, 2, -6, 4]], dtype=float)
+        m = np.array([[156, 22, 54, -13], [22, 4, 13, -3], [54, 13, 156, -22], [-13, -3, -22, 4]], dtype=float)
+        # powers of element length of each entry (rotation dofs carry a factor l)
+        power = np.array([0, 1, 0, 1])
+        power = power[:, None] + power[None, :]
+        ke = 1e3*self.EI*k*l**(power - 3)
+        if self.mass is None:
+            return self.scatter(ke), None
+        return self.scatter(ke), self.scatter(self.mass*m*l**(power + 1)/420)
+
+    def scatter(self, matrices):
+        """Global matrix from element matrices of shape `(n_elements, 4, 4)`, `scipy.sparse` (csc) if scipy is installed else dense"""
+        rows = np.repeat(self.element_dofs, 4, axis=1).ravel()
+        cols = np.tile(self.element_dofs, (1, 4)).ravel()
+        try:
+            from scipy import sparse
+        except ImportError:
+            A = np.zeros((self.ndofs, self.ndofs))
+            np.add.at(A, (rows, cols), np.ravel(matrices))
+            return A
+        return sparse.csc_matrix((np.ravel(matrices), (rows, cols)), shape=(self.ndofs, self.ndofs))
+
+    @classmethod
+    def from_arrays(cls, arrays: object, EI: float, nelems: int = 200):
+        """Model of the first beam of `BeamArrays` (without mass), with nodes at all supports, hinges and loads"""
+        supports = [Reaction(pos, stype, '') for (pos, stype) in zip(arrays.support_pos[0], arrays.support_types)]
+        hinges = [Hinge(pos, side) for (pos, side) in zip(arrays.hinge_pos[0], arrays.hinge_sides)]
+        breakpoints = np.concatenate([arrays.point_pos[0], arrays.moment_pos[0], arrays.dist_start[0],
+                                      arrays.dist_end[0]])
+        return cls(arrays.length[0], supports + hinges, EI, nelems=nelems, breakpoints=breakpoints)
+
+    def gauss(self, n: int = 4):
+        """
+        ### Description
+        Gauss quadrature with `n` points on every element.
+
+        Returns tuple `(x, weights, dofs, N)`: positions and weights of shape `(n_elements, n)`, and dofs and
+        Hermite shape functions at the points, shape `(n_elements, n, 4)`
+        """
+        g, wg = np.polynomial.legendre.leggauss(n)
+        l = np.diff(self.x)
+        xg = self.x[:-1, None] + l[:, None]*(g + 1)/2
+        dofs, N = self.interpolation(xg.ravel())
+        return xg, l[:, None]*wg/2, dofs.reshape(len(l), n, 4), N.reshape(len(l), n, 4)
+
+    def load_vector(self, arrays: object):
+        """Consistent nodal loads (kN, kNm) of the loads of the first beam of `BeamArrays`"""
+        f = np.zeros(self.ndofs)
+        d, n = self.interpolation(arrays.point_pos[0])
+        np.add.at(f, d, arrays.point_fy[0][:, None]*n)
+        d, n = self.interpolation(arrays.moment_pos[0], 1)
+        np.add.at(f, d, arrays.moment_val[0][:, None]*n)
+        start, end, wstart, wend = (v[0][None, None, :] for v in (arrays.dist_start, arrays.dist_end,
+                                                                  arrays.dist_wstart, arrays.dist_wend))
+        if start.size:
+            # 4 points are exact for linearly varying load times cubic shape functions
+            xg, weights, dofs, N = self.gauss(4)
+            grad = np.divide(wend - wstart, end - start, out=np.zeros(start.shape), where=end > start)
+            inside = (xg[..., None] >= start) & (xg[..., None] <= end)
+            q = np.where(inside, wstart + grad*(xg[..., None] - start), 0).sum(axis=-1)
+            np.add.at(f, dofs[:, 0, :], np.einsum('eg,egi->ei', weights*q, N))
+        return f
+
+    def solve(self, K, f):
+        """Displacements for stiffness `K` and loads `f` with restrained dofs zero (`nan` if singular)"""
+        u = np.zeros(self.ndofs)
+        free = self.free
+        if isinstance(K, np.ndarray):
+            try:
+                u[free] = np.linalg.solve(K[np.ix_(free, free)], f[free])
+            except np.linalg.LinAlgError:
+                u[:] = np.nan
+        else:
+            from scipy.sparse.linalg import spsolve
+            u[free] = spsolve(K[free][:, free].tocsc(), f[free])
+        return u
+
+    def support_reactions(self, residual, arrays: object):
+        """Vertical reactions and reaction moments at the supports of the first beam of `BeamArrays`, from `K @ u - f`"""
+        n = len(arrays.support_types)
+        ry, mom = np.zeros(n), np.zeros(n)
+        for i, (pos, stype) in enumerate(zip(arrays.support_pos[0], arrays.support_types)):
+            node = int(np.argmin(np.abs(self.x - pos)))
+            ry[i] = residual[self.deflection_dofs[node]]
+            if stype == 'fixed':
+                mom[i] = residual[np.unique(self.rotation_dofs[node])].sum()
+        return ry, mom
+
+    def locate(self, x):
+        """Element index and local coordinate `xi` in `[0, 1]` of positions `x`"""
+        x = np.clip(np.asarray(x, dtype=float), 0, self.length)
+        e = np.clip(np.searchsorted(self.x, x, side='right') - 1, 0, len(self.x) - 2)
+        return e, (x - self.x[e])/(self.x[e+1] - self.x[e])
+
+    def interpolation(self, x, derivative: int = 0):
+        """
+        ### Description
+        Hermite shape functions (or their `derivative` with respect to x) of the element containing each of `x`.
+
+        Returns tuple `(dofs, N)` of arrays with shape `(len(x), 4)`: values of a field are `(vector[dofs]*N).sum(-1)`
+        """
+        e, xi = self.locate(np.atleast_1d(x))
+        l = np.diff(self.x)[e]
+        if derivative == 0:
+            N = [1 - 3*xi**2 + 2*xi**3, l*(xi - 2*xi**2 + xi**3), 3*xi**2 - 2*xi**3, l*(xi**3 - xi**2)]
+        elif derivative == 1:
+            N = [6*(xi**2 - xi)/l, 1 - 4*xi + 3*xi**2, 6*(xi - xi**2)/l, 3*xi**2 - 2*xi]
+        elif derivative == 2:
+            N = [(12*xi - 6)/l**2, (6*xi - 4)/l, (6 - 12*xi)/l**2, (6*xi - 2)/l]
+        elif derivative == 3:
+            one = np.ones_like(xi)
+            N = [12*one/l**3, 6*one/l**2, -12*one/l**3, 6*one/l**2]
+        else:
+            raise ValueError("derivative must be 0, 1, 2 or 3")
+        return self.element_dofs[e], np.column_stack(N)
+
+
+def _ranges(counts):
+    """Concatenation of `arange(n)` for every `n` of `counts`"""
+    counts = np.asarray(counts)
+    return np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+
+
+class ModalResult:
+    """
+    ## Description
+    Lowest modes of a beam, returned by `modal_analysis`.
+
+    ### Attributes
+    - `fe` = `FEModel` used
+    - `omega` = Circular frequencies (rad/s), ascending
+    - `frequencies` = Natural frequencies (Hz)
+    - `periods` = Natural periods (s)
+    - `vectors` = Mass normalised mode vectors of shape `(k, fe.ndofs)` (`vector @ M @ vector = 1`)
+    - `x` = Node positions
+    - `shapes` = Nodal deflection of every mode, shape `(k, len(x))`
+    """
+
+    def __init__(self, fe: FEModel, omega, vectors):
+        self.fe = fe
+        self.omega = omega
+        self.frequencies = omega/(2*np.pi)
+        with np.errstate(divide='ignore'):
+            self.periods = 1/self.frequencies
+        self.vectors = vectors
+        self.x = fe.x
+        self.shapes = vectors[:, fe.deflection_dofs]
+
+    def __len__(self):
+        return len(self.omega)
+
+    def _field(self, x, derivative: int, factor: float = 1.0):
+        dofs, N = self.fe.interpolation(x, derivative)
+        return factor*np.einsum('kij,ij->ki', self.vectors[:, dofs], N)
+
+    def shape_at(self, x):
+        """Deflection of every mode at positions `x`, shape `(k, len(x))`"""
+        return self._field(x, 0)
+
+    def moment_at(self, x):
+        """Bending moment (kNm, sagging positive) of every mode per unit modal coordinate, shape `(k, len(x))`"""
+        return self._field(x, 2, self.fe.EI)
+
+    def shear_at(self, x):
+        """Shear force (kN) of every mode per unit modal coordinate (constant within each element), shape `(k, len(x))`"""
+        return self._field(x, 3, self.fe.EI)
+
+
+def modal_analysis(beam: object, elements: object, k: int = 5, nelems: int = 200, mass: float = None):
+    """
+    ### Description
+    Lowest `k` natural frequencies and mode shapes of a beam.
+
+    #### Arguments
+    - `beam` = `Beam` object with `E` and `I`
+    - `elements` = `Reaction` and `Hinge` objects (other objects are ignored)
+    - `k:int = 5` = Number of modes
+    - `nelems:int = 200` = Approximate number of finite elements. Cubic elements converge fast (200 give the
+        lowest modes to about 7 digits); the condition number grows like `nelems**4`, so more than a few
+        thousand elements lose accuracy in double precision
+    - `mass:float = None` = Mass per length (kg/m), default `beam.mass`
+
+    Returns `ModalResult`
+    """
+    mass = beam.mass if mass is None else mass
+    if beam.E is None or beam.I is None or not mass:
+        raise ValueError("Modal analysis requires E, I and mass of the beam")
+    if any(callable(v) or np.ndim(v) for v in (beam.E, beam.I)):
+        raise ValueError("Modal analysis requires constant E and I")
+    fe = FEModel(beam.length, elements, beam.E*beam.I, mass, nelems)
+    free = fe.free
+    k = min(int(k), len(free))
+    K, M = fe.K[free][:, free], fe.M[free][:, free]
+
+    if isinstance(K, np.ndarray) or k >= len(free) - 1:
+        # small problems (or no scipy): dense solve after Cholesky of the mass matrix
+        K, M = (np.asarray(A.todense()) if not isinstance(A, np.ndarray) else A for A in (K, M))
+        C = np.linalg.cholesky(M)
+        Ci = np.linalg.inv(C)
+        w2, v = np.linalg.eigh(Ci @ K @ Ci.T)
+        w2, v = w2[:k], Ci.T @ v[:, :k]
+    else:
+        from scipy.sparse.linalg import eigsh
+        # shift slightly below zero (relative to the scale EI/(m L^4) of the fundamental) so that the
+        # factorised matrix is regular even for mechanisms
+        shift = -1e-3*fe.EI*1e3/(fe.mass*fe.length**4)
+        w2, v = eigsh(K, k=k, M=M, sigma=shift, which='LM')
+        order = np.argsort(w2)
+        w2, v = w2[order], v[:, order]
+
+    vectors = np.zeros((k, fe.ndofs))
+    vectors[:, free] = v.T
+    # sign convention: largest deflection of every mode is positive
+    shapes = vectors[:, fe.deflection_dofs]
+    sign = np.sign(shapes[np.arange(k), np.argmax(np.abs(shapes), axis=1)])
+    vectors *= np.where(sign == 0, 1, sign)[:, None]
+    return ModalResult(fe, np.sqrt(np.clip(w2, 0, None)), vectors)
@@ -0,0 +1,159 @@
+"""
+Module for an immutable beam model and a pure solver
+
+`Beam` accumulates solver state (`fx`, `fy`, `m`, `shear_fn`, `solved_rxns`, ...) and `calculate_reactions`
+writes the solved values into the `Reaction` objects, so a beam can be solved only once and never from
+several threads. `BeamModel` is a frozen description made of numbers and tuples only, and `solve(model)`
+returns a new `Solution` without touching the model or any shared state. Models are hashable and
+picklable; solutions are picklable and their arrays are read only, so one model can be shared by any
+number of threads.
+
+#### Example
+```
+model = BeamModel.from_elements(5, (Reaction(0, 'h', 'A'), Reaction(5, 'r', 'B'), PointLoad(2, 10, True)))
+with ThreadPoolExecutor(8) as pool:
+    solutions = list(pool.map(solve, [model]*1000))
+solutions[0].reactions['R_A_y']
+```
+"""
+from collections import namedtuple
+from dataclasses import dataclass
+
+import numpy as np
+
+from .beam import UDL, UVL, Hinge, PointLoad, PointMoment, Reaction
+from .stability import require_determinate_arrays
+from .superposition import BeamArrays, _support_type
+
+Solution = namedtuple('Solution', ['model', 'reactions', 'x', 'shear', 'moment', 'deflection', 'extrema'])
+Solution.__doc__ = """
+Result of `solve`:
+- `model` = The solved `BeamModel`
+- `reactions:dict` = Reactions labelled like `'R_A_x'`, `'R_A_y'`, `'M_A'` (as in `ParameterSweep`)
+- `x, shear, moment` = Read only arrays of `model.ndivs` stations from `0` to `length`
+- `deflection` = Read only array of deflection (`None` if `E` or `I` is unknown)
+- `extrema:dict` = `max_moment, x_max_moment, min_moment, ...` located exactly (see `BeamArrays.extrema`)
+"""
+
+
+@dataclass(frozen=True)
+class BeamModel:
+    """
+    ## Description
+    Immutable description of a beam, its supports and loads. Loads are stored by their signed components,
+    with the same sign conventions as `beam.py` (upward and counter clockwise positive).
+
+    ### Arguments
+    - `length:float`
+    - `supports:tuple` = `(name, type, pos)` for each support, type as for `Reaction`
+    - `hinges:tuple = ()` = `(pos, side)` for each internal hinge
+    - `point_loads:tuple = ()` = `(pos, fy, fx)` for each point load
+    - `moments:tuple = ()` = `(pos, value)` for each point moment
+    - `distributed:tuple = ()` = `(start, end, wstart, wend)` for each distributed load
+    - `E:float = None`, `I:float = None` = Needed for deflection (constant; arrays or functions raise `ValueError`)
+    - `ndivs:int = 1000` = Number of stations of solution arrays
+
+    Use `dataclasses.replace(model, ...)` for a changed copy.
+    """
+    length: float
+    supports: tuple
+    hinges: tuple = ()
+    point_loads: tuple = ()
+    moments: tuple = ()
+    distributed: tuple = ()
+    E: float = None
+    I: float = None
+    ndivs: int = 1000
+
+    def __post_init__(self):
+        def freeze(items, n):
+            items = tuple(tuple(item) for item in items)
+            if any(len(item) != n for item in items):
+                raise ValueError(f"Expected tuples of {n} values")
+            return items
+
+        set_field = object.__setattr__  # the only place fields are written
+        set_field(self, 'length', float(self.length))
+        set_field(self, 'supports', tuple((str(name), _support_type(stype), float(pos))
+                                          for (name, stype, pos) in freeze(self.supports, 3)))
+        set_field(self, 'hinges', tuple((float(pos), side.lower()[0]) for (pos, side) in freeze(self.hinges, 2)))
+        for (name, n) in (('point_loads', 3), ('moments', 2), ('distributed', 4)):
+            set_field(self, name, tuple(tuple(float(v) for v in item) for item in freeze(getattr(self, name), n)))
+        for name in ('E', 'I'):
+            value = getattr(self, name)
+            if value is not None:
+                if callable(value) or np.ndim(value):
+                    raise ValueError(f"BeamModel requires a constant {name} (see nonprismatic_solve for varying EI)")
+                set_field(self, name, float(value))
+        set_field(self, 'ndivs', int(self.ndivs))
+        if self.length <= 0:
+            raise ValueError("Beam length must be positive")
+        if self.ndivs < 2:
+            raise ValueError("ndivs must be at least 2")
+
+    @classmethod
+    def from_elements(cls, length: float, elements: object, E: float = None, I: float = None, ndivs: int = 1000):
+        """
+        ### Description
+        Reads (without modifying) the objects that would be passed to `Beam.fast_solve`.
+        """
+        return cls(length,
+                   supports=[(r.pos_sym, r.type, r.pos) for r in elements if isinstance(r, Reaction)],
+                   hinges=[(h.pos, h.side) for h in elements if isinstance(h, Hinge)],
+                   point_loads=[(p.pos, p.load_y, p.load_x) for p in elements if isinstance(p, PointLoad)],
+                   moments=[(m.pos, m.mom) for m in elements if isinstance(m, PointMoment)],
+                   distributed=[(u.start, u.end, u.loadpm, u.loadpm) for u in elements if isinstance(u, UDL)] +
+                   [(u.start, u.end, u.startload, u.endload) for u in elements if isinstance(u, UVL)],
+                   E=E, I=I, ndivs=ndivs)
+
+    @classmethod
+    def from_beam(cls, beam: object, elements: object):
+        """Same as `from_elements` taking length, `E`, `I` and `ndivs` from a `Beam` object"""
+        return cls.from_elements(beam.length, elements, beam.E, beam.I, beam.ndivs)
+
+    def arrays(self):
+        """New single beam `BeamArrays` of this model"""
+        point = np.array(self.point_loads, dtype=float).reshape(-1, 3).T
+        moment = np.array(self.moments, dtype=float).reshape(-1, 2).T
+        dist = np.array(self.distributed, dtype=float).reshape(-1, 4).T
+        return BeamArrays(self.length, [s[1] for s in self.supports], [s[2] for s in self.supports],
+                          [h[1] for h in self.hinges], [h[0] for h in self.hinges],
+                          point_pos=point[0], point_fy=point[1], point_fx=point[2],
+                          moment_pos=moment[0], moment_val=moment[1],
+                          dist_start=dist[0], dist_end=dist[1], dist_wstart=dist[2], dist_wend=dist[3])
+
+
+def _read_only(values):
+    values = np.ascontiguousarray(values)
+    values.setflags(write=False)
+    return values
+
+
+def solve(model: BeamModel):
+    """
+    ### Description
+    Solves `model` numerically. Pure function: nothing but the returned `Solution` is created or changed,
+    so it can be called concurrently from any number of threads with the same model.
+
+    Raises `ValueError` if the beam is statically indeterminate or unstable
+
+    Returns `Solution`
+    """
+    arrays = model.arrays()
+    require_determinate_arrays(arrays, horizontal=True)  # as `Beam.fast_solve`
+    rx, ry, mom = arrays.solve_reactions()
+    reactions = {}
+    for i, (name, stype, _) in enumerate(model.supports):
+        if stype != 'roller':
+            reactions[f"R_{name}_x"] = float(rx[0, i])
+        reactions[f"R_{name}_y"] = float(ry[0, i])
+        if stype == 'fixed':
+            reactions[f"M_{name}"] = float(mom[0, i])
+
+    x = np.linspace(0, model.length, model.ndivs)
+    deflection = None
+    if model.E is not None and model.I is not None:
+        deflection = _read_only(arrays.deflection_at(x, ry, mom, model.E*model.I)[0][0])
+    extrema = {name: float(value[0]) for (name, value) in arrays.extrema(ry, mom).items()}
+    return Solution(model, reactions, _read_only(x), _read_only(arrays.shear_at(x, ry)[0]),
+                    _read_only(arrays.moment_at(x, ry, mom)[0]), deflection, extrema)
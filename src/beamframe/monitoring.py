@@ -0,0 +1,271 @@
+"""
+Module for streaming structural health monitoring of a beam
+
+Moving axle loads (positions and weights) arrive as a stream of snapshots. For a beam with fixed
+supports the response to a unit load is precomputed once (`UnitResponse`), so each snapshot costs a
+few small matrix products. Moments and shears at monitored sections are fed to online rainflow
+counters (`RainflowCounter`) which keep only the unclosed residue of the signal, so memory stays
+constant however long the stream runs.
+
+#### Example
+```
+b = Beam(20)
+supports = (Reaction(0, 'h', 'A'), Reaction(20, 'r', 'B'))
+response = UnitResponse(b, supports, sections=(5, 10, 15))
+pipeline = MonitoringPipeline(response, moment_scale=1/Z, sn_constant=2e12)
+for block in pipeline.feed(snapshots):   # snapshots yields (positions, weights)
+    ...
+pipeline.close()
+print(pipeline.damage())
+```
+"""
+import bisect
+from collections import namedtuple
+from itertools import islice
+
+import numpy as np
+
+from .beam import Hinge, Reaction
+from .superposition import BeamArrays
+
+MonitorBlock = namedtuple('MonitorBlock', ['shear', 'moment', 'damage'])
+MonitorBlock.__doc__ = """
+Result of one block of snapshots:
+- `shear, moment` = arrays of shape `(n_snapshots, n_sections)`
+- `damage` = dict of cumulative Miner's damage per section for each counted quantity
+"""
+
+
+class UnitResponse:
+    """
+    ## Description
+    Precomputed response of a beam with fixed supports to unit point loads.
+
+    ### Arguments
+    - `beam` = `Beam` object (only its length is used)
+    - `elements` = List or tuple of `Reaction` (and optional `Hinge`) objects. Other objects are ignored.
+    - `sections` = Positions at which shear force and bending moment are monitored
+
+    ### Attributes
+    - `inverse` = Matrix mapping equilibrium right hand side to unknown reactions
+    - `shear_coeff, moment_coeff` = Contribution of each unknown reaction to shear and moment at sections
+    """
+
+    def __init__(self, beam: object, elements: object, sections: object):
+        supports = [e for e in elements if isinstance(e, (Reaction, Hinge))]
+        self.length = beam.length
+        self.arrays = BeamArrays.from_elements(beam.length, supports)
+        A = self.arrays.equilibrium_matrix()[0]
+        if A.shape[0] != A.shape[1] or np.linalg.matrix_rank(A) < A.shape[0]:
+            raise ValueError(
+                "Unit responses require a statically determinate and stable beam")
+        self.inverse = -np.linalg.inv(A)
+        self.sections = np.atleast_1d(np.asarray(sections, dtype=float))
+
+        n_unknowns = len(self.arrays.unknowns)
+        self.shear_coeff = np.zeros((self.sections.size, n_unknowns))
+        self.moment_coeff = np.zeros((self.sections.size, n_unknowns))
+        for col, (i, kind) in enumerate(self.arrays.unknowns):
+            arm = self.sections - self.arrays.support_pos[0, i]
+            if kind == 'ry':
+                self.shear_coeff[:, col] = arm >= 0
+                self.moment_coeff[:, col] = np.maximum(arm, 0)
+            else:
+                self.moment_coeff[:, col] = -(arm >= 0)
+
+    def point_rhs(self, pos):
+        """
+        ### Description
+        Equilibrium right hand side for unit upward point loads at `pos`.
+        Returns array of shape `pos.shape + (n_equations,)`
+        """
+        pos = np.asarray(pos, dtype=float)
+        rhs = [np.ones_like(pos), pos]
+        for j, side in enumerate(self.arrays.hinge_sides):
+            h = self.arrays.hinge_pos[0, j]
+            on_side = pos < h if side == 'l' else pos > h
+            rhs.append(on_side*(pos - h))
+        return np.stack(rhs, axis=-1)
+
+    def respond(self, positions, weights):
+        """
+        ### Description
+        Shear force and bending moment at monitored sections for a batch of snapshots.
+
+        #### Arguments
+        - `positions` = Axle positions, shape `(n_snapshots, n_axles)`
+        - `weights` = Axle weights acting downward, same shape as `positions`.
+            Axles off the beam or with `nan` position are ignored.
+
+        Returns tuple `(shear, moment)` of arrays with shape `(n_snapshots, n_sections)`
+        """
+        positions = np.atleast_2d(np.asarray(positions, dtype=float))
+        on_beam = (positions >= 0) & (positions <= self.length)
+        fy = np.where(on_beam, -np.asarray(weights, dtype=float), 0.0)
+        positions = np.where(on_beam, positions, 0.0)
+
+        rhs = np.einsum('ska,sk->sa', self.point_rhs(positions), fy)
+        unknowns = rhs @ self.inverse.T
+        arm = self.sections[None, :, None] - positions[:, None, :]
+        shear = unknowns @ self.shear_coeff.T + \
+            np.einsum('sck,sk->sc', (arm >= 0).astype(float), fy)
+        moment = unknowns @ self.moment_coeff.T + \
+            np.einsum('sck,sk->sc', np.maximum(arm, 0), fy)
+        return shear, moment
+
+
+class RainflowCounter:
+    """
+    ## Description
+    Online rainflow cycle counter (four point method of ASTM E1049) with Miner's damage sum.
+
+    Only the unclosed residue of reversals is stored, so memory does not grow with signal length.
+
+    ### Arguments
+    - `scale:float = 1.0` = Factor converting signal range to stress range (e.g. `1/Z` for moments)
+    - `sn_slope:float = 3.0` = Inverse slope `m` of S-N curve `N = sn_constant / S**m`
+    - `sn_constant:float = 1.0` = Constant of S-N curve
+    - `cutoff:float = 0.0` = Stress ranges below this value cause no damage
+    - `bins = None` = Optional edges of stress range histogram
+
+    ### Attributes
+    - `cycles:float` = Number of counted cycles (half cycles count as 0.5)
+    - `damage:float` = Miner's damage sum
+    - `histogram` = Cycle counts per stress range bin (if `bins` given)
+    """
+
+    def __init__(self, scale: float = 1.0, sn_slope: float = 3.0, sn_constant: float = 1.0, cutoff: float = 0.0, bins=None):
+        self.scale = scale
+        self.sn_slope = sn_slope
+        self.sn_constant = sn_constant
+        self.cutoff = cutoff
+        self.bins = None if bins is None else list(bins)
+        self.histogram = None if bins is None else np.zeros(
+            len(self.bins) - 1)
+
+        self.cycles = 0.0
+        self.damage = 0.0
+        self.residue = []  # unclosed reversals
+        self._last = None  # last sample seen
+        self._dir = 0  # sign of last non zero slope
+
+    def _count(self, rng: float, count: float):
+        srange = abs(rng*self.scale)
+        self.cycles += count
+        if srange >= self.cutoff and srange > 0:
+            self.damage += count * srange**self.sn_slope / self.sn_constant
+        if self.bins is not None:
+            i = bisect.bisect_right(self.bins, srange) - 1
+            if 0 <= i < len(self.histogram):
+                self.histogram[i] += count
+
+    def push(self, values):
+        """
+        ### Description
+        Feeds a chunk of samples. Reversals are extracted with numpy; only reversals enter the counting loop.
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        if values.size == 0:
+            return
+        if self._last is None:
+            self.residue.append(values[0])
+            self._last = values[0]
+        x = np.concatenate(([self._last], values))
+        slope = np.concatenate(([self._dir], np.sign(np.diff(x))))
+        # forward fill zero slopes (plateaus keep previous direction)
+        idx = np.maximum.accumulate(
+            np.where(slope != 0, np.arange(slope.size), 0))
+        slope = slope[idx]
+        turning = (slope[:-1] != 0) & (slope[1:] != slope[:-1])
+        for point in x[:-1][turning]:
+            self._add_reversal(point)
+        self._last = x[-1]
+        self._dir = slope[-1]
+
+    def _add_reversal(self, point: float):
+        stack = self.residue
+        stack.append(point)
+        while len(stack) >= 4:
+            inner = abs(stack[-2] - stack[-3])
+            if inner <= abs(stack[-3] - stack[-4]) and inner <= abs(stack[-1] - stack[-2]):
+                self._count(inner, 1.0)
+                del stack[-3:-1]
+            else:
+                break
+
+    def close(self):
+        """
+        ### Description
+        Ends the signal: last sample becomes a reversal and the residue is counted as half cycles.
+        """
+        if self._last is not None and self.residue and self._last != self.residue[-1]:
+            self._add_reversal(self._last)
+        for a, b in zip(self.residue[:-1], self.residue[1:]):
+            self._count(b - a, 0.5)
+        self.residue = self.residue[-1:]
+        self._dir = 0
+
+
+class MonitoringPipeline:
+    """
+    ## Description
+    Generator based pipeline from load snapshots to section forces and fatigue damage.
+
+    ### Arguments
+    - `response` = `UnitResponse` object of the monitored beam
+    - `block:int = 1024` = Number of snapshots evaluated together
+    - `moment_scale:float = 1.0` = Factor converting moment to stress, `None` to skip counting moments
+    - `shear_scale:float = None` = Factor converting shear to stress, `None` to skip counting shears
+    - `kwargs` = Passed to every `RainflowCounter` (`sn_slope, sn_constant, cutoff, bins`)
+
+    ### Attributes
+    - `counters:dict` = `{'moment': [...], 'shear': [...]}` one `RainflowCounter` per section
+    - `processed:int` = Number of snapshots processed so far
+    """
+
+    def __init__(self, response: UnitResponse, block: int = 1024, moment_scale: float = 1.0, shear_scale: float = None, **kwargs):
+        self.response = response
+        self.block = block
+        self.counters = {}
+        for name, scale in (('moment', moment_scale), ('shear', shear_scale)):
+            if scale is not None:
+                self.counters[name] = [RainflowCounter(scale=scale, **kwargs)
+                                       for _ in range(response.sections.size)]
+        self.processed = 0
+
+    def damage(self):
+        """Returns dict of Miner's damage per section for each counted quantity."""
+        return {name: np.array([c.damage for c in counters]) for (name, counters) in self.counters.items()}
+
+    def feed(self, snapshots: object):
+        """
+        ### Description
+        Lazily consumes `(positions, weights)` snapshots and yields a `MonitorBlock` per block.
+        Snapshots may have different numbers of axles.
+        """
+        snapshots = iter(snapshots)
+        while True:
+            chunk = list(islice(snapshots, self.block))
+            if not chunk:
+                return
+            n_axles = max(np.size(pos) for (pos, _) in chunk)
+            positions = np.full((len(chunk), n_axles), np.nan)
+            weights = np.zeros((len(chunk), n_axles))
+            for i, (pos, wt) in enumerate(chunk):
+                positions[i, :np.size(pos)] = pos
+                weights[i, :np.size(wt)] = wt
+
+            shear, moment = self.response.respond(positions, weights)
+            for name, values in (('moment', moment), ('shear', shear)):
+                for col, counter in enumerate(self.counters.get(name, ())):
+                    counter.push(values[:, col])
+            self.processed += len(chunk)
+            yield MonitorBlock(shear, moment, self.damage())
+
+    def close(self):
+        """Counts the residue of every counter as half cycles. Returns final damage."""
+        for counters in self.counters.values():
+            for counter in counters:
+                counter.close()
+        return self.damage()
+
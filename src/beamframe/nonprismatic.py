@@ -0,0 +1,152 @@
+"""
+Module for non-prismatic beams (flexural rigidity varying along the beam)
+
+Haunched and tapered members have `E*I` depending on x, so Macaulay's closed form double integral no longer
+applies. Here bending moment is evaluated on a grid (supports, loads and hinges are grid points, with both
+sides of every jump), curvature `M/EI` is integrated cumulatively to slope and again to deflection, and the
+integration constants (plus a rotation jump at every internal hinge) follow from the support conditions.
+
+Statically indeterminate beams work the same way: the moment is the moment of the loads plus the moment of
+every unknown reaction, each of them integrated in the same vectorised pass, and equilibrium together with
+the support conditions is one small linear system. Everything is a few numpy passes over the grid.
+
+#### Example
+```
+b = Beam(10, E=30e6, I=lambda x: 0.01*(1 + (x - 5)**2/25))     # haunched at both ends
+elements = (Reaction(0, 'f', 'A'), Reaction(10, 'f', 'B'), UDL(0, 20, 10))
+result = nonprismatic_solve(b, elements)
+result.deflection, result.moment, elements[0].mom_val
+```
+"""
+import numpy as np
+
+from .beam import Reaction
+from .superposition import BeamArrays, along_beam
+
+
+class NonPrismaticResult:
+    """
+    ## Description
+    Result of `nonprismatic_solve`. Arrays are over `beam.xbeam` (zero left of the beam) like `Beam.shear_values`.
+
+    ### Attributes
+    - `x` = Positions
+    - `deflection, slope` = Deflection (m, upward positive) and slope
+    - `moment, shear` = Bending moment (kNm, sagging positive) and shear force (kN)
+    - `EI` = Flexural rigidity at `x` (kNm²)
+    """
+
+    def __init__(self, x, deflection, slope, moment, shear, EI):
+        self.x = x
+        self.deflection = deflection
+        self.slope = slope
+        self.moment = moment
+        self.shear = shear
+        self.EI = EI
+
+
+def flexural_rigidity(beam: object, EI: object = None):
+    """
+    ### Description
+    Function of x giving `E*I` of `beam`. `E` and `I` (or `EI`, if given) may each be a number, an array of
+    values at equally spaced points from `0` to `beam.length`, or a function of x.
+    """
+    if EI is not None:
+        return along_beam(EI, beam.length)
+    if beam.E is None or beam.I is None:
+        raise ValueError("Deflection requires E and I of the beam")
+    E, I = along_beam(beam.E, beam.length), along_beam(beam.I, beam.length)
+    return lambda x: E(x)*I(x)
+
+
+def cumulative_integrals(x, curvature):
+    """
+    ### Description
+    Slope and deflection with zero value and slope at `x[0]`, from `curvature` (shape `(..., len(x))`).
+    Slope uses the trapezoidal rule; deflection uses the trapezoidal rule with its end correction
+    (exact for a quadratic slope), so both converge with the square of the grid spacing.
+    """
+    h = np.diff(x)
+    k0, k1 = curvature[..., :-1], curvature[..., 1:]
+    zero = np.zeros(curvature.shape[:-1] + (1,))
+    slope = np.concatenate([zero, np.cumsum(h*(k0 + k1)/2, axis=-1)], axis=-1)
+    dy = h*(slope[..., :-1] + slope[..., 1:])/2 - h**2*(k1 - k0)/12
+    return slope, np.concatenate([zero, np.cumsum(dy, axis=-1)], axis=-1)
+
+
+def nonprismatic_solve(beam: object, loads_list: object, EI: object = None, ndivs: int = 2001):
+    """
+    ### Description
+    Solves a beam with flexural rigidity varying along its length (statically determinate or not).
+    Sets `rx_val, ry_val, mom_val` of the `Reaction` objects and `reactions_list`, `shear_values`,
+    `moment_values` and `deflection_values` of `beam` (over `beam.xbeam`).
+
+    #### Arguments
+    - `beam` = `Beam` object; `E` and `I` may be numbers, arrays or functions of x
+    - `loads_list` = List (or tuple) of beam objects like Reactions, Loads, Moments, Internal Hinge
+    - `EI = None` = Flexural rigidity (kNm²) instead of `beam.E*beam.I`, number, array or function of x
+    - `ndivs:int = 2001` = Equally spaced integration points besides the stations of `beam.xbeam` and breakpoints.
+        Errors fall with the square of the spacing; a jump of `EI` between grid points adds an error
+        proportional to the spacing
+
+    Returns `NonPrismaticResult`
+    """
+    stiffness = flexural_rigidity(beam, EI)
+    arrays = BeamArrays.from_elements(beam.length, loads_list)
+    L = float(beam.length)
+    stations = beam.xbeam[beam.beam_0:]
+    bp = np.clip(arrays.breakpoints()[0], 0, L)
+    x = np.unique(np.concatenate([np.linspace(0, L, ndivs), stations, bp, np.clip(bp - 1e-9*L, 0, L)]))
+    EIx = stiffness(x)
+    if np.any(EIx <= 0):
+        raise ValueError("Flexural rigidity must be positive")
+
+    # moment of the loads (row 0) and of every unknown reaction of unit value (one row each)
+    n = len(arrays.unknowns)
+    zeros = np.zeros((1, len(arrays.support_types)))
+    _, ry, mom = arrays.scatter_reactions(np.eye(n)[:, None, :])
+    supports = BeamArrays(L, arrays.support_types, arrays.support_pos, arrays.hinge_sides, arrays.hinge_pos)
+    moments = np.vstack([arrays.moment_at(x, zeros, zeros)] +
+                        [supports.moment_at(x, ry[j], mom[j]) for j in range(n)])
+    slopes, ys = cumulative_integrals(x, moments/EIx)
+
+    # unknowns: reactions, then constants (C1, C2, rotation jump at each hinge) of y = Y + C1 + C2*x + ...
+    at = np.searchsorted(x, arrays.support_pos[0])
+    K = arrays.deflection_matrix()[0]
+    A = np.zeros((n + K.shape[1], n + K.shape[1]))
+    b = np.zeros(len(A))
+    equilibrium = arrays.equilibrium_matrix()[0]
+    A[:len(equilibrium), :n] = equilibrium
+    b[:len(equilibrium)] = -arrays.load_vector()[0]
+    for row, (i, kind) in enumerate(arrays.unknowns):
+        values = ys[:, at[i]] if kind == 'ry' else slopes[:, at[i]]
+        A[len(equilibrium) + row, :n] = values[1:]
+        A[len(equilibrium) + row, n:] = K[row]
+        b[len(equilibrium) + row] = -values[0]
+    try:
+        sol = np.linalg.solve(A, b)
+    except np.linalg.LinAlgError:
+        raise ValueError("Beam is geometrically unstable: equations are singular") from None
+
+    R, C = sol[:n], sol[n:]
+    rx, ry, mom = arrays.scatter_reactions(R[None])
+    arm = x[:, None] - arrays.hinge_pos[0][None, :]
+    deflection = ys[0] + R @ ys[1:] + C[0] + C[1]*x + (C[2:]*np.maximum(arm, 0)).sum(axis=1)
+    slope = slopes[0] + R @ slopes[1:] + C[1] + (C[2:]*(arm >= 0)).sum(axis=1)
+
+    rxns = [e for e in loads_list if isinstance(e, Reaction)]
+    for i, r in enumerate(rxns):
+        r.rx_val, r.ry_val, r.mom_val = float(rx[0, i]), float(ry[0, i]), float(mom[0, i])
+    beam.reactions_list = rxns
+
+    def full(values):
+        out = np.zeros(len(beam.xbeam))
+        out[beam.beam_0:] = values
+        return out
+
+    i = np.searchsorted(x, stations)
+    beam.shear_values = full(arrays.shear_at(stations, ry)[0])
+    beam.moment_values = full(arrays.moment_at(stations, ry, mom)[0])
+    beam.deflection_values = full(deflection[i])
+    return NonPrismaticResult(beam.xbeam, beam.deflection_values, full(slope[i]), beam.moment_values,
+                              beam.shear_values, full(EIx[i]))
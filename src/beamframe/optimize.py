@@ -0,0 +1,467 @@
+"""
+Module for support position and load layout optimization
+
+Reactions, shear, moment and deflection of a determinate beam are linear in loads, so the derivative
+with respect to a position or magnitude is itself the response to an equivalent "tangent" load:
+- moving a point load `P` is a point moment `P` at its position
+- changing its magnitude is a unit point load
+- moving a support with reaction `R` is a point moment `R` at the support
+- moving the end of a distributed load is a point load `w_end` plus a linear load
+
+All tangents of all parameters are solved as one batch of `BeamArrays`. Peaks are taken over a fixed set
+of candidate points (stations, both sides of breakpoints and zero crossings of shear or slope), so the
+minimax problem becomes one linear constraint per candidate point after linearization. It is solved by
+sequential linear programming in a trust region (`scipy.optimize.linprog`), which suits the kinks of a peak
+value better than quasi-Newton methods.
+
+#### Example
+```
+b = Beam(10)
+ra, rb = Reaction(0, 'h', 'A'), Reaction(10, 'r', 'B')
+udl = UDL(0, 10, 10)
+opt = LayoutOptimizer(b, (ra, rb, udl))
+opt.vary(ra, 'pos', 0, 4)
+opt.vary(rb, 'pos', 6, 10)
+result = opt.optimize('moment')
+```
+"""
+import numpy as np
+
+from .beam import UDL, UVL, Hinge, PointLoad, PointMoment, Reaction
+from .superposition import BeamArrays
+from .sweep import ParameterSweep
+
+
+class OptimizeResult:
+    """
+    ## Description
+    Result of `LayoutOptimizer.optimize`
+
+    ### Attributes
+    - `theta` = Optimal parameter values (in order of `vary` calls)
+    - `params:tuple` = Labels of parameters
+    - `peak:float` = Optimal value of objective
+    - `initial_peak:float` = Value of objective at starting point
+    - `nfev:int` = Number of evaluations of beam response (with gradients)
+    - `success:bool`, `message:str`
+    """
+
+    def __init__(self, theta, params, peak, initial_peak, nfev, success, message):
+        self.theta = theta
+        self.params = params
+        self.peak = peak
+        self.initial_peak = initial_peak
+        self.nfev = nfev
+        self.success = success
+        self.message = message
+
+    def __repr__(self):
+        values = ', '.join(f"{p}={v:.6g}" for (p, v) in zip(self.params, self.theta))
+        return f"OptimizeResult({values}, peak={self.peak:.6g}, nfev={self.nfev})"
+
+
+class LayoutOptimizer:
+    """
+    ## Description
+    Analytic gradients and bounded optimization of support positions and load layout.
+
+    ### Arguments
+    - `beam` = `Beam` object
+    - `elements` = List or tuple of all objects that would be passed to `Beam.fast_solve`
+    - `E, I` = Optional modulus of elasticity and second moment of area (defaults to `beam.E`, `beam.I`),
+        needed for deflection. Both must be numbers; varying stiffness raises `ValueError`
+    - `ndivs:int = 201` = Number of stations at which peaks are checked (besides breakpoints)
+    """
+
+    def __init__(self, beam: object, elements: object, E: float = None, I: float = None, ndivs: int = 201):
+        self.beam = beam
+        self.sweep = ParameterSweep(beam, elements)
+        E = beam.E if E is None else E
+        I = beam.I if I is None else I
+        if any(callable(v) or np.ndim(v) for v in (E, I) if v is not None):
+            raise ValueError("Layout optimization requires constant E and I (see nonprismatic_solve for varying EI)")
+        self.EI = float(E)*float(I) if E is not None and I is not None else None
+        if self.EI is not None and self.EI <= 0:
+            raise ValueError("E and I must be positive")
+        self.ndivs = ndivs
+        self.lower, self.upper = [], []
+        self.nfev = 0
+
+    @property
+    def params(self):
+        return tuple(name for (name, _, _, _) in self.sweep.varied)
+
+    def vary(self, obj: object, attr: str, lower: float, upper: float, name: str = None):
+        """
+        ### Description
+        Adds a design parameter with bounds. Parameters are as for `ParameterSweep.vary`
+        (beam length cannot be optimized).
+        """
+        if obj is self.beam:
+            raise ValueError("Beam length cannot be optimized, vary support positions instead")
+        self.sweep.vary(obj, attr, [_current_value(obj, attr)], name)
+        self.lower.append(float(lower))
+        self.upper.append(float(upper))
+
+    def initial(self):
+        """Current values of parameters taken from the elements"""
+        return np.array([values[0] for (_, _, _, values) in self.sweep.varied])
+
+    def _tangents(self, arrays, ry, mom):
+        """
+        Batch of `BeamArrays` (one row per parameter) describing tangent loads, the extra right hand side
+        of equilibrium for moving hinges and the indices of breakpoints that move with each parameter.
+        """
+        base = self.sweep.base
+        n = len(self.sweep.varied)
+        nh = len(base.hinge_sides)
+        pp, pf, px = np.zeros((n, 2)), np.zeros((n, 2)), np.zeros((n, 2))  # two point loads
+        mp, mv = np.zeros((n, 1)), np.zeros((n, 1))  # one point moment
+        ds, de, dws, dwe = np.zeros((n, 1)), np.zeros((n, 1)), np.zeros((n, 1)), np.zeros((n, 1))
+        hinge_rhs = np.zeros((n, 2 + nh))
+        kinks = []  # (param, position, EI*y kink coefficient) of moving point moments
+        moving = [[] for _ in range(n)]  # names of moving breakpoints
+
+        for k, (_, obj, attr, _) in enumerate(self.sweep.varied):
+            kind, col = base.columns[obj]
+            if kind == 'support':
+                pos = arrays.support_pos[0, col]
+                mp[k], mv[k] = pos, ry[0, col]
+                kinks.append((k, pos, mom[0, col]))
+                moving[k].append(('support', col))
+            elif kind == 'hinge':
+                hinge_rhs[k, 2+col] = -_side_force(arrays, ry, col)
+                moving[k].append(('hinge', col))
+            elif kind == 'point':
+                pos, fy = arrays.point_pos[0, col], arrays.point_fy[0, col]
+                if attr == 'pos':
+                    mp[k], mv[k] = pos, fy
+                    moving[k].append(('point', col))
+                else:
+                    sign = -1 if obj.inverted else 1
+                    angle = obj.inclination*np.pi/180
+                    pp[k, 0], pf[k, 0], px[k, 0] = pos, sign*np.sin(angle), sign*np.cos(angle)
+            elif kind == 'moment':
+                pos, m = arrays.moment_pos[0, col], arrays.moment_val[0, col]
+                if attr == 'pos':
+                    kinks.append((k, pos, m))
+                    moving[k].append(('moment', col))
+                else:
+                    mp[k], mv[k] = pos, 1.0 if obj.ccw else -1.0
+            else:
+                s, e = arrays.dist_start[0, col], arrays.dist_end[0, col]
+                ws, we = arrays.dist_wstart[0, col], arrays.dist_wend[0, col]
+                grad = (we - ws)/(e - s) if e != s else 0.0
+                sign = -1 if obj.inverted else 1
+                ds[k], de[k] = s, e
+                if attr == 'start':
+                    pp[k], pf[k] = (s, e), (-ws, we)
+                    dws[k], dwe[k] = -grad, -grad
+                    moving[k] += [('dist_start', col), ('dist_end', col)]
+                elif attr == 'span':
+                    pp[k, 0], pf[k, 0] = e, we
+                    dws[k], dwe[k] = 0.0, -grad
+                    moving[k].append(('dist_end', col))
+                elif attr == 'loadpm':
+                    dws[k], dwe[k] = sign, sign
+                elif attr == 'startload':
+                    dws[k] = sign
+                elif attr == 'endload':
+                    dwe[k] = sign
+
+        tangents = BeamArrays(np.repeat(arrays.length, n), base.support_types, np.repeat(arrays.support_pos, n, axis=0),
+                              base.hinge_sides, np.repeat(arrays.hinge_pos, n, axis=0),
+                              point_pos=pp, point_fy=pf, point_fx=px, moment_pos=mp, moment_val=mv,
+                              dist_start=ds, dist_end=de, dist_wstart=dws, dist_wend=dwe)
+        return tangents, hinge_rhs, kinks, moving
+
+    def _breakpoints(self, arrays):
+        """Named breakpoints of a single beam: list of `((kind, col), position)`"""
+        points = [(('end', 0), 0.0), (('end', 1), arrays.length[0])]
+        for (kind, values) in (('support', arrays.support_pos), ('hinge', arrays.hinge_pos),
+                               ('point', arrays.point_pos), ('moment', arrays.moment_pos),
+                               ('dist_start', arrays.dist_start), ('dist_end', arrays.dist_end)):
+            points += [((kind, col), v) for (col, v) in enumerate(values[0])]
+        return points
+
+    def evaluate(self, theta):
+        """
+        ### Description
+        Reactions, moments and deflections at candidate points together with their derivatives.
+
+        #### Arguments
+        - `theta` = Parameter values in order of `vary` calls
+
+        Returns dict with keys:
+        - `reactions, d_reactions` = values `(n_out,)` and jacobian `(n_out, n_params)` (labels from `ParameterSweep.output_labels`)
+        - `x, moment, d_moment` = candidate points, moments and jacobian `(n_points, n_params)`
+        - `xy, deflection, d_deflection` = same for deflection (only if `E` and `I` known)
+        """
+        self.nfev += 1
+        theta = np.asarray(theta, dtype=float)
+        arrays = self.sweep.batch_arrays(theta[None, :])
+        rx, ry, mom = arrays.solve_reactions()
+        A = arrays.equilibrium_matrix()[0]
+
+        tangents, hinge_rhs, kinks, moving = self._tangents(arrays, ry, mom)
+        dsol = np.linalg.solve(A, -(tangents.load_vector() + hinge_rhs).T).T
+        drx, dry, dmom = tangents.scatter_reactions(dsol)
+
+        # reactions in the same order as sweep outputs
+        values, jac = [], []
+        for i, stype in enumerate(arrays.support_types):
+            if stype != 'roller':
+                values.append(rx[0, i])
+                jac.append(drx[:, i])
+            values.append(ry[0, i])
+            jac.append(dry[:, i])
+            if stype == 'fixed':
+                values.append(mom[0, i])
+                jac.append(dmom[:, i])
+        out = {'reactions': np.array(values), 'd_reactions': np.array(jac)}
+
+        # candidate points: stations, both sides of breakpoints, roots in station cells
+        grid = arrays.length[0]*np.linspace(0, 1, self.ndivs)
+        names = self._breakpoints(arrays)
+        bp = np.clip([v for (_, v) in names], 0, arrays.length[0])
+        eps = 1e-9*arrays.length[0]
+        dxdt = np.zeros((len(theta), 2*len(bp)))
+        for k, movers in enumerate(moving):
+            for m, (name, _) in enumerate(names):
+                if name in movers:
+                    dxdt[k, m] = dxdt[k, len(bp) + m] = 1.0
+
+        # stations lying on a breakpoint move with it (they are kinks otherwise)
+        on_bp = np.abs(grid[:, None] - bp[None, :]) <= eps
+        grid_moved = np.zeros((len(theta), self.ndivs))
+        rows, cols = np.nonzero(on_bp)
+        grid_moved[:, rows] = dxdt[:, cols]
+
+        def candidates(f):
+            """candidate points and their derivative with respect to parameters"""
+            root, cross = _cell_roots(grid, f(grid[None, :])[0], np.sort(bp))
+            moved = np.concatenate([grid_moved, dxdt, np.where(cross, 0.0, grid_moved[:, :-1])], axis=1)
+            return np.concatenate([grid, bp, np.maximum(bp - eps, 0), root]), moved
+
+        x, moved = candidates(lambda x: arrays.shear_at(x, ry))
+        V = arrays.shear_at(x, ry)[0]
+        M = arrays.moment_at(x, ry, mom)[0]
+        dM = tangents.moment_at(x, dry, dmom) + moved*V
+        out.update(x=x, moment=M, d_moment=dM.T)
+
+        if self.EI is not None:
+            xy, moved = candidates(lambda x: arrays.deflection_at(x, ry, mom, self.EI)[1])
+            y, slope = arrays.deflection_at(xy, ry, mom, self.EI)
+            dy = self._deflection_tangent(arrays, ry, mom, tangents, dry, dmom, kinks, moving, xy)
+            dy += moved*slope
+            out.update(xy=xy, deflection=y[0], d_deflection=dy.T)
+        return out
+
+    def _deflection_tangent(self, arrays, ry, mom, tangents, dry, dmom, kinks, moving, x):
+        """Derivative of `EI*y` at `x` for every parameter, divided by `EI`"""
+        n = tangents.batch
+        C = arrays.deflection_constants(ry, mom, self.EI)[0]
+
+        def extra(pts):
+            """kink terms of moving point moments and hinges, and their slopes"""
+            pts = np.atleast_1d(pts)
+            P, dP = np.zeros((n, pts.size)), np.zeros((n, pts.size))
+            for (k, pos, m) in kinks:
+                P[k] += m*np.maximum(pts - pos, 0)
+                dP[k] += m*(pts >= pos)
+            for k, movers in enumerate(moving):
+                for (kind, col) in movers:
+                    if kind == 'hinge':
+                        P[k] -= C[2 + col]*(pts >= arrays.hinge_pos[0, col])
+            return P, dP
+
+        sp = arrays.support_pos[0]
+        Pt, dPt = tangents.particular_at(sp, dry, dmom)
+        Pe, dPe = extra(sp)
+        y, slope = arrays.deflection_at(sp, ry, mom, 1.0)  # EI*y and EI*y'
+        # bending moment at supports, from the side where the beam continues
+        side = np.where(sp >= arrays.length[0], sp - 1e-9*arrays.length[0], sp)
+        M = arrays.moment_at(side, ry, mom)[0]
+
+        rhs = np.zeros((n, len(arrays.unknowns)))
+        for row, (i, kind) in enumerate(arrays.unknowns):
+            dp = np.array([float(('support', i) in movers) for movers in moving])
+            if kind == 'ry':
+                rhs[:, row] = -(Pt[:, i] + Pe[:, i] + slope[0, i]*dp)
+            else:
+                rhs[:, row] = -(dPt[:, i] + dPe[:, i] + M[i]*dp)
+        K = arrays.deflection_matrix()[0]
+        dC = np.linalg.solve(K, rhs.T).T
+
+        P, _ = tangents.particular_at(x, dry, dmom)
+        Pe, _ = extra(x)
+        arm = np.maximum(x[None, :] - arrays.hinge_pos[0][:, None], 0)
+        dy = P + Pe + dC[:, :1] + dC[:, 1:2]*x + dC[:, 2:] @ arm
+        return dy/self.EI
+
+    def gradients(self, theta=None):
+        """
+        ### Description
+        Values and analytic gradients of reactions, peak absolute moment and peak absolute deflection.
+
+        Returns dict of `(value, gradient)` tuples with keys `'reactions'`, `'peak_moment'` and
+        (if `E` and `I` known) `'peak_deflection'`. Labels of reactions are `ParameterSweep.output_labels`.
+        """
+        theta = self.initial() if theta is None else theta
+        ev = self.evaluate(theta)
+        out = {'reactions': (ev['reactions'], ev['d_reactions'])}
+        for (key, name) in (('moment', 'peak_moment'), ('deflection', 'peak_deflection')):
+            if key in ev:
+                k = np.argmax(np.abs(ev[key]))
+                sign = np.sign(ev[key][k])
+                out[name] = (abs(ev[key][k]), sign*ev['d_' + key][k])
+        return out
+
+    def optimize(self, objective: str = 'moment', theta0=None, maxiter: int = 100, tol: float = 1e-9):
+        """
+        ### Description
+        Minimizes peak absolute bending moment (`'moment'`) or deflection (`'deflection'`) within bounds.
+        The minimax problem `min t, t >= |f(x_k)|` is linearized with the analytic gradients and every
+        step is a linear program (`scipy.optimize.linprog`) inside a trust region, which is enlarged
+        after good steps and shrunk after bad ones. Parameters of the elements are not modified, use `apply` for that.
+
+        #### Arguments
+        - `objective:str = 'moment'` = `'moment'` or `'deflection'`
+        - `theta0 = None` = Starting values, default current values of elements
+        - `maxiter:int = 100` = Maximum number of steps
+        - `tol:float = 1e-9` = Relative predicted decrease of peak (or trust radius) at which iterations stop
+
+        Returns `OptimizeResult`
+        """
+        try:
+            from scipy.optimize import linprog
+        except ImportError:
+            raise ImportError("LayoutOptimizer.optimize requires scipy") from None
+        if objective not in ('moment', 'deflection'):
+            raise ValueError(f"Unknown objective {objective}. Use 'moment' or 'deflection'")
+        if objective == 'deflection' and self.EI is None:
+            raise ValueError("Deflection objective requires E and I")
+
+        theta = self.initial() if theta0 is None else np.asarray(theta0, dtype=float)
+        lower, upper = np.array(self.lower), np.array(self.upper)
+        theta = np.clip(theta, lower, upper)
+        self.nfev = 0
+
+        def evaluate(z):
+            ev = self.evaluate(z)
+            return ev[objective], ev['d_' + objective]
+
+        f, df = evaluate(theta)
+        peak = initial_peak = np.abs(f).max()
+        width = upper - lower
+        radius = 0.25*width.max()
+        cost = np.append(np.zeros(len(theta)), 1.0)
+        success, message = False, "Maximum number of iterations reached"
+
+        for _ in range(maxiter):
+            # t >= f + df.d and t >= -f - df.d
+            ones = np.ones((len(f), 1))
+            A = np.vstack([np.hstack([df, -ones]), np.hstack([-df, -ones])])
+            b = np.concatenate([-f, f])
+            bounds = [(max(lo, -radius), min(hi, radius)) for (lo, hi)
+                      in zip(lower - theta, upper - theta)] + [(None, None)]
+            lp = linprog(cost, A_ub=A, b_ub=b, bounds=bounds, method='highs')
+            if lp.status != 0:
+                message = lp.message
+                break
+            step, predicted = lp.x[:-1], peak - lp.x[-1]
+            if predicted <= tol*max(peak, 1e-300):
+                success, message = True, "Predicted decrease below tolerance"
+                break
+
+            trial = np.clip(theta + step, lower, upper)
+            f_trial, df_trial = evaluate(trial)
+            trial_peak = np.abs(f_trial).max()
+            ratio = (peak - trial_peak)/predicted
+            if ratio > 0:
+                theta, f, df, peak = trial, f_trial, df_trial, trial_peak
+                if ratio > 0.75 and np.abs(step).max() > 0.99*radius:
+                    radius *= 2
+            else:
+                radius *= 0.25
+            if radius <= tol*width.max():
+                success, message = True, "Trust region below tolerance"
+                break
+
+        return OptimizeResult(theta, self.params, peak, initial_peak, self.nfev, success, message)
+
+    def apply(self, theta):
+        """
+        ### Description
+        Writes parameter values back to the elements (by recreating their derived attributes).
+        """
+        for value, (_, obj, attr, _) in zip(theta, self.sweep.varied):
+            _set_value(obj, attr, float(value))
+
+
+def _current_value(obj: object, attr: str):
+    """Value of parameter as it would be passed to constructor of `obj`"""
+    if isinstance(obj, PointLoad) and attr == 'load':
+        return abs(obj.load)
+    if isinstance(obj, PointMoment) and attr == 'mom':
+        return abs(obj.mom)
+    if isinstance(obj, UDL) and attr == 'loadpm':
+        return abs(obj.loadpm)
+    if isinstance(obj, UVL) and attr in ('startload', 'endload'):
+        return abs(getattr(obj, attr))
+    return getattr(obj, attr)
+
+
+def _set_value(obj: object, attr: str, value: float):
+    """Sets parameter of `obj` by calling its constructor again with new value"""
+    if isinstance(obj, (Reaction, Hinge)):
+        obj.pos = value
+    elif isinstance(obj, PointLoad):
+        args = {'pos': obj.pos, 'load': abs(obj.load)}
+        args[attr] = value
+        obj.__init__(args['pos'], args['load'], obj.inverted, obj.inclination)
+    elif isinstance(obj, PointMoment):
+        args = {'pos': obj.pos, 'mom': abs(obj.mom)}
+        args[attr] = value
+        obj.__init__(args['pos'], args['mom'], obj.ccw)
+    elif isinstance(obj, UDL):
+        args = {'start': obj.start, 'loadpm': abs(obj.loadpm), 'span': obj.span}
+        args[attr] = value
+        obj.__init__(args['start'], args['loadpm'], args['span'], obj.inverted)
+    elif isinstance(obj, UVL):
+        args = {'start': obj.start, 'startload': abs(obj.startload), 'span': obj.span,
+                'endload': abs(obj.endload)}
+        args[attr] = value
+        obj.__init__(args['start'], args['startload'], args['span'], args['endload'], obj.inverted)
+
+
+def _side_force(arrays, ry, j):
+    """Total vertical force (loads and reactions) on the chosen side of hinge `j` of a single beam"""
+    h, side = arrays.hinge_pos[0, j], arrays.hinge_sides[j]
+
+    def on(pos):
+        return (pos < h) if side == 'l' else (pos > h)
+
+    force = np.sum(on(arrays.support_pos[0])*ry[0]) + \
+        np.sum(on(arrays.point_pos[0])*arrays.point_fy[0])
+    s, e = arrays.dist_start[0], arrays.dist_end[0]
+    lo, hi = (s, np.minimum(e, h)) if side == 'l' else (np.maximum(s, h), e)
+    span = e - s
+    grad = np.divide(arrays.dist_wend[0] - arrays.dist_wstart[0], span,
+                     out=np.zeros_like(span), where=span != 0)
+    u0, u1 = lo - s, np.maximum(hi, lo) - s
+    force += np.sum(arrays.dist_wstart[0]*(u1 - u0) + grad*(u1**2 - u0**2)/2)
+    return force
+
+
+def _cell_roots(grid, f, breakpoints):
+    """
+    Linear interpolation of zero crossing of `f` in every cell of `grid` (left node if no crossing).
+    Cells containing a breakpoint are skipped as `f` may jump there. Returns tuple `(roots, crossing)`
+    """
+    df = f[1:] - f[:-1]
+    first = np.searchsorted(breakpoints, grid[:-1], side='left')
+    last = np.searchsorted(breakpoints, grid[1:], side='right')
+    cross = (f[:-1]*f[1:] < 0) & (df != 0) & (first == last)
+    root = grid[:-1] - np.divide(f[:-1]*(grid[1:] - grid[:-1]), df, out=np.zeros_like(df), where=cross)
+    return np.where(cross, root, grid[:-1]), cross
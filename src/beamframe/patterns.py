@@ -0,0 +1,94 @@
+"""
+Module for pattern live loading
+
+On multi span (with internal hinges) and overhanging beams the worst effect at a section comes from
+loading only some of the spans. The response is linear, so the effect of any loading pattern is the
+dead load effect plus the sum of the effects of loaded segments. At every station the worst pattern
+therefore loads exactly those segments whose contribution has the sign of interest (the sign of the
+influence line integrated over that segment). All segment responses are solved as one batch of
+`BeamArrays`, so the cost is about that of a single solve instead of `2**n_segments` solves.
+
+#### Example
+```
+b = Beam(12)
+elements = (Reaction(0, 'h', 'A'), Reaction(8, 'r', 'B'), UDL(0, 2, 12))   # UDL is dead load
+env = pattern_envelope(b, elements, live=5)
+env.envelopes['min_moment'], env.patterns['min_moment'], env.governing('max_moment', 4)
+```
+"""
+import numpy as np
+
+from .beam import Hinge, Reaction
+from .superposition import BeamArrays
+
+
+class PatternEnvelope:
+    """
+    ## Description
+    Envelopes of pattern live loading, returned by `pattern_envelope`.
+
+    ### Attributes
+    - `x` = Stations
+    - `segments` = Array of shape `(n_segments, 2)` with start and end of each segment
+    - `dead:dict` = `{'moment': ..., 'shear': ...}` effects of permanent loads alone
+    - `envelopes:dict` = `max_moment, min_moment, max_shear, min_shear` arrays over stations
+    - `patterns:dict` = Boolean arrays of shape `(len(x), n_segments)`: segments loaded for each envelope
+    """
+
+    def __init__(self, x, segments, dead: dict, envelopes: dict, patterns: dict):
+        self.x = x
+        self.segments = segments
+        self.dead = dead
+        self.envelopes = envelopes
+        self.patterns = patterns
+
+    def governing(self, label: str, x: float):
+        """Indices of loaded segments governing envelope `label` at the station nearest to `x`"""
+        i = np.argmin(np.abs(self.x - x))
+        return tuple(np.flatnonzero(self.patterns[label][i]))
+
+
+def default_segments(beam: object, elements: object):
+    """Segments between consecutive beam ends, supports and internal hinges"""
+    cuts = [0.0, beam.length] + [e.pos for e in elements if isinstance(e, (Reaction, Hinge))]
+    cuts = np.unique(np.clip(cuts, 0, beam.length))
+    return np.column_stack([cuts[:-1], cuts[1:]])
+
+
+def pattern_envelope(beam: object, elements: object, live: object, segments: object = None, x: object = None):
+    """
+    ### Description
+    Max/min envelopes of bending moment and shear force over all patterns of live load on segments,
+    together with the governing pattern at every station.
+
+    #### Arguments
+    - `beam` = `Beam` object
+    - `elements` = Supports, hinges and permanent (dead) loads, as passed to `Beam.fast_solve`
+    - `live` = Live load intensity acting downward, scalar or one value per segment
+    - `segments = None` = `(start, end)` pairs, default `default_segments` (spans and overhangs)
+    - `x = None` = Stations, default the non negative part of `beam.xbeam`
+
+    Returns `PatternEnvelope`
+    """
+    segments = default_segments(beam, elements) if segments is None else \
+        np.asarray(segments, dtype=float).reshape(-1, 2)
+    live = np.broadcast_to(np.asarray(live, dtype=float), (len(segments),))
+    x = beam.xbeam[beam.beam_0:] if x is None else np.asarray(x, dtype=float)
+
+    dead = BeamArrays.from_elements(beam.length, elements)
+    _, ry, mom = dead.solve_reactions()
+    dead_moment, dead_shear = dead.moment_at(x, ry, mom)[0], dead.shear_at(x, ry)[0]
+
+    # one beam per segment, loaded by live load on that segment only
+    unit = BeamArrays(beam.length, dead.support_types, dead.support_pos[0], dead.hinge_sides, dead.hinge_pos[0],
+                      dist_start=segments[:, :1], dist_end=segments[:, 1:], dist_wstart=-live[:, None])
+    _, ury, umom = unit.solve_reactions()
+    moment, shear = unit.moment_at(x, ury, umom).T, unit.shear_at(x, ury).T  # (len(x), n_segments)
+
+    envelopes, patterns = {}, {}
+    for (name, base, effect) in (('moment', dead_moment, moment), ('shear', dead_shear, shear)):
+        patterns[f'max_{name}'] = effect > 0
+        patterns[f'min_{name}'] = effect < 0
+        envelopes[f'max_{name}'] = base + np.where(effect > 0, effect, 0).sum(axis=1)
+        envelopes[f'min_{name}'] = base + np.where(effect < 0, effect, 0).sum(axis=1)
+    return PatternEnvelope(x, segments, {'moment': dead_moment, 'shear': dead_shear}, envelopes, patterns)
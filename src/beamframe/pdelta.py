@@ -0,0 +1,243 @@
+"""
+Module for second order (P-delta) analysis of beam-columns and their elastic buckling load
+
+Horizontal components of point loads (`PointLoad.load_x`) and the horizontal reactions that balance them
+give every part of the beam an axial force, compression being positive here. Under compression the
+deflected beam carries additional moment `P*w`, which increases deflection further. This is modelled with
+the geometric stiffness matrix of Hermite cubic elements (`modal.FEModel`, nodes at all loads):
+
+- second order deflections solve `(K - K_G) u = f`, one sparse banded linear solve, no iteration
+- moments follow from equilibrium of the deflected beam, `M = M_first_order(x) + sum(F_x*(w_i - w(x)))` over
+    horizontal forces on the left, so they are as accurate as the deflections
+- the critical load factor solves `K_G phi = K phi/lambda` with a banded Cholesky factor of `K` and
+    `scipy.sparse.linalg.eigsh` (dense `numpy` if scipy is missing), so slender members are cheap to check
+
+`amplification(P, P_cr)` gives the usual `1/(1 - P/P_cr)` estimate for whole arrays of members at once.
+
+#### Example
+```
+b = Beam(6, E=200e6, I=2e-5)
+elements = (Reaction(0, 'h', 'A'), Reaction(6, 'r', 'B'), UDL(0, 2, 6), PointLoad(6, 150, inclination=180))
+result = pdelta_solve(b, elements)          # 150 kN axial compression
+result.moment.max(), result.load_factor, result.amplification
+buckling_load(b, elements[:2]).loads         # Euler load pi^2 EI/L^2 (no axial load: unit compression)
+```
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from .beam import Reaction
+from .modal import FEModel
+from .superposition import BeamArrays
+
+# consistent geometric stiffness of a Hermite element per unit compression, times l**(power - 1)
+_GEOMETRIC = np.array([[36, 3, -36, 3], [3, 4, -3, -1], [-36, -3, 36, -3], [3, -1, -3, 4]], dtype=float)/30
+_POWER = np.add.outer([0, 1, 0, 1], [0, 1, 0, 1])
+
+Buckling = namedtuple('Buckling', ['factors', 'loads', 'x', 'shapes'])
+Buckling.__doc__ = """
+Result of `buckling_load`:
+- `factors` = Critical load factors (multiples of the axial forces of the beam), ascending
+- `loads` = Largest axial compression (kN) of the beam at each critical load factor
+- `x` = Node positions
+- `shapes` = Buckled shape (nodal deflection, largest value `1`) of every mode, shape `(k, len(x))`
+"""
+
+
+class PDeltaResult:
+    """
+    ## Description
+    Result of `pdelta_solve`. Arrays are over `beam.xbeam` (zero left of the beam) like `Beam.shear_values`.
+
+    ### Attributes
+    - `x` = Positions
+    - `deflection, slope` = Second order deflection (m, upward positive) and slope
+    - `moment` = Second order bending moment (kNm, sagging positive)
+    - `shear` = Shear force (kN) normal to the deflected beam, the slope of `moment`
+    - `axial` = Axial compression (kN, negative in tension)
+    - `load_factor` = Critical load factor of the axial forces (`inf` without compression)
+    - `amplification` = `1/(1 - 1/load_factor)`, amplification of a deflection in the shape of the first mode
+    """
+
+    def __init__(self, x, deflection, slope, moment, shear, axial, load_factor):
+        self.x = x
+        self.deflection = deflection
+        self.slope = slope
+        self.moment = moment
+        self.shear = shear
+        self.axial = axial
+        self.load_factor = load_factor
+        self.amplification = amplification(1, load_factor)
+
+
+def amplification(P, P_cr):
+    """Moment and deflection amplification `1/(1 - P/P_cr)` (vectorised; `inf` at or beyond the critical load)"""
+    ratio = np.asarray(P, dtype=float)/np.asarray(P_cr, dtype=float)
+    with np.errstate(divide='ignore'):
+        return np.where(ratio < 1, 1/(1 - ratio), np.inf)
+
+
+def axial_compression(arrays: BeamArrays, x, axial: float = 0.0):
+    """
+    ### Description
+    Axial compression (kN) at `x` of the first beam of `arrays`: horizontal loads and reactions on the left
+    of `x` pushing in positive x direction, plus a uniform compression `axial` (applied at both ends).
+    Horizontal reactions follow `BeamArrays.scatter_reactions`.
+    """
+    rx, _, _ = arrays.scatter_reactions(np.zeros((1, len(arrays.unknowns))))
+    x = np.atleast_1d(np.asarray(x, dtype=float))
+    P = np.full(len(x), float(axial))
+    for pos, fx in zip(np.concatenate([arrays.support_pos[0], arrays.point_pos[0]]),
+                       np.concatenate([rx[0], arrays.point_fx[0]])):
+        P += fx*(x >= pos)
+    return P
+
+
+def geometric_stiffness(fe: FEModel, P):
+    """Global geometric stiffness matrix (kN/m) for compression `P` (kN) in every element"""
+    l = np.diff(fe.x)[:, None, None]
+    return fe.scatter(np.asarray(P, dtype=float)[:, None, None]*_GEOMETRIC*l**(_POWER - 1))
+
+
+def critical_factors(fe: FEModel, Kg, k: int = 1):
+    """
+    ### Description
+    Lowest `k` positive load factors `lambda` with `(K - lambda*Kg) phi = 0` and their vectors (`fe.ndofs` long).
+    `fe.K` must be positive definite on the free dofs (a stable beam), else `ValueError`.
+
+    Returns tuple `(factors, vectors)`; factors are `inf` (and vectors zero) where fewer modes exist
+    """
+    free = fe.free
+    n = len(free)
+    K, Kg = fe.K[free][:, free]/1e3, Kg[free][:, free]
+    k = min(int(k), n)
+    if isinstance(K, np.ndarray) or k >= n - 1:
+        K, Kg = (A if isinstance(A, np.ndarray) else A.toarray() for A in (K, Kg))
+        try:
+            C = np.linalg.cholesky(K)
+        except np.linalg.LinAlgError:
+            raise ValueError("Beam is geometrically unstable: stiffness matrix is singular") from None
+        Ci = np.linalg.inv(C)
+        mu, v = np.linalg.eigh(Ci @ Kg @ Ci.T)
+        mu, v = mu[::-1][:k], (Ci.T @ v)[:, ::-1][:, :k]
+    else:
+        from scipy.linalg import LinAlgError, cho_solve_banded, cholesky_banded
+        from scipy.sparse.linalg import LinearOperator, eigsh
+        # upper band storage of K; dofs are numbered node by node so the band is narrow
+        A = K.tocoo()
+        upper = A.row <= A.col
+        width = int((A.col - A.row)[upper].max())
+        band = np.zeros((width + 1, n))
+        band[width + A.row[upper] - A.col[upper], A.col[upper]] = A.data[upper]
+        try:
+            factor = cholesky_banded(band)
+        except LinAlgError:
+            raise ValueError("Beam is geometrically unstable: stiffness matrix is singular") from None
+        Kinv = LinearOperator((n, n), matvec=lambda b: cho_solve_banded((factor, False), b), dtype=float)
+        # mu = 1/lambda: the largest mu belong to the lowest critical loads and converge first
+        mu, v = eigsh(Kg, k=k, M=K, Minv=Kinv, which='LA')
+        order = np.argsort(mu)[::-1]
+        mu, v = mu[order], v[:, order]
+
+    positive = mu > 1e-12*np.abs(mu).max(initial=0.0)
+    with np.errstate(divide='ignore'):
+        factors = np.where(positive, 1/np.where(positive, mu, 1), np.inf)
+    vectors = np.zeros((len(mu), fe.ndofs))
+    vectors[:, free] = np.where(positive, v, 0).T
+    return factors, vectors
+
+
+def _model(beam: object, loads_list: object, axial: float, nelems: int):
+    if beam.E is None or beam.I is None:
+        raise ValueError("Second order analysis requires E and I of the beam")
+    if any(callable(v) or np.ndim(v) for v in (beam.E, beam.I)):
+        raise ValueError("Second order analysis requires constant E and I (see nonprismatic_solve for varying EI)")
+    arrays = BeamArrays.from_elements(beam.length, loads_list)
+    fe = FEModel.from_arrays(arrays, beam.E*beam.I, nelems)
+    P = axial_compression(arrays, (fe.x[:-1] + fe.x[1:])/2, axial)
+    return arrays, fe, P
+
+
+def buckling_load(beam: object, elements: object, axial: float = 0.0, k: int = 1, nelems: int = 200):
+    """
+    ### Description
+    Elastic critical (buckling) loads of a beam-column.
+
+    #### Arguments
+    - `beam` = `Beam` object with `E` and `I`
+    - `elements` = Reactions, hinges and loads; horizontal loads and reactions give the axial forces
+    - `axial:float = 0.0` = Additional uniform compression (kN). Without any axial force a unit uniform
+        compression is used, so `loads` are the critical compression of the member
+    - `k:int = 1` = Number of modes
+    - `nelems:int = 200` = Approximate number of finite elements (200 give the lowest loads to about 8 digits)
+
+    Returns `Buckling`
+    """
+    arrays, fe, P = _model(beam, elements, axial, nelems)
+    if not np.any(P):
+        P = np.ones_like(P)
+    factors, vectors = critical_factors(fe, geometric_stiffness(fe, P), k)
+    shapes = vectors[:, fe.deflection_dofs]
+    peak = shapes[np.arange(len(shapes)), np.argmax(np.abs(shapes), axis=1)]
+    shapes = shapes/np.where(peak == 0, 1, peak)[:, None]
+    return Buckling(factors, factors*P.max(), fe.x, shapes)
+
+
+def pdelta_solve(beam: object, loads_list: object, axial: float = 0.0, nelems: int = 200):
+    """
+    ### Description
+    Second order (P-delta) analysis of a beam-column, statically determinate or not. Sets `rx_val, ry_val,
+    mom_val` of the `Reaction` objects and `reactions_list`, `shear_values`, `moment_values` and
+    `deflection_values` of `beam` (over `beam.xbeam`).
+
+    #### Arguments
+    - `beam` = `Beam` object with `E` and `I`
+    - `loads_list` = List (or tuple) of beam objects like Reactions, Loads, Moments, Internal Hinge
+    - `axial:float = 0.0` = Additional uniform axial compression (kN), e.g. from a member not modelled
+    - `nelems:int = 200` = Approximate number of finite elements besides nodes at loads
+
+    Raises `ValueError` if the axial forces reach the critical buckling load
+
+    Returns `PDeltaResult`
+    """
+    arrays, fe, P = _model(beam, loads_list, axial, nelems)
+    Kg = geometric_stiffness(fe, P)
+    load_factor = critical_factors(fe, Kg, 1)[0][0] if np.any(P > 0) else np.inf
+    if load_factor <= 1:
+        raise ValueError(f"Axial compression exceeds the elastic critical load (critical load factor {load_factor:.4g})")
+
+    K = fe.K/1e3 - Kg
+    f = fe.load_vector(arrays)
+    u = fe.solve(K, f)
+    ry, mom = fe.support_reactions(K @ u - f, arrays)
+    rx, _, _ = arrays.scatter_reactions(np.zeros((1, len(arrays.unknowns))))
+
+    x = beam.xbeam[beam.beam_0:]
+    d, n = fe.interpolation(x)
+    w = (u[d]*n).sum(-1)
+    d, n = fe.interpolation(x, 1)
+    slope = (u[d]*n).sum(-1)
+
+    # equilibrium of the deflected beam: horizontal forces on the left act at their own deflection
+    pos = np.concatenate([[0.0], arrays.support_pos[0], arrays.point_pos[0]])
+    fx = np.concatenate([[float(axial)], rx[0], arrays.point_fx[0]])
+    d, n = fe.interpolation(pos)
+    lever = (u[d]*n).sum(-1)[None, :] - w[:, None]
+    moment = arrays.moment_at(x, ry[None], mom[None])[0] + ((x[:, None] >= pos)*fx*lever).sum(axis=1)
+    compression = axial_compression(arrays, x, axial)
+    shear = arrays.shear_at(x, ry[None])[0] - compression*slope
+
+    rxns = [e for e in loads_list if isinstance(e, Reaction)]
+    for i, r in enumerate(rxns):
+        r.rx_val, r.ry_val, r.mom_val = float(rx[0, i]), float(ry[i]), float(mom[i])
+    beam.reactions_list = rxns
+
+    def full(values):
+        out = np.zeros(len(beam.xbeam))
+        out[beam.beam_0:] = values
+        return out
+
+    beam.shear_values, beam.moment_values, beam.deflection_values = full(shear), full(moment), full(w)
+    return PDeltaResult(beam.xbeam, beam.deflection_values, full(slope), beam.moment_values,
+                        beam.shear_values, full(compression), load_factor)
@@ -0,0 +1,243 @@
+"""
+Module for Monte Carlo reliability analysis
+
+Load magnitudes and positions (any attribute that `ParameterSweep` can vary) are random variables.
+Samples are drawn in large batches and each batch is one `BeamArrays` solved by superposition, so the cost
+per sample is a few vectorised operations instead of a `fast_solve`. Batches can be spread over a
+process pool; batch `i` always uses the `i`-th child of one `numpy.random.SeedSequence`, so results do not
+depend on the number of workers. Sampling stops early once the confidence interval of the failure
+probability is narrow enough.
+
+#### Example
+```
+b = Beam(10, E=200e6, I=8e-5)
+p = PointLoad(5, 50, inverted=True)
+mc = MonteCarlo(b, (Reaction(0, 'h', 'A'), Reaction(10, 'r', 'B'), p), moment_capacity=200)
+mc.random(p, 'load', Distribution('gumbel', 50, 8))
+mc.random(p, 'pos', Distribution('uniform', 2, 8))
+result = mc.run(10**7, workers=4, seed=1, rel_error=0.05)
+result.probability, result.interval, result.beta
+```
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+
+from .sweep import ParameterSweep
+
+
+class Distribution:
+    """
+    ## Description
+    Random variable sampled with a method of `numpy.random.Generator`.
+
+    ### Arguments
+    - `name:str` = Method of `numpy.random.Generator` like `'normal'`, `'lognormal'`, `'uniform'`, `'gumbel'`
+    - `*args` = Its parameters (e.g. mean and standard deviation for `'normal'`)
+    - `low:float = None`, `high:float = None` = Optional bounds, samples are clipped to them
+
+    #### Example
+    ```
+    Distribution('normal', 10, 2, low=0)
+    ```
+    """
+
+    def __init__(self, name: str, *args, low: float = None, high: float = None):
+        if not callable(getattr(np.random.Generator, name, None)):
+            raise ValueError(f"Unknown distribution {name}")
+        self.name = name
+        self.args = args
+        self.low = low
+        self.high = high
+
+    def sample(self, rng, n: int):
+        """`n` samples drawn from generator `rng`"""
+        values = getattr(rng, self.name)(*self.args, size=n)
+        if self.low is not None or self.high is not None:
+            values = np.clip(values, self.low, self.high)
+        return values
+
+    def __repr__(self):
+        return f"Distribution({self.name!r}, {', '.join(map(repr, self.args))})"
+
+
+class ReliabilityResult:
+    """
+    ## Description
+    Result of `MonteCarlo.run`
+
+    ### Attributes
+    - `samples:int`, `failures:int` = Number of evaluated samples and of failed ones
+    - `probability:float` = Estimated probability of failure
+    - `interval:tuple` = Wilson score confidence interval of `probability`
+    - `confidence:float` = Confidence level of `interval`
+    - `beta:float` = Reliability index `-Phi^-1(probability)`
+    - `converged:bool` = `True` if sampling stopped because `rel_error` was reached
+    - `batches:list` = `(samples, failures)` of every batch in order
+    """
+
+    def __init__(self, batches: list, confidence: float, converged: bool):
+        self.batches = batches
+        self.samples = int(sum(n for (n, _) in batches))
+        self.failures = int(sum(f for (_, f) in batches))
+        self.confidence = confidence
+        self.converged = converged
+        self.probability = self.failures/self.samples if self.samples else float('nan')
+        self.interval = wilson_interval(self.failures, self.samples, confidence)
+        p = self.probability
+        self.beta = -NormalDist().inv_cdf(p) if 0 < p < 1 else (float('inf') if p == 0 else -float('inf'))
+
+    def __repr__(self):
+        low, high = self.interval
+        return f"ReliabilityResult(probability={self.probability:.4g}, interval=({low:.4g}, {high:.4g}), samples={self.samples})"
+
+
+def wilson_interval(failures: int, samples: int, confidence: float = 0.95):
+    """Wilson score interval of a binomial proportion (valid also for zero failures)"""
+    if samples == 0:
+        return (0.0, 1.0)
+    z = NormalDist().inv_cdf(0.5 + confidence/2)
+    p = failures/samples
+    centre = (p + z**2/(2*samples))/(1 + z**2/samples)
+    half = z*np.sqrt(p*(1 - p)/samples + z**2/(4*samples**2))/(1 + z**2/samples)
+    return (max(0.0, centre - half), min(1.0, centre + half))
+
+
+class MonteCarlo:
+    """
+    ## Description
+    Monte Carlo estimate of the probability that a beam exceeds its capacities.
+
+    ### Arguments
+    - `beam` = `Beam` object (constant `E` and `I` are needed for `deflection_limit`)
+    - `elements` = List or tuple of all objects that would be passed to `Beam.fast_solve`
+    - `moment_capacity:float = None` = Failure if peak absolute bending moment exceeds it
+    - `shear_capacity:float = None` = Failure if peak absolute shear force exceeds it
+    - `deflection_limit:float = None` = Failure if peak absolute deflection exceeds it
+    - `ndivs:int = None` = Stations per beam checked for peaks besides load and support positions. Default `2`
+        when shear is piecewise linear (point loads, moments and UDLs) and deflection is not checked, which is
+        exact because moment peaks are found at zero crossings of shear, else `201`
+
+    At least one capacity is required. Use `random` to make attributes random variables.
+    """
+
+    def __init__(self, beam: object, elements: object, moment_capacity: float = None, shear_capacity: float = None,
+                 deflection_limit: float = None, ndivs: int = None):
+        if moment_capacity is None and shear_capacity is None and deflection_limit is None:
+            raise ValueError("Give at least one of moment_capacity, shear_capacity, deflection_limit")
+        known = beam.E is not None and beam.I is not None
+        constant = known and not any(callable(v) or np.ndim(v) for v in (beam.E, beam.I))
+        if deflection_limit is not None and not known:
+            raise ValueError("Deflection limit requires E and I of the beam")
+        if deflection_limit is not None and not constant:
+            raise ValueError("Deflection limit requires constant E and I (see nonprismatic_solve for varying EI)")
+        self.sweep = ParameterSweep(beam, elements)
+        self.EI = float(beam.E)*float(beam.I) if constant else None
+        self.capacities = {'moment': moment_capacity, 'shear': shear_capacity, 'deflection': deflection_limit}
+        if ndivs is None:
+            ndivs = 2 if self.sweep.linear_shear() and deflection_limit is None else 201
+        self.ndivs = ndivs
+        self.distributions = []
+
+    def random(self, obj: object, attr: str, distribution: Distribution, name: str = None):
+        """
+        ### Description
+        Makes attribute `attr` of `obj` (the beam or one of the elements) a random variable.
+        Attributes and values are as for `ParameterSweep.vary`.
+        """
+        self.sweep.vary(obj, attr, [np.nan], name)
+        self.distributions.append(distribution)
+
+    def sample(self, rng, n: int):
+        """Array of shape `(n, n_variables)` of sampled values"""
+        return np.column_stack([d.sample(rng, n) for d in self.distributions])
+
+    def demands(self, values):
+        """
+        ### Description
+        Peak absolute moment, shear and (if needed) deflection for sampled `values` of shape `(n, n_variables)`.
+        Returns dict of arrays with shape `(n,)`
+        """
+        arrays = self.sweep.batch_arrays(values)
+        _, ry, mom = arrays.solve_reactions()
+        peaks = arrays.extrema(ry, mom, self.ndivs)
+        out = {'moment': np.maximum(np.abs(peaks['max_moment']), np.abs(peaks['min_moment'])),
+               'shear': np.maximum(np.abs(peaks['max_shear']), np.abs(peaks['min_shear']))}
+        if self.capacities['deflection'] is not None:
+            y, _ = arrays.deflection_at(arrays.candidate_points(self.ndivs), ry, mom, self.EI)
+            out['deflection'] = np.abs(y).max(axis=1)
+        return out
+
+    def failures(self, values):
+        """Boolean array: `True` where any demand exceeds its capacity"""
+        demands = self.demands(values)
+        failed = np.zeros(len(values), dtype=bool)
+        for name, capacity in self.capacities.items():
+            if capacity is not None:
+                failed |= demands[name] > capacity
+        return failed
+
+    def _batch(self, seed, n: int):
+        rng = np.random.default_rng(seed)
+        return n, int(self.failures(self.sample(rng, n)).sum())
+
+    def run(self, n_samples: int = 10**6, batch: int = 100_000, workers: int = 0, seed: int = None,
+            rel_error: float = None, confidence: float = 0.95, min_failures: int = 10):
+        """
+        ### Description
+        Samples until `n_samples` are evaluated or the half width of the confidence interval drops
+        below `rel_error` times the estimate (with at least `min_failures` failures).
+
+        #### Arguments
+        - `n_samples:int = 10**6` = Maximum number of samples
+        - `batch:int = 100_000` = Samples per batch (one vectorised solve)
+        - `workers:int = 0` = Worker processes, `0` evaluates batches in this process
+        - `seed:int = None` = Seed of `numpy.random.SeedSequence`; the same seed gives the same result for any `workers`
+        - `rel_error:float = None` = Relative half width of interval for early stopping (`None` never stops early)
+        - `confidence:float = 0.95` = Confidence level of interval
+        - `min_failures:int = 10` = Failures needed before stopping early
+
+        Returns `ReliabilityResult`
+        """
+        if not self.distributions:
+            raise ValueError("No random variables. Use `random` to add them")
+        sizes = [min(batch, n_samples - start) for start in range(0, n_samples, batch)]
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        results = []
+
+        def done():
+            failures = sum(f for (_, f) in results)
+            if rel_error is None or failures < min_failures:
+                return False
+            samples = sum(n for (n, _) in results)
+            low, high = wilson_interval(failures, samples, confidence)
+            return (high - low)/2 <= rel_error*failures/samples
+
+        batches = self._iter_batches(seeds, sizes, workers)
+        for result in batches:
+            results.append(result)
+            if done():
+                batches.close()
+                return ReliabilityResult(results, confidence, True)
+        return ReliabilityResult(results, confidence, False)
+
+    def _iter_batches(self, seeds, sizes, workers: int):
+        """Yields `(samples, failures)` of batches in order; at most `2*workers` batches are queued"""
+        if workers <= 0:
+            for (s, n) in zip(seeds, sizes):
+                yield self._batch(s, n)
+            return
+        with ProcessPoolExecutor(workers) as pool:
+            pending = deque()
+            try:
+                for (s, n) in zip(seeds, sizes):
+                    pending.append(pool.submit(self._batch, s, n))
+                    if len(pending) >= 2*workers:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
@@ -0,0 +1,269 @@
+"""
+Module for cross sections and stress fields
+
+Every section is a stack of rectangles measured from the bottom fibre (`y = 0`).
+Section properties are computed once and cached; stresses over the depth of the section at
+every station of a beam are produced by broadcasting `moment_values`/`shear_values` against
+cached fibre factors.
+
+## Sign Conventions:
+- `y` increases upward
+- Tensile stress is positive, so sagging (positive) moment gives compression at top fibre
+"""
+from functools import cached_property
+
+import numpy as np
+
+
+class Section:
+    """
+    ## Description
+    General section made of rectangles. Base class of all other sections.
+
+    ### Arguments
+    - `rects` = List or tuple of `(width, y_bottom, y_top)` rectangles. Overlapping rectangles add their widths.
+    - `modular` = Optional list of modular ratios (one per rectangle) for transformed composite sections
+
+    ### Attributes (cached)
+    - `area, centroid, I, depth`
+    - `Z_top, Z_bottom` = Elastic section moduli for top and bottom fibres
+    - `plastic_axis, Z_plastic` = Height of plastic neutral axis and plastic section modulus (`M_p = f_y*Z_plastic`)
+    """
+
+    def __init__(self, rects: object, modular: object = None):
+        rects = np.asarray(rects, dtype=float).reshape(-1, 3)
+        if np.any(rects[:, 2] <= rects[:, 1]) or np.any(rects[:, 0] <= 0):
+            raise ValueError(
+                "Every rectangle must have positive width and height")
+        self.widths, self.y0, self.y1 = rects.T
+        self.modular = np.ones(len(rects)) if modular is None else np.asarray(
+            modular, dtype=float)
+        self._fibres = {}  # cache of fibre factors for each number of fibres
+
+    @cached_property
+    def area(self):
+        return float(np.sum(self.widths*(self.y1 - self.y0)))
+
+    @cached_property
+    def centroid(self):
+        return float(np.sum(self.widths*(self.y1**2 - self.y0**2)/2)/self.area)
+
+    @cached_property
+    def I(self):
+        """Second moment of area about centroidal axis"""
+        c = self.centroid
+        return float(np.sum(self.widths*((self.y1-c)**3 - (self.y0-c)**3)/3))
+
+    @cached_property
+    def y_bottom(self):
+        return float(self.y0.min())
+
+    @cached_property
+    def y_top(self):
+        return float(self.y1.max())
+
+    @cached_property
+    def depth(self):
+        return self.y_top - self.y_bottom
+
+    @cached_property
+    def Z_top(self):
+        return self.I/(self.y_top - self.centroid)
+
+    @cached_property
+    def Z_bottom(self):
+        return self.I/(self.centroid - self.y_bottom)
+
+    @cached_property
+    def plastic_axis(self):
+        """Height dividing the area in equal halves (fully plastic neutral axis)"""
+        # area below y is piecewise linear in y with kinks at rectangle edges
+        edges = np.unique(np.concatenate([self.y0, self.y1]))
+        below = np.sum(self.widths*(np.clip(edges[:, None], self.y0, self.y1) - self.y0), axis=1)
+        return float(np.interp(self.area/2, below, edges))
+
+    @cached_property
+    def Z_plastic(self):
+        """Plastic section modulus: first moment of area about the plastic neutral axis"""
+        a, b = self.y0 - self.plastic_axis, self.y1 - self.plastic_axis
+        return float(np.sum(self.widths*(b*np.abs(b) - a*np.abs(a))/2))
+
+    def _inside(self, y):
+        """Rectangles containing heights `y`: `[y0, y1)` except at top fibre of section"""
+        y = np.asarray(y, dtype=float)[..., None]
+        return (y >= self.y0) & ((y < self.y1) | ((y == self.y1) & (self.y1 == self.y_top)))
+
+    def width_at(self, y):
+        """Total width of section at heights `y`"""
+        return np.sum(self.widths*self._inside(y), axis=-1)
+
+    def modular_at(self, y):
+        """Modular ratio of the (first) rectangle found at heights `y`, 1 elsewhere"""
+        inside = self._inside(y)
+        first = np.argmax(inside, axis=-1)
+        return np.where(inside.any(axis=-1), self.modular[first], 1.0)
+
+    def Q(self, y):
+        """First moment about centroidal axis of area above heights `y`"""
+        y = np.asarray(y, dtype=float)[..., None]
+        lo = np.clip(y, self.y0, self.y1)
+        c = self.centroid
+        return np.sum(self.widths*((self.y1-c)**2 - (lo-c)**2)/2, axis=-1)
+
+    def fibres(self, nfibres: int = 101):
+        """
+        ### Description
+        Heights of `nfibres` equally spaced fibres and the cached factors
+        `bending = -modular*(y - centroid)/I` and `shear = modular*Q/(I*t)`,
+        so that `sigma = M*bending` and `tau = V*shear`.
+
+        Returns tuple `(y, bending, shear)` of 1d arrays
+        """
+        if nfibres not in self._fibres:
+            y = np.linspace(self.y_bottom, self.y_top, nfibres)
+            width = self.width_at(y)
+            modular = self.modular_at(y)
+            bending = -modular*(y - self.centroid)/self.I
+            shear = modular*np.divide(self.Q(y), self.I*width,
+                                      out=np.zeros_like(y), where=width > 0)
+            self._fibres[nfibres] = (y, bending, shear)
+        return self._fibres[nfibres]
+
+    def bending_stress(self, moment, nfibres: int = 101, dtype=np.float64):
+        """
+        ### Description
+        Bending stress `sigma = M*y/I` for every moment value and fibre.
+        Returns array of shape `(len(moment), nfibres)`
+        """
+        _, bending, _ = self.fibres(nfibres)
+        return np.multiply.outer(np.asarray(moment, dtype=dtype), bending.astype(dtype))
+
+    def shear_stress(self, shear, nfibres: int = 101, dtype=np.float64):
+        """
+        ### Description
+        Shear stress `tau = V*Q/(I*t)` for every shear value and fibre.
+        Returns array of shape `(len(shear), nfibres)`
+        """
+        _, _, factor = self.fibres(nfibres)
+        return np.multiply.outer(np.asarray(shear, dtype=dtype), factor.astype(dtype))
+
+
+class Rectangle(Section):
+    """
+    ## Description
+    Solid rectangular section
+
+    ### Arguments
+    - `width:float`, `depth:float`
+    """
+
+    def __init__(self, width: float, depth: float):
+        super().__init__([(width, 0, depth)])
+
+
+class ISection(Section):
+    """
+    ## Description
+    Doubly symmetric I section
+
+    ### Arguments
+    - `depth:float` = Overall depth
+    - `flange_width:float`, `flange_thickness:float`
+    - `web_thickness:float`
+    """
+
+    def __init__(self, depth: float, flange_width: float, flange_thickness: float, web_thickness: float):
+        super().__init__([(flange_width, 0, flange_thickness),
+                          (web_thickness, flange_thickness,
+                           depth - flange_thickness),
+                          (flange_width, depth - flange_thickness, depth)])
+
+
+class TSection(Section):
+    """
+    ## Description
+    T section with flange at top
+
+    ### Arguments
+    - `depth:float` = Overall depth
+    - `flange_width:float`, `flange_thickness:float`
+    - `web_thickness:float`
+    """
+
+    def __init__(self, depth: float, flange_width: float, flange_thickness: float, web_thickness: float):
+        super().__init__([(web_thickness, 0, depth - flange_thickness),
+                          (flange_width, depth - flange_thickness, depth)])
+
+
+class BoxSection(Section):
+    """
+    ## Description
+    Rectangular hollow (box) section with two webs
+
+    ### Arguments
+    - `width:float`, `depth:float` = Overall dimensions
+    - `flange_thickness:float`, `web_thickness:float`
+    """
+
+    def __init__(self, width: float, depth: float, flange_thickness: float, web_thickness: float):
+        super().__init__([(width, 0, flange_thickness),
+                          (2*web_thickness, flange_thickness,
+                           depth - flange_thickness),
+                          (width, depth - flange_thickness, depth)])
+
+
+class CompositeSection(Section):
+    """
+    ## Description
+    Transformed section made of several sections, possibly of different materials.
+    Widths are multiplied by modular ratio `n = E_part/E_reference`, so `Beam.E` must be the reference modulus.
+
+    ### Arguments
+    - `parts` = List or tuple of `(section, y_offset, modular_ratio)`: `y_offset` is the height of bottom of that part
+    """
+
+    def __init__(self, parts: object):
+        rects, modular = [], []
+        for (section, offset, ratio) in parts:
+            for (w, y0, y1) in zip(section.widths, section.y0, section.y1):
+                rects.append((w*ratio, y0 + offset, y1 + offset))
+                modular.append(ratio)
+        super().__init__(rects, modular)
+
+
+def _diagram_values(beam: object):
+    if beam.moment_values is None or beam.shear_values is None:
+        raise ValueError(
+            "Beam has no shear and moment values. Solve it first (e.g. with `fast_solve`)")
+    return beam.shear_values, beam.moment_values
+
+
+def stress_field(beam: object, section: Section, nfibres: int = 101, dtype=np.float64):
+    """
+    ### Description
+    Bending and shear stress over the depth of `section` at every station `beam.xbeam`.
+
+    #### Arguments
+    - `beam` = Solved `Beam` object
+    - `section` = `Section` object
+    - `nfibres:int = 101` = Number of fibres over depth
+    - `dtype = np.float64` = Use `np.float32` to halve memory
+
+    Returns tuple `(sigma, tau)` of arrays with shape `(beam.ndivs, nfibres)`
+    """
+    shear, moment = _diagram_values(beam)
+    return section.bending_stress(moment, nfibres, dtype), section.shear_stress(shear, nfibres, dtype)
+
+
+def iter_stress_field(beam: object, section: Section, nfibres: int = 101, chunk: int = 1000, dtype=np.float64):
+    """
+    ### Description
+    Same as `stress_field` but yields `(stations, sigma, tau)` for `chunk` stations at a time,
+    so memory is bounded by `chunk*nfibres` values whatever the number of stations.
+    """
+    shear, moment = _diagram_values(beam)
+    for start in range(0, len(moment), chunk):
+        stop = min(start + chunk, len(moment))
+        yield (slice(start, stop),
+               section.bending_stress(moment[start:stop], nfibres, dtype),
+               section.shear_stress(shear[start:stop], nfibres, dtype))
@@ -0,0 +1,502 @@
+"""
+Module for a local HTTP/JSON solve service
+
+Starting python and importing sympy and matplotlib for every small solve dominates the latency seen by a
+front end. `SolveServer` is a small asyncio HTTP server which keeps worker processes warm (modules imported,
+numpy paths exercised), collects concurrent requests for a few milliseconds into one micro batch, and solves
+each batch with the vectorised `BeamArrays` (beams with the same supports are solved by one `numpy.linalg.solve`).
+The request queue is bounded: when it is full the server answers `503` with a `Retry-After` header instead of
+queueing without limit. Latency histograms of queueing, solving and whole requests are served at `/stats`.
+
+Only the standard library is used besides numpy, so the server is testable on localhost.
+
+## Endpoints
+- `POST /solve` = body is one model (returns one result) or a list of models (returns a list of results)
+- `GET /stats` = latency histograms and counters
+- `GET /health` = `{"status": "ok"}`
+
+## Model format
+```
+{"length": 10, "ndivs": 201, "diagram": 0,
+ "elements": [{"element": "Reaction", "pos": 0, "type": "h", "pos_sym": "A"},
+              {"element": "Reaction", "pos": 10, "type": "r", "pos_sym": "B"},
+              {"element": "PointLoad", "pos": 5, "load": 10, "inverted": true},
+              {"element": "UDL", "start": 0, "loadpm": 2, "span": 10}]}
+```
+`element` names one of `Reaction, Hinge, PointLoad, PointMoment, UDL, UVL`; the other keys are the arguments
+of its constructor. `ndivs` stations are checked for extrema, and `diagram > 0` also returns shear and moment at
+that many equally spaced points. A result is `{"reactions": {...}, "extrema": {...}}` (labels as in
+`ParameterSweep`) or `{"error": message}`.
+
+#### Example
+```
+python -m beamframe.server --port 8765 --workers 2
+```
+"""
+import argparse
+import asyncio
+import bisect
+import http.client
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from .beam import UDL, UVL, Hinge, PointLoad, PointMoment, Reaction
+from .stability import classify_arrays, describe
+from .superposition import BeamArrays
+
+ELEMENTS = {cls.__name__: cls for cls in (Reaction, Hinge, PointLoad, PointMoment, UDL, UVL)}
+
+EXTREMA = ('max_moment', 'x_max_moment', 'min_moment', 'x_min_moment',
+           'max_shear', 'x_max_shear', 'min_shear', 'x_min_shear')
+
+STATUS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+          413: 'Payload Too Large', 503: 'Service Unavailable'}
+
+
+def parse_model(model: dict):
+    """
+    ### Description
+    Creates elements of a JSON model (see module docstring).
+
+    Returns tuple `(length, elements, ndivs, diagram)`
+    """
+    if not isinstance(model, dict) or 'length' not in model:
+        raise ValueError("Model must be an object with 'length' and 'elements'")
+    elements = []
+    for spec in model.get('elements', ()):
+        spec = dict(spec)
+        name = spec.pop('element', None)
+        if name not in ELEMENTS:
+            raise ValueError(f"Unknown element {name}. Use one of {tuple(ELEMENTS)}")
+        try:
+            elements.append(ELEMENTS[name](**spec))
+        except Exception as e:  # e.g. a wrong type or a zero span fails inside the constructor
+            raise ValueError(f"Invalid arguments for {name}: {e}") from None
+    length = float(model['length'])
+    if length <= 0:
+        raise ValueError("Beam length must be positive")
+    return length, elements, int(model.get('ndivs', 201)), int(model.get('diagram', 0))
+
+
+def _signature(elements: list):
+    """Support types and hinge sides in the order of elements, as `BeamArrays.support_signature`"""
+    return (tuple(e.type for e in elements if isinstance(e, Reaction)),
+            tuple(e.side.lower()[0] for e in elements if isinstance(e, Hinge)))
+
+
+def _batch_arrays(parsed: list):
+    """
+    One `BeamArrays` for parsed models with the same signature. Rows are filled directly from the elements
+    (models with fewer loads are padded with zero loads), which is much cheaper than stacking single beams.
+    """
+    rows = {name: [] for name in ('support_pos', 'hinge_pos', 'point_pos', 'point_fy', 'point_fx', 'moment_pos',
+                                  'moment_val', 'dist_start', 'dist_end', 'dist_wstart', 'dist_wend')}
+    for (_, elements, _, _) in parsed:
+        dist = [e for e in elements if isinstance(e, (UDL, UVL))]
+        row = {'support_pos': [e.pos for e in elements if isinstance(e, Reaction)],
+               'hinge_pos': [e.pos for e in elements if isinstance(e, Hinge)],
+               'moment_pos': [e.pos for e in elements if isinstance(e, PointMoment)],
+               'moment_val': [e.mom for e in elements if isinstance(e, PointMoment)],
+               'dist_start': [e.start for e in dist], 'dist_end': [e.end for e in dist],
+               'dist_wstart': [e.loadpm if isinstance(e, UDL) else e.startload for e in dist],
+               'dist_wend': [e.loadpm if isinstance(e, UDL) else e.endload for e in dist]}
+        points = [e for e in elements if isinstance(e, PointLoad)]
+        row.update(point_pos=[p.pos for p in points], point_fy=[p.load_y for p in points],
+                   point_fx=[p.load_x for p in points])
+        for name, values in row.items():
+            rows[name].append(values)
+
+    def padded(values):
+        out = np.zeros((len(values), max(len(v) for v in values)))
+        for k, v in enumerate(values):
+            out[k, :len(v)] = v
+        return out
+
+    types, sides = _signature(parsed[0][1])
+    fields = {name: padded(values) for name, values in rows.items()}
+    return BeamArrays(np.array([p[0] for p in parsed]), types, fields.pop('support_pos'), sides,
+                      fields.pop('hinge_pos'), **fields)
+
+
+def _reaction_values(reactions, rx, ry, mom):
+    out = {}
+    for i, r in enumerate(reactions):
+        if r.type != 'roller':
+            out[f"R_{r.pos_sym}_x"] = float(rx[i])
+        out[f"R_{r.pos_sym}_y"] = float(ry[i])
+        if r.type == 'fixed':
+            out[f"M_{r.pos_sym}"] = float(mom[i])
+    return out
+
+
+def _solve_group(parsed: list):
+    """Solves parsed models sharing support signature, `ndivs` and `diagram` as one batch."""
+    arrays = _batch_arrays(parsed)
+    # indeterminate or unstable beams (as rejected by `Beam.fast_solve`) get an error result each
+    check = classify_arrays(arrays)
+    bad = check['kind'] != 'determinate'
+    if bad.any():
+        good = iter(_solve_group([p for p, b in zip(parsed, bad) if not b]) if not bad.all() else ())
+        return [{'error': describe(check['kind'][k], check['degree'][k], check['freedom'][k])} if bad[k]
+                else next(good) for k in range(len(parsed))]
+    rx, ry, mom = arrays.solve_reactions()
+    ndivs, diagram = parsed[0][2], parsed[0][3]
+    peaks = arrays.extrema(ry, mom, ndivs)
+    if diagram > 0:
+        x = arrays.length[:, None]*np.linspace(0, 1, diagram)
+        shear, moment = arrays.shear_at(x, ry), arrays.moment_at(x, ry, mom)
+
+    results = []
+    for k, (_, elements, _, _) in enumerate(parsed):
+        reactions = [e for e in elements if isinstance(e, Reaction)]
+        result = {'reactions': _reaction_values(reactions, rx[k], ry[k], mom[k]),
+                  'extrema': {label: float(peaks[label][k]) for label in EXTREMA}}
+        if diagram > 0:
+            result.update(x=x[k].tolist(), shear=shear[k].tolist(), moment=moment[k].tolist())
+        results.append(result)
+    return results
+
+
+def solve_batch(models: list):
+    """
+    ### Description
+    Solves a list of JSON models. Models with the same supports are solved together; an invalid model
+    only produces an error result for itself.
+
+    Returns list of result dicts in the order of `models`
+    """
+    results = [None]*len(models)
+    groups = {}
+    for k, model in enumerate(models):
+        try:
+            parsed = parse_model(model)
+        except Exception as e:
+            results[k] = {'error': str(e) or repr(e)}
+            continue
+        key = (_signature(parsed[1]), parsed[2], parsed[3])
+        groups.setdefault(key, []).append((k, parsed))
+
+    for members in groups.values():
+        try:
+            solved = _solve_group([p for (_, p) in members])
+        except Exception:
+            # one bad beam (e.g. a singular system) spoils the batch, solve one by one
+            solved = []
+            for (_, p) in members:
+                try:
+                    solved.extend(_solve_group([p]))
+                except Exception as e:
+                    solved.append({'error': str(e) or repr(e)})
+        for (k, _), result in zip(members, solved):
+            results[k] = result
+    return results
+
+
+def _warm():
+    """Initializer of worker processes: imports everything and runs one small solve."""
+    solve_batch([{'length': 1, 'elements': [
+        {'element': 'Reaction', 'pos': 0, 'type': 'h', 'pos_sym': 'A'},
+        {'element': 'Reaction', 'pos': 1, 'type': 'r', 'pos_sym': 'B'},
+        {'element': 'PointLoad', 'pos': 0.5, 'load': 1, 'inverted': True}]}])
+
+
+def _ping():
+    return True
+
+
+class LatencyHistogram:
+    """
+    ## Description
+    Histogram of durations with logarithmic buckets, cheap enough to update on every request.
+
+    ### Arguments
+    - `lowest:float = 1e-5`, `highest:float = 10.0` = Range of bucket edges in seconds
+    - `per_decade:int = 10` = Number of buckets per factor of 10
+
+    ### Attributes
+    - `edges:list` = Upper edges of buckets (the last bucket collects everything above `highest`)
+    - `counts:list`, `count:int`, `total:float`, `max:float`
+    """
+
+    def __init__(self, lowest: float = 1e-5, highest: float = 10.0, per_decade: int = 10):
+        n = int(round(np.log10(highest/lowest)*per_decade))
+        self.edges = np.logspace(np.log10(lowest), np.log10(highest), n + 1).tolist()
+        self.counts = [0]*(len(self.edges) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        self.counts[bisect.bisect_left(self.edges, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q: float):
+        """Upper edge of bucket containing the `q`-th percentile (`0 < q <= 100`), `nan` if empty"""
+        if self.count == 0:
+            return float('nan')
+        target = q/100*self.count
+        seen = 0
+        for edge, n in zip(self.edges + [self.max], self.counts):
+            seen += n
+            if seen >= target:
+                return min(edge, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {'count': self.count,
+                'mean': self.total/self.count if self.count else None,
+                'max': self.max,
+                'p50': self.percentile(50), 'p90': self.percentile(90), 'p99': self.percentile(99),
+                'buckets': [[edge, n] for (edge, n) in zip(self.edges + [None], self.counts) if n]}
+
+
+class Overloaded(Exception):
+    """Raised by `SolveServer.submit` when the request queue is full."""
+
+
+class SolveServer:
+    """
+    ## Description
+    Asyncio HTTP/JSON solve server with a warm worker pool, micro batching and bounded queue.
+
+    ### Arguments
+    - `host:str = '127.0.0.1'`, `port:int = 8765` = Address to listen on (`port=0` picks a free port)
+    - `workers:int = 2` = Number of worker processes. `0` solves in one thread of the server process.
+    - `max_batch:int = 256` = Maximum number of models solved together
+    - `max_delay:float = 0.002` = Seconds to wait for more requests after the first one of a batch
+    - `max_queue:int = 1024` = Models waiting beyond this limit are rejected with `503`
+    - `max_inflight:int = None` = Batches being solved at once, default `2*workers` (1 without workers)
+    - `max_body:int = 16*2**20` = Largest accepted request body in bytes
+
+    ### Attributes
+    - `histograms:dict` = `LatencyHistogram` for `'queue'`, `'solve'` and `'request'`
+    - `batch_sizes:list` = Number of batches of each size
+    - `rejected:int` = Number of models rejected because the queue was full
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8765, workers: int = 2, max_batch: int = 256,
+                 max_delay: float = 0.002, max_queue: int = 1024, max_inflight: int = None, max_body: int = 16*2**20):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_queue = max_queue
+        self.max_inflight = max_inflight or max(1, 2*workers)
+        self.max_body = max_body
+        self.histograms = {name: LatencyHistogram() for name in ('queue', 'solve', 'request')}
+        self.batch_sizes = [0]*(max_batch + 1)
+        self.rejected = 0
+        self._server = None
+        self._tasks = set()
+
+    async def start(self):
+        """Starts worker pool (waiting until every worker is warm), batcher and listening socket."""
+        loop = asyncio.get_running_loop()
+        if self.workers > 0:
+            self._pool = ProcessPoolExecutor(self.workers, initializer=_warm)
+            await asyncio.gather(*[loop.run_in_executor(self._pool, _ping) for _ in range(self.workers)])
+        else:
+            self._pool = ThreadPoolExecutor(1)
+        self._queue = asyncio.Queue(self.max_queue)
+        self._inflight = asyncio.Semaphore(self.max_inflight)
+        self._batcher = asyncio.create_task(self._batch_loop())
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        """Stops listening, cancels pending work and shuts the worker pool down."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        self._batcher.cancel()
+        for task in list(self._tasks):
+            task.cancel()
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def submit(self, model: dict):
+        """
+        ### Description
+        Queues one model for the next micro batch and waits for its result.
+        Raises `Overloaded` if the queue is full.
+        """
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((model, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise Overloaded("Solve queue is full") from None
+        return await future
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # waiting here lets the queue fill up, which is what rejects new requests under overload
+            await self._inflight.acquire()
+            task = asyncio.create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: list):
+        try:
+            start = time.perf_counter()
+            for (_, _, queued) in batch:
+                self.histograms['queue'].record(start - queued)
+            self.batch_sizes[len(batch)] += 1
+            try:
+                results = await asyncio.get_running_loop().run_in_executor(
+                    self._pool, solve_batch, [model for (model, _, _) in batch])
+            except Exception as e:  # a crashed worker fails this batch only
+                results = [{'error': f"Solve failed: {e!r}"}]*len(batch)
+            self.histograms['solve'].record(time.perf_counter() - start)
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self._inflight.release()
+
+    def stats(self):
+        """Histograms (as dicts) and counters served at `/stats`"""
+        sizes = {str(n): c for (n, c) in enumerate(self.batch_sizes) if c}
+        return {'latency': {name: h.to_dict() for (name, h) in self.histograms.items()},
+                'batch_sizes': sizes, 'queued': self._queue.qsize(), 'rejected': self.rejected,
+                'workers': self.workers}
+
+    async def _route(self, method: str, path: str, body: bytes):
+        """Returns tuple `(status, payload, extra_headers)`"""
+        if path == '/health':
+            return 200, {'status': 'ok'}, {}
+        if path == '/stats':
+            return 200, self.stats(), {}
+        if path != '/solve':
+            return 404, {'error': f"Unknown path {path}"}, {}
+        if method != 'POST':
+            return 405, {'error': "Use POST to solve"}, {}
+        try:
+            models = json.loads(body)
+        except ValueError as e:
+            return 400, {'error': f"Invalid JSON: {e}"}, {}
+        try:
+            if isinstance(models, list):
+                # accept all models of a list or none of them
+                if self._queue.maxsize - self._queue.qsize() < len(models):
+                    self.rejected += len(models)
+                    raise Overloaded("Solve queue is full")
+                results = await asyncio.gather(*[self.submit(m) for m in models])
+                return 200, list(results), {}
+            return 200, await self.submit(models), {}
+        except Overloaded as e:
+            return 503, {'error': str(e)}, {'Retry-After': '1'}
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                start = time.perf_counter()
+                method, path, version = line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = header.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+
+                size = int(headers.get('content-length', 0))
+                if size > self.max_body:
+                    status, payload, extra = 413, {'error': "Request body too large"}, {}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(size)
+                    status, payload, extra = await self._route(method, path.split('?')[0], body)
+                    keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+
+                data = json.dumps(payload).encode()
+                head = [f"HTTP/1.1 {status} {STATUS[status]}", "Content-Type: application/json",
+                        f"Content-Length: {len(data)}", f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+                head += [f"{k}: {v}" for (k, v) in extra.items()]
+                writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + data)
+                await writer.drain()
+                if path.startswith('/solve'):
+                    self.histograms['request'].record(time.perf_counter() - start)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+def solve_remote(models, host: str = '127.0.0.1', port: int = 8765, timeout: float = 30.0):
+    """
+    ### Description
+    Minimal blocking client: posts one model (or a list of models) to a running `SolveServer`.
+    Raises `Overloaded` on `503`, `ValueError` on other errors.
+    """
+    conn = http.client.HTTPConnection(host, port, timeout=timeout)
+    try:
+        conn.request('POST', '/solve', json.dumps(models), {'Content-Type': 'application/json'})
+        response = conn.getresponse()
+        payload = json.loads(response.read())
+    finally:
+        conn.close()
+    if response.status == 503:
+        raise Overloaded(payload['error'])
+    if response.status != 200:
+        raise ValueError(payload['error'])
+    return payload
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local HTTP/JSON beam solve server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--max-batch', type=int, default=256)
+    parser.add_argument('--max-delay', type=float, default=0.002)
+    parser.add_argument('--max-queue', type=int, default=1024)
+    args = parser.parse_args(argv)
+    server = SolveServer(args.host, args.port, args.workers, args.max_batch, args.max_delay, args.max_queue)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
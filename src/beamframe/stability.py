@@ -0,0 +1,102 @@
+"""
+Module for classifying beams as determinate, indeterminate or unstable before solving
+
+`Beam.calculate_reactions` hands the equations of equilibrium to `sympy.solve`, which on an unstable or
+indeterminate beam works for a long time and then returns an empty or parametric solution. Here the
+same equations are written as a numeric matrix (one column per unknown reaction, one row per equation:
+`sum(Fx)`, `sum(Fy)`, `sum(M)` and one moment equation per internal hinge) and classified by its rank:
+
+- `degree = n_unknowns - rank` is the degree of static indeterminacy
+- `freedom = n_equations - rank` counts independent rigid body motions (a mechanism if positive)
+
+The horizontal equation only counts if some support restrains the beam horizontally or a load has a
+horizontal component, so a beam on rollers under vertical loads is determinate as usual. The rank of a
+small matrix costs far less than a symbolic solve, and a whole batch of beams is classified at once.
+
+#### Example
+```
+classify(10, (Reaction(0, 'h', 'A'), Reaction(10, 'h', 'B'), PointLoad(4, 10, True)))
+# Classification(kind='indeterminate', degree=1, freedom=0)
+require_determinate(10, elements)     # raises ValueError before any solving work
+```
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from .superposition import BeamArrays
+
+Classification = namedtuple('Classification', ['kind', 'degree', 'freedom'])
+Classification.__doc__ = """
+Result of `classify`:
+- `kind:str` = `'determinate'`, `'indeterminate'` or `'mechanism'`
+- `degree:int` = Degree of static indeterminacy (number of redundant reactions)
+- `freedom:int` = Number of independent rigid body motions the supports and hinges allow
+"""
+
+
+def classify_arrays(arrays: BeamArrays, horizontal: bool = True):
+    """
+    ### Description
+    Classifies every beam of a batch by the rank of its equilibrium matrix.
+
+    #### Arguments
+    - `arrays` = `BeamArrays`
+    - `horizontal:bool = True` = Include horizontal equilibrium. Vectorised solvers of this library give all
+        horizontal load to the first `'hinge'` or `'fixed'` support and can ignore it
+
+    Returns dict of arrays with shape `(batch,)`: `kind`, `degree`, `freedom`
+    """
+    A = arrays.equilibrium_matrix()
+    n_eq, n_unknowns = A.shape[1:]
+    rank = np.linalg.matrix_rank(A) if n_unknowns else np.zeros(arrays.batch, dtype=int)
+    degree = n_unknowns - rank
+    freedom = n_eq - rank
+    if horizontal:
+        # the horizontal equation is independent: one column per support restraining the beam horizontally
+        restraints = sum(t != 'roller' for t in arrays.support_types)
+        loaded = np.any(arrays.point_fx != 0, axis=1)
+        degree = degree + max(restraints - 1, 0)
+        freedom = freedom + ((restraints == 0) & loaded)
+    kind = np.where(freedom > 0, 'mechanism', np.where(degree > 0, 'indeterminate', 'determinate'))
+    return {'kind': kind, 'degree': degree, 'freedom': freedom}
+
+
+def classify(length: float, elements: object, horizontal: bool = True):
+    """
+    ### Description
+    Classifies a beam given by the objects that would be passed to `Beam.fast_solve`.
+
+    Returns `Classification`
+    """
+    result = classify_arrays(BeamArrays.from_elements(length, elements), horizontal)
+    return Classification(str(result['kind'][0]), int(result['degree'][0]), int(result['freedom'][0]))
+
+
+def describe(kind: str, degree: int, freedom: int):
+    """Error message for a beam that is not statically determinate"""
+    if kind == 'mechanism':
+        return (f"Beam is geometrically unstable (a mechanism with {freedom} degree(s) of freedom): "
+                "supports and hinges cannot hold it in equilibrium")
+    return f"Beam is statically indeterminate to degree {degree}: equilibrium alone cannot give the reactions"
+
+
+def require_determinate(length: float, elements: object, horizontal: bool = True):
+    """Raises `ValueError` unless the beam is statically determinate and stable"""
+    c = classify(length, elements, horizontal)
+    if c.kind != 'determinate':
+        raise ValueError(describe(*c))
+
+
+def require_determinate_arrays(arrays: BeamArrays, horizontal: bool = False):
+    """
+    ### Description
+    Raises `ValueError` naming the first beam of the batch that is not statically determinate and stable.
+    Horizontal equilibrium is ignored by default, as in `BeamArrays.solve_reactions`.
+    """
+    result = classify_arrays(arrays, horizontal)
+    bad = np.flatnonzero(result['kind'] != 'determinate')
+    if len(bad):
+        i = bad[0]
+        raise ValueError(f"{len(bad)} of {arrays.batch} beams rejected, first is beam {i}. " +
+                         describe(result['kind'][i], result['degree'][i], result['freedom'][i]))
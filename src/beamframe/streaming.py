@@ -0,0 +1,122 @@
+"""
+Module for chunked evaluation of very high resolution diagrams
+
+`Beam.generate_shear_values` and `Beam.generate_moment_values` evaluate every load term over the whole
+`xbeam` array, so memory grows with `ndivs` times the number of temporaries. Here reactions are solved
+numerically once (`BeamArrays`) and shear force and bending moment are evaluated `chunk` stations at a
+time. Stations are generated per chunk, so no array of `ndivs` values is ever allocated unless the
+output itself is written to a memory mapped file. NumPy releases the GIL in its loops, so chunks may
+be evaluated by several threads.
+
+#### Example
+```
+b = Beam(100)
+loads = (Reaction(0, 'h', 'A'), Reaction(100, 'r', 'B'), UDL(0, 5, 100))
+for x, V, M in iter_diagram(b, loads, ndivs=10**8, chunk=10**6):
+    ...
+out = diagram_to_memmap('diagram.npy', b, loads, ndivs=10**8, workers=4)
+```
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .superposition import BeamArrays
+
+
+def _solved_arrays(beam: object, elements: object):
+    arrays = BeamArrays.from_elements(beam.length, elements)
+    _, ry, mom = arrays.solve_reactions()
+    return arrays, ry, mom
+
+
+def _stations(length: float, ndivs: int, start: int, stop: int, dtype):
+    """Stations `start:stop` of `np.linspace(0, length, ndivs)` without creating the whole array."""
+    x = np.arange(start, stop, dtype=np.float64)*(length/(ndivs - 1))
+    if stop == ndivs:
+        x[-1] = length
+    return x.astype(dtype, copy=False)
+
+
+def _chunk_values(arrays, ry, mom, ndivs, start, stop, dtype):
+    x = _stations(arrays.length[0], ndivs, start, stop, np.float64)
+    V = arrays.shear_at(x, ry)[0]
+    M = arrays.moment_at(x, ry, mom)[0]
+    return x.astype(dtype, copy=False), V.astype(dtype, copy=False), M.astype(dtype, copy=False)
+
+
+def _bounds(ndivs: int, chunk: int):
+    if ndivs < 2:
+        raise ValueError("ndivs must be at least 2")
+    if chunk < 1:
+        raise ValueError("chunk must be positive")
+    return [(start, min(start + chunk, ndivs)) for start in range(0, ndivs, chunk)]
+
+
+def iter_diagram(beam: object, elements: object, ndivs: int = None, chunk: int = 1_000_000, workers: int = 0,
+                 dtype=np.float64):
+    """
+    ### Description
+    Yields `(x, V, M)` for consecutive chunks of `ndivs` equally spaced stations from `0` to `beam.length`.
+
+    #### Arguments
+    - `beam` = `Beam` object (its `ndivs` is used when `ndivs` is not given)
+    - `elements` = List or tuple of all objects that would be passed to `Beam.fast_solve`
+    - `ndivs:int = None` = Total number of stations
+    - `chunk:int = 1_000_000` = Stations per chunk
+    - `workers:int = 0` = Threads evaluating chunks. At most `2*workers` chunks are held at once.
+    - `dtype = np.float64` = Type of yielded arrays
+    """
+    ndivs = beam.ndivs if ndivs is None else int(ndivs)
+    arrays, ry, mom = _solved_arrays(beam, elements)
+    bounds = _bounds(ndivs, chunk)
+
+    if workers <= 0:
+        for (start, stop) in bounds:
+            yield _chunk_values(arrays, ry, mom, ndivs, start, stop, dtype)
+        return
+
+    with ThreadPoolExecutor(workers) as pool:
+        pending = deque()
+        for (start, stop) in bounds:
+            pending.append(pool.submit(_chunk_values, arrays, ry, mom, ndivs, start, stop, dtype))
+            if len(pending) >= 2*workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def diagram_to_memmap(filename: str, beam: object, elements: object, ndivs: int = None, chunk: int = 1_000_000,
+                      workers: int = 0, dtype=np.float64):
+    """
+    ### Description
+    Writes `x`, shear force and bending moment of `ndivs` stations to a `.npy` file of shape `(ndivs, 3)`
+    chunk by chunk. Each worker writes its chunk straight into the memory mapped file.
+    The file can be read back lazily with `np.load(filename, mmap_mode='r')`.
+
+    #### Arguments
+    - `filename:str` = Path of `.npy` file
+    - Other arguments are as for `iter_diagram`
+
+    Returns the memory mapped array (flushed)
+    """
+    ndivs = beam.ndivs if ndivs is None else int(ndivs)
+    arrays, ry, mom = _solved_arrays(beam, elements)
+    out = np.lib.format.open_memmap(filename, mode='w+', dtype=dtype, shape=(ndivs, 3))
+
+    def write(bounds):
+        start, stop = bounds
+        for col, values in enumerate(_chunk_values(arrays, ry, mom, ndivs, start, stop, dtype)):
+            out[start:stop, col] = values
+
+    if workers <= 0:
+        for b in _bounds(ndivs, chunk):
+            write(b)
+    else:
+        with ThreadPoolExecutor(workers) as pool:
+            # queued tasks hold only their bounds, so at most `workers` chunks of temporaries are alive
+            for _ in pool.map(write, _bounds(ndivs, chunk)):
+                pass
+    out.flush()
+    return out
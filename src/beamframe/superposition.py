@@ -0,0 +1,523 @@
+"""
+Module for vectorised linear superposition of beam loads
+
+A statically determinate beam is linear: reactions, shear force and bending moment are
+sums of the contributions of every load. This module keeps a beam (or a whole batch of beams
+sharing one support layout) as plain numpy arrays so that reactions and diagrams can be
+evaluated without any symbolic work.
+
+Sign conventions are the same as in `beam.py`:
+- upward forces are positive
+- counter clockwise moments are positive
+- `V(x)` is the sum of vertical forces to the left of `x`
+- `M(x)` is the moment of all forces to the left of `x` (sagging positive)
+"""
+import numpy as np
+
+from .beam import UDL, UVL, Hinge, PointLoad, PointMoment, Reaction
+
+
+def _as_batch(values, batch: int, name: str):
+    """
+    Converts `values` to a 2d float array of shape `(batch, n)`.
+    1d inputs are shared by every beam in the batch.
+    """
+    arr = np.asarray(values, dtype=float)
+    if arr.ndim == 0:
+        arr = arr.reshape(1, 1)
+    elif arr.ndim == 1:
+        arr = arr.reshape(1, -1)
+    elif arr.ndim != 2:
+        raise ValueError(f"'{name}' must be at most 2 dimensional")
+    if arr.shape[0] not in (1, batch):
+        raise ValueError(
+            f"'{name}' has batch size {arr.shape[0]}, expected {batch}")
+    return np.broadcast_to(arr, (batch, arr.shape[1]))
+
+
+class BeamArrays:
+    """
+    ## Description
+    Numeric description of a batch of beams which share the same support layout
+    (support types and hinge sides) but may differ in lengths, positions and magnitudes.
+
+    Every array has shape `(batch, n)`; a 1d array is shared by every beam of the batch.
+
+    ### Arguments
+    - `length` = Length of each beam, scalar or shape `(batch,)`
+    - `support_types:tuple` = Support type of each reaction: `'roller'`, `'hinge'` or `'fixed'`
+    - `support_pos` = Positions of supports
+    - `hinge_sides:tuple = ()` = Side of each internal hinge, `'l'` or `'r'` (see `Hinge`)
+    - `hinge_pos = None` = Positions of internal hinges
+    - `point_pos, point_fy, point_fx` = Positions and (signed) components of point loads
+    - `moment_pos, moment_val` = Positions and (counter clockwise positive) values of point moments
+    - `dist_start, dist_end, dist_wstart, dist_wend` = Linearly varying distributed loads
+        (`UDL` and `UVL`) given by their extent and signed load per meter at both ends
+
+    ### Attributes
+    - `batch:int` = Number of beams described
+    - `unknowns:list` = `(support index, 'ry' or 'mom')` pairs in the column order of `equilibrium_matrix()`
+    - `columns:dict` = `{element: (kind, column)}`, only for arrays built with `from_elements`
+    """
+
+    def __init__(self, length, support_types: tuple, support_pos, hinge_sides: tuple = (), hinge_pos=None,
+                 point_pos=None, point_fy=None, point_fx=None, moment_pos=None, moment_val=None,
+                 dist_start=None, dist_end=None, dist_wstart=None, dist_wend=None):
+        self.support_types = tuple(_support_type(t) for t in support_types)
+        self.hinge_sides = tuple(side.lower()[0] for side in hinge_sides)
+
+        arrays = [support_pos, hinge_pos, point_pos, point_fy, point_fx,
+                  moment_pos, moment_val, dist_start, dist_end, dist_wstart, dist_wend]
+        sizes = [np.shape(a)[0] for a in arrays if a is not None and np.ndim(a) == 2]
+        self.batch = max(sizes + [np.size(length)])
+
+        self.length = np.broadcast_to(
+            np.asarray(length, dtype=float).reshape(-1), (self.batch,))
+        self.support_pos = _as_batch(support_pos, self.batch, 'support_pos')
+        if self.support_pos.shape[1] != len(self.support_types):
+            raise ValueError(
+                "Number of support positions does not match number of support types")
+        self.hinge_pos = _as_batch(
+            np.empty(0) if hinge_pos is None else hinge_pos, self.batch, 'hinge_pos')
+        if self.hinge_pos.shape[1] != len(self.hinge_sides):
+            raise ValueError(
+                "Number of hinge positions does not match number of hinge sides")
+
+        def pair(pos, val, name):
+            pos = _as_batch(np.empty(0) if pos is None else pos,
+                            self.batch, f'{name}_pos')
+            val = np.zeros(pos.shape) if val is None else _as_batch(
+                val, self.batch, name)
+            return pos, np.broadcast_to(val, pos.shape)
+
+        self.point_pos, self.point_fy = pair(point_pos, point_fy, 'point_fy')
+        self.point_fx = np.broadcast_to(
+            np.zeros(1) if point_fx is None else _as_batch(point_fx, self.batch, 'point_fx'), self.point_pos.shape)
+        self.moment_pos, self.moment_val = pair(
+            moment_pos, moment_val, 'moment_val')
+        self.dist_start, self.dist_end = pair(dist_start, dist_end, 'dist_end')
+        self.dist_wstart = np.broadcast_to(
+            np.zeros(1) if dist_wstart is None else _as_batch(dist_wstart, self.batch, 'dist_wstart'), self.dist_start.shape)
+        self.dist_wend = np.broadcast_to(
+            self.dist_wstart if dist_wend is None else _as_batch(dist_wend, self.batch, 'dist_wend'), self.dist_start.shape)
+
+        self.columns = {}
+        self.unknowns = []
+        for i, stype in enumerate(self.support_types):
+            self.unknowns.append((i, 'ry'))
+            if stype == 'fixed':
+                self.unknowns.append((i, 'mom'))
+
+    @classmethod
+    def from_elements(cls, length: float, elements: object):
+        """
+        ### Description
+        Builds a single beam (`batch = 1`) from the same list of objects passed to `Beam.fast_solve`.
+
+        #### Arguments
+        - `length:float` = Length of the beam
+        - `elements` = List or tuple of `Reaction, Hinge, PointLoad, UDL, UVL, PointMoment` objects
+        """
+        rxns = [e for e in elements if isinstance(e, Reaction)]
+        hinges = [e for e in elements if isinstance(e, Hinge)]
+        points = [e for e in elements if isinstance(e, PointLoad)]
+        moments = [e for e in elements if isinstance(e, PointMoment)]
+        udls = [e for e in elements if isinstance(e, UDL)]
+        uvls = [e for e in elements if isinstance(e, UVL)]
+
+        arrays = cls(length,
+                     [r.type for r in rxns], [r.pos for r in rxns],
+                     [h.side for h in hinges], [h.pos for h in hinges],
+                     point_pos=[p.pos for p in points],
+                     point_fy=[p.load_y for p in points],
+                     point_fx=[p.load_x for p in points],
+                     moment_pos=[m.pos for m in moments],
+                     moment_val=[m.mom for m in moments],
+                     dist_start=[u.start for u in udls] +
+                     [u.start for u in uvls],
+                     dist_end=[u.end for u in udls] + [u.end for u in uvls],
+                     dist_wstart=[u.loadpm for u in udls] +
+                     [u.startload for u in uvls],
+                     dist_wend=[u.loadpm for u in udls] + [u.endload for u in uvls])
+        # remember which column of which array describes each element
+        for (kind, objs) in (('support', rxns), ('hinge', hinges), ('point', points),
+                             ('moment', moments), ('dist', udls + uvls)):
+            for col, obj in enumerate(objs):
+                arrays.columns[obj] = (kind, col)
+        return arrays
+
+    @property
+    def support_signature(self):
+        """Support types and hinge sides, which fix the structure of the equilibrium equations."""
+        return self.support_types, self.hinge_sides
+
+    def equilibrium_matrix(self):
+        """
+        ### Description
+        Coefficients of unknown reactions in the equations of equilibrium:
+        `sum(Fy) = 0`, `sum(M about origin) = 0` and one moment equation per internal hinge.
+
+        Returns array of shape `(batch, 2 + n_hinges, len(self.unknowns))`
+        """
+        n_eq = 2 + len(self.hinge_sides)
+        A = np.zeros((self.batch, n_eq, len(self.unknowns)))
+        for col, (i, kind) in enumerate(self.unknowns):
+            pos = self.support_pos[:, i]
+            if kind == 'ry':
+                A[:, 0, col] = 1.0
+                A[:, 1, col] = pos
+            else:
+                A[:, 1, col] = 1.0
+            for j, side in enumerate(self.hinge_sides):
+                h = self.hinge_pos[:, j]
+                on_side = _on_side(pos, h, side)
+                A[:, 2+j, col] = on_side * ((pos - h) if kind == 'ry' else 1.0)
+        return A
+
+    def load_vector(self):
+        """
+        ### Description
+        Contribution of applied loads to each equation of `equilibrium_matrix()`.
+
+        Returns array of shape `(batch, 2 + n_hinges)`
+        """
+        b = np.zeros((self.batch, 2 + len(self.hinge_sides)))
+        b[:, 0] = self.point_fy.sum(axis=1)
+        b[:, 1] = (self.point_pos*self.point_fy).sum(axis=1) + \
+            self.moment_val.sum(axis=1)
+
+        force, mom0 = _dist_resultants(
+            self.dist_start, self.dist_end, self.dist_wstart, self.dist_wend, 0.0)
+        b[:, 0] += force.sum(axis=1)
+        b[:, 1] += mom0.sum(axis=1)
+
+        for j, side in enumerate(self.hinge_sides):
+            h = self.hinge_pos[:, j:j+1]
+            b[:, 2+j] = (_on_side(self.point_pos, h, side)*(self.point_pos-h)*self.point_fy).sum(axis=1) + \
+                (_on_side(self.moment_pos, h, side)*self.moment_val).sum(axis=1)
+            if side == 'l':
+                lo, hi = self.dist_start, np.minimum(self.dist_end, h)
+            else:
+                lo, hi = np.maximum(self.dist_start, h), self.dist_end
+            _, mom_h = _dist_resultants(
+                self.dist_start, self.dist_end, self.dist_wstart, self.dist_wend, h, lo, hi)
+            b[:, 2+j] += mom_h.sum(axis=1)
+        return b
+
+    def solve_reactions(self):
+        """
+        ### Description
+        Solves the equations of equilibrium for every beam in the batch.
+
+        Horizontal load is resisted by the first `'hinge'` or `'fixed'` support.
+
+        Returns tuple `(rx, ry, mom)` of arrays with shape `(batch, n_supports)`
+        """
+        A = self.equilibrium_matrix()
+        if A.shape[1] != A.shape[2]:
+            raise ValueError(
+                f"Beam is not statically determinate: {A.shape[1]} equations for {A.shape[2]} unknown reactions")
+        try:
+            sol = np.linalg.solve(A, -self.load_vector()[..., None])[..., 0]
+        except np.linalg.LinAlgError:
+            raise ValueError(
+                "Beam is geometrically unstable: equilibrium equations are singular") from None
+        return self.scatter_reactions(sol)
+
+    def scatter_reactions(self, sol):
+        """
+        ### Description
+        Distributes the solution vector(s) of `equilibrium_matrix()` to per support arrays
+        and adds horizontal reactions.
+
+        #### Arguments
+        - `sol` = Solution of shape `(batch, len(self.unknowns))` or `(batch, ..., len(self.unknowns))`
+
+        Returns tuple `(rx, ry, mom)` of arrays with shape `(batch, ..., n_supports)`
+        """
+        sol = np.asarray(sol, dtype=float)
+        n = len(self.support_types)
+        ry = np.zeros(sol.shape[:-1] + (n,))
+        mom = np.zeros(sol.shape[:-1] + (n,))
+        for col, (i, kind) in enumerate(self.unknowns):
+            if kind == 'ry':
+                ry[..., i] = sol[..., col]
+            else:
+                mom[..., i] = sol[..., col]
+
+        rx = np.zeros_like(ry)
+        restrained = [i for i, t in enumerate(self.support_types) if t != 'roller']
+        if restrained:
+            fx = self.point_fx.sum(axis=1)
+            rx[..., restrained[0]] = -fx.reshape(fx.shape + (1,)*(sol.ndim-2))
+        return rx, ry, mom
+
+    def shear_at(self, x, ry):
+        """
+        ### Description
+        Shear force at positions `x` for every beam in the batch.
+
+        #### Arguments
+        - `x` = Positions, shape `(nx,)` or `(batch, nx)`
+        - `ry` = Vertical reactions, shape `(batch, n_supports)` as returned by `solve_reactions`
+        """
+        x = np.atleast_2d(np.asarray(x, dtype=float))
+        V = np.zeros(np.broadcast_shapes((self.batch, 1), x.shape))
+        for i in range(self.support_pos.shape[1]):
+            V += ry[:, i:i+1] * (x >= self.support_pos[:, i:i+1])
+        for i in range(self.point_pos.shape[1]):
+            V += self.point_fy[:, i:i+1] * (x >= self.point_pos[:, i:i+1])
+        for i in range(self.dist_start.shape[1]):
+            V += _dist_shear(x, self.dist_start[:, i:i+1], self.dist_end[:, i:i+1],
+                             self.dist_wstart[:, i:i+1], self.dist_wend[:, i:i+1])
+        return V
+
+    def moment_at(self, x, ry, mom):
+        """
+        ### Description
+        Bending moment at positions `x` for every beam in the batch.
+
+        #### Arguments
+        - `x` = Positions, shape `(nx,)` or `(batch, nx)`
+        - `ry, mom` = Vertical reactions and reaction moments as returned by `solve_reactions`
+        """
+        x = np.atleast_2d(np.asarray(x, dtype=float))
+        M = np.zeros(np.broadcast_shapes((self.batch, 1), x.shape))
+        for i in range(self.support_pos.shape[1]):
+            arm = x - self.support_pos[:, i:i+1]
+            M += (arm >= 0) * (ry[:, i:i+1]*arm - mom[:, i:i+1])
+        for i in range(self.point_pos.shape[1]):
+            M += self.point_fy[:, i:i+1] * \
+                np.maximum(x - self.point_pos[:, i:i+1], 0)
+        for i in range(self.moment_pos.shape[1]):
+            M -= self.moment_val[:, i:i+1] * (x >= self.moment_pos[:, i:i+1])
+        for i in range(self.dist_start.shape[1]):
+            M += _dist_moment(x, self.dist_start[:, i:i+1], self.dist_end[:, i:i+1],
+                              self.dist_wstart[:, i:i+1], self.dist_wend[:, i:i+1])
+        return M
+
+    def breakpoints(self):
+        """
+        ### Description
+        Sorted positions where diagrams may have kinks or jumps (supports, loads, hinges, beam ends).
+        Returns array of shape `(batch, n)`
+        """
+        return np.sort(np.concatenate([np.zeros((self.batch, 1)), self.length[:, None], self.support_pos,
+                                       self.hinge_pos, self.point_pos, self.moment_pos,
+                                       self.dist_start, self.dist_end], axis=1), axis=1)
+
+
+    def candidate_points(self, ndivs: int = 201):
+        """
+        ### Description
+        Positions where diagram extrema can occur: `ndivs` equally spaced stations on each beam and
+        both sides of every breakpoint. Returns sorted array of shape `(batch, n)`
+        """
+        L = self.length[:, None]
+        bp = np.clip(self.breakpoints(), 0, L)
+        x = np.concatenate([L*np.linspace(0, 1, ndivs), bp, np.clip(bp - 1e-9*L, 0, L)], axis=1)
+        return np.sort(x, axis=1)
+
+    def extrema(self, ry, mom, ndivs: int = 201):
+        """
+        ### Description
+        Maximum and minimum shear force and bending moment (and their positions) of every beam.
+        Moment peaks inside distributed loads are located at zero crossings of shear.
+
+        #### Arguments
+        - `ry, mom` = Reactions as returned by `solve_reactions`
+        - `ndivs:int = 201` = Number of equally spaced stations checked besides breakpoints
+
+        Returns dict of arrays with shape `(batch,)`: `max_moment, x_max_moment, min_moment, x_min_moment,
+        max_shear, x_max_shear, min_shear, x_min_shear`
+        """
+        x = self.candidate_points(ndivs)
+        V = self.shear_at(x, ry)
+        dV = V[:, 1:] - V[:, :-1]
+        cross = (V[:, :-1]*V[:, 1:] < 0) & (dV != 0)
+        root = x[:, :-1] - np.divide(V[:, :-1]*(x[:, 1:] - x[:, :-1]), dV,
+                                     out=np.zeros_like(dV), where=cross)
+        xm = np.concatenate([x, np.where(cross, root, x[:, :-1])], axis=1)
+        M = self.moment_at(xm, ry, mom)
+        rows = np.arange(self.batch)
+        out = {}
+        for (name, values, pos) in (('moment', M, xm), ('shear', V, x)):
+            imax, imin = values.argmax(axis=1), values.argmin(axis=1)
+            out[f'max_{name}'], out[f'x_max_{name}'] = values[rows, imax], pos[rows, imax]
+            out[f'min_{name}'], out[f'x_min_{name}'] = values[rows, imin], pos[rows, imin]
+        return out
+
+
+    def particular_at(self, x, ry, mom):
+        """
+        ### Description
+        Double integral of bending moment (Macaulay's method) and its first integral at positions `x`,
+        i.e. `EI*y` and `EI*dy/dx` without integration constants.
+
+        Returns tuple `(P, dP)` of arrays with shape `(batch, nx)`
+        """
+        x = np.atleast_2d(np.asarray(x, dtype=float))
+        shape = np.broadcast_shapes((self.batch, 1), x.shape)
+        P, dP = np.zeros(shape), np.zeros(shape)
+        for (pos, force, couple) in ((self.support_pos, ry, mom), (self.point_pos, self.point_fy, None),
+                                     (self.moment_pos, None, self.moment_val)):
+            for i in range(pos.shape[1]):
+                arm = np.maximum(x - pos[:, i:i+1], 0)
+                if force is not None:
+                    P += force[:, i:i+1]*arm**3/6
+                    dP += force[:, i:i+1]*arm**2/2
+                if couple is not None:
+                    P -= couple[:, i:i+1]*arm**2/2
+                    dP -= couple[:, i:i+1]*arm
+        for i in range(self.dist_start.shape[1]):
+            y, dy = _dist_deflection(x, self.dist_start[:, i:i+1], self.dist_end[:, i:i+1],
+                                     self.dist_wstart[:, i:i+1], self.dist_wend[:, i:i+1])
+            P += y
+            dP += dy
+        return P, dP
+
+    def deflection_matrix(self):
+        """
+        ### Description
+        Coefficients of integration constants `(C1, C2, rotation jump at each hinge)` in support conditions:
+        zero deflection at every support and zero slope at every fixed support.
+
+        Returns array of shape `(batch, len(self.unknowns), 2 + n_hinges)`
+        """
+        K = np.zeros((self.batch, len(self.unknowns), 2 + len(self.hinge_sides)))
+        for row, (i, kind) in enumerate(self.unknowns):
+            pos = self.support_pos[:, i:i+1]
+            arm = pos - self.hinge_pos
+            if kind == 'ry':  # deflection
+                K[:, row, 0] = 1.0
+                K[:, row, 1] = pos[:, 0]
+                K[:, row, 2:] = np.maximum(arm, 0)
+            else:  # slope
+                K[:, row, 1] = 1.0
+                K[:, row, 2:] = arm >= 0
+        return K
+
+    def deflection_constants(self, ry, mom, EI, P=None, dP=None):
+        """
+        ### Description
+        Solves support conditions for integration constants of `EI*y`.
+        `P, dP` (particular solution at supports) are computed if not given.
+
+        Returns array of shape `(batch, 2 + n_hinges)` (constants are multiplied by `EI`)
+        """
+        if P is None:
+            P, dP = self.particular_at(self.support_pos, ry, mom)
+        rhs = np.zeros((self.batch, len(self.unknowns)))
+        for row, (i, kind) in enumerate(self.unknowns):
+            rhs[:, row] = -(P[:, i] if kind == 'ry' else dP[:, i])
+        K = self.deflection_matrix()
+        if K.shape[1] != K.shape[2]:
+            raise ValueError("Deflection requires a statically determinate beam")
+        return np.linalg.solve(K, rhs[..., None])[..., 0]
+
+    def deflection_at(self, x, ry, mom, EI):
+        """
+        ### Description
+        Deflection (upward positive) at positions `x` for every beam of the batch.
+
+        #### Arguments
+        - `x` = Positions, shape `(nx,)` or `(batch, nx)`
+        - `ry, mom` = Reactions as returned by `solve_reactions`
+        - `EI` = Flexural rigidity, scalar or shape `(batch,)`
+
+        Returns tuple `(y, slope)` of arrays with shape `(batch, nx)`
+        """
+        x = np.atleast_2d(np.asarray(x, dtype=float))
+        C = self.deflection_constants(ry, mom, EI)
+        P, dP = self.particular_at(x, ry, mom)
+        arm = x[..., None] - self.hinge_pos[:, None, :]
+        y = P + C[:, :1] + C[:, 1:2]*x + np.sum(C[:, None, 2:]*np.maximum(arm, 0), axis=-1)
+        slope = dP + C[:, 1:2] + np.sum(C[:, None, 2:]*(arm >= 0), axis=-1)
+        EI = np.reshape(np.asarray(EI, dtype=float), (-1, 1))
+        return y/EI, slope/EI
+
+
+def along_beam(values, length: float):
+    """
+    ### Description
+    Function of x for a property that varies along a beam (like stiffness or foundation modulus), given as
+    a constant, an array of values at equally spaced points from `0` to `length` (linearly interpolated)
+    or a function of x.
+    """
+    if callable(values):
+        return lambda x: np.broadcast_to(np.asarray(values(x), dtype=float), np.shape(x))
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 0:
+        return lambda x: np.full(np.shape(x), float(values))
+    if values.ndim != 1 or len(values) < 2:
+        raise ValueError("Values along the beam must be a 1 dimensional array of at least 2 values")
+    return lambda x: np.interp(x, np.linspace(0, length, len(values)), values)
+
+
+def _support_type(stype: str):
+    """Normalises support type names the same way as `Reaction`."""
+    stype = stype.lower()
+    if stype in ('roller', 'r'):
+        return 'roller'
+    elif stype in ('hinge', 'h'):
+        return 'hinge'
+    elif stype in ('fixed', 'f'):
+        return 'fixed'
+    raise ValueError(f"Unidentified support type: {stype}")
+
+
+def _on_side(pos, hinge_pos, side: str):
+    """1.0 where `pos` lies on given side of hinge, else 0.0 (objects exactly at hinge are excluded, as in `Beam.add_hinge`)"""
+    return (pos < hinge_pos if side == 'l' else pos > hinge_pos).astype(float)
+
+
+def _dist_resultants(start, end, wstart, wend, about, lo=None, hi=None):
+    """
+    Resultant force and moment about `about` of the part `[lo, hi]` of linearly varying loads.
+    Parts with `hi <= lo` contribute nothing.
+    """
+    span = end - start
+    grad = np.divide(wend - wstart, span, out=np.zeros(np.broadcast_shapes(np.shape(span), np.shape(wend))),
+                     where=span != 0)
+    lo = start if lo is None else lo
+    hi = end if hi is None else hi
+    hi = np.maximum(hi, lo)
+    # measure from start of load, w(u) = wstart + grad*u
+    u0, u1 = lo - start, hi - start
+    force = wstart*(u1 - u0) + grad*(u1**2 - u0**2)/2
+    first = wstart*(u1**2 - u0**2)/2 + grad*(u1**3 - u0**3)/3
+    return force, first + (start - about)*force
+
+
+def _dist_shear(x, start, end, wstart, wend):
+    """Shear force due to linearly varying load at positions `x`."""
+    span = end - start
+    grad = np.divide(wend - wstart, span, out=np.zeros(np.broadcast_shapes(np.shape(span), np.shape(wend))),
+                     where=span != 0)
+    u = np.clip(x - start, 0, span)
+    return wstart*u + grad*u**2/2
+
+
+def _dist_moment(x, start, end, wstart, wend):
+    """Bending moment due to linearly varying load at positions `x`."""
+    span = end - start
+    grad = np.divide(wend - wstart, span, out=np.zeros(np.broadcast_shapes(np.shape(span), np.shape(wend))),
+                     where=span != 0)
+    u = np.clip(x - start, 0, span)
+    force = wstart*u + grad*u**2/2
+    first = wstart*u**2/2 + grad*u**3/3
+    return (x - start)*force - first
+
+
+def _dist_deflection(x, start, end, wstart, wend):
+    """Double and single integral of bending moment due to linearly varying load at positions `x`."""
+    span = end - start
+    grad = np.divide(wend - wstart, span, out=np.zeros(np.broadcast_shapes(np.shape(span), np.shape(wend))),
+                     where=span != 0)
+    u = np.clip(x - start, 0, span)
+    t = np.maximum(x - end, 0)
+    force = wstart*u + grad*u**2/2
+    moment = wstart*u**2/2 + grad*u**3/6
+    slope = wstart*u**3/6 + grad*u**4/24
+    y = wstart*u**4/24 + grad*u**5/120
+    return y + slope*t + moment*t**2/2 + force*t**3/6, slope + moment*t + force*t**2/2
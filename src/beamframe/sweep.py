@@ -0,0 +1,253 @@
+"""
+Module for broadcasted parametric sweeps
+
+A design study varies beam length, support positions, load positions and magnitudes.
+Instead of creating a new `Beam` for every combination, `ParameterSweep` builds a batch of
+`BeamArrays` for a chunk of combinations and solves all of them with one call to `numpy.linalg.solve`.
+
+#### Example
+```
+b = Beam(10)
+ra, rb = Reaction(0, 'h', 'A'), Reaction(10, 'r', 'B')
+p = PointLoad(5, 10, inverted=True)
+
+sweep = ParameterSweep(b, (ra, rb, p))
+sweep.vary(rb, 'pos', np.linspace(6, 10, 100))
+sweep.vary(p, 'pos', np.linspace(0, 10, 200))
+result = sweep.run()
+result['max_moment'].reshape(result.shape)
+```
+"""
+import numpy as np
+
+from .beam import PointLoad, PointMoment, Reaction
+from .stability import require_determinate_arrays
+from .superposition import BeamArrays
+
+# attributes that can be varied for each element type
+sweepable = {
+    'Beam': ('length',),
+    'Reaction': ('pos',),
+    'Hinge': ('pos',),
+    'PointLoad': ('pos', 'load'),
+    'PointMoment': ('pos', 'mom'),
+    'UDL': ('start', 'span', 'loadpm'),
+    'UVL': ('start', 'span', 'startload', 'endload'),
+}
+
+
+class SweepResult:
+    """
+    ## Description
+    Labelled 2d array of sweep results: one row per combination, one column per parameter or output.
+
+    ### Attributes
+    - `data` = numpy array of shape `(n_combinations, len(columns))`
+    - `columns:tuple` = Labels of columns (parameters first, then outputs)
+    - `params:tuple`, `outputs:tuple` = Labels of parameter and output columns
+    - `shape:tuple` = Grid shape of combinations (`(n_combinations,)` for zipped sweeps)
+    """
+
+    def __init__(self, data, params: tuple, outputs: tuple, shape: tuple):
+        self.data = data
+        self.params = tuple(params)
+        self.outputs = tuple(outputs)
+        self.columns = self.params + self.outputs
+        self.shape = tuple(shape)
+
+    def __getitem__(self, label: str):
+        return self.data[:, self.columns.index(label)]
+
+    def __len__(self):
+        return len(self.data)
+
+    def grid(self, label: str):
+        """Column `label` reshaped to grid shape of the sweep"""
+        return self[label].reshape(self.shape)
+
+    def to_records(self):
+        """Returns numpy structured array with one field per column"""
+        return np.rec.fromarrays(self.data.T, names=list(self.columns))
+
+
+class ParameterSweep:
+    """
+    ## Description
+    Sweep over combinations of parameters of a beam and its elements.
+
+    ### Arguments
+    - `beam` = `Beam` object
+    - `elements` = List or tuple of all objects that would be passed to `Beam.fast_solve`
+    """
+
+    def __init__(self, beam: object, elements: object):
+        self.beam = beam
+        self.elements = tuple(elements)
+        self.base = BeamArrays.from_elements(beam.length, self.elements)
+        self.varied = []  # list of (name, obj, attr, values)
+
+    def vary(self, obj: object, attr: str, values: object, name: str = None):
+        """
+        ### Description
+        Adds a parameter to the sweep. Values are given as for the constructor of that object
+        (e.g. `load` is the magnitude, its direction still follows `inverted` and `inclination`).
+
+        #### Arguments
+        - `obj` = The `Beam` or one of the elements
+        - `attr:str` = Attribute to vary, see `sweepable`
+        - `values` = 1d array of values
+        - `name:str = None` = Label of parameter. Default is like `'A.pos'` or `'PointLoad0.load'`
+        """
+        cls_name = obj.__class__.__name__
+        if attr not in sweepable.get(cls_name, ()):
+            raise ValueError(
+                f"Cannot vary '{attr}' of {cls_name}. Possible attributes: {sweepable.get(cls_name, ())}")
+        if obj is not self.beam and obj not in self.base.columns:
+            raise ValueError(f"{cls_name} object is not part of this sweep")
+        if name is None:
+            if isinstance(obj, Reaction):
+                label = obj.pos_sym
+            elif obj is self.beam:
+                label = 'beam'
+            else:
+                label = f"{cls_name}{self.base.columns[obj][1]}"
+            name = f"{label}.{attr}"
+        self.varied.append(
+            (name, obj, attr, np.asarray(values, dtype=float).ravel()))
+
+    def linear_shear(self):
+        """`True` if shear force is piecewise linear for any values (no varying distributed loads), so diagram
+        extrema are found exactly from breakpoints and zero crossings of shear alone"""
+        varied = any(attr in ('startload', 'endload') for (_, _, attr, _) in self.varied)
+        return not varied and np.array_equal(self.base.dist_wstart, self.base.dist_wend)
+
+    def combinations(self, grid: bool = True):
+        """
+        ### Description
+        Parameter values of all combinations.
+
+        #### Arguments
+        - `grid:bool = True` = Cartesian product of all values. If `False` values are zipped (must have equal lengths)
+
+        Returns tuple `(values, shape)` where `values` has shape `(n_combinations, n_params)`
+        """
+        arrays = [values for (_, _, _, values) in self.varied]
+        if grid:
+            shape = tuple(len(a) for a in arrays)
+            mesh = np.meshgrid(*arrays, indexing='ij')
+            return np.stack([m.ravel() for m in mesh], axis=1), shape
+        if len(set(len(a) for a in arrays)) > 1:
+            raise ValueError("Zipped sweep requires equal number of values")
+        return np.stack(arrays, axis=1), (len(arrays[0]),)
+
+    def output_labels(self):
+        """Labels of output columns"""
+        labels = []
+        for r in [e for e in self.elements if isinstance(e, Reaction)]:
+            if r.type != 'roller':
+                labels.append(f"R_{r.pos_sym}_x")
+            labels.append(f"R_{r.pos_sym}_y")
+            if r.type == 'fixed':
+                labels.append(f"M_{r.pos_sym}")
+        return labels + ['max_moment', 'x_max_moment', 'min_moment', 'x_min_moment',
+                         'max_shear', 'x_max_shear', 'min_shear', 'x_min_shear']
+
+    def batch_arrays(self, values):
+        """
+        ### Description
+        `BeamArrays` for a batch of parameter combinations.
+
+        #### Arguments
+        - `values` = Parameter values of shape `(n, n_params)` in the order of `vary` calls
+        """
+        base, n = self.base, len(values)
+        fields = {name: np.repeat(getattr(base, name), n, axis=0) for name in
+                  ('support_pos', 'hinge_pos', 'point_pos', 'point_fy', 'point_fx', 'moment_pos', 'moment_val',
+                   'dist_start', 'dist_wstart', 'dist_wend')}
+        fields['dist_span'] = np.repeat(base.dist_end - base.dist_start, n, axis=0)
+        length = np.repeat(base.length, n)
+
+        for k, (_, obj, attr, _) in enumerate(self.varied):
+            v = values[:, k]
+            if obj is self.beam:
+                length = v.copy()
+                continue
+            kind, col = base.columns[obj]
+            if kind in ('support', 'hinge', 'point', 'moment') and attr == 'pos':
+                fields[f'{kind}_pos'][:, col] = v
+            elif isinstance(obj, PointLoad):
+                sign = -1 if obj.inverted else 1
+                angle = obj.inclination*np.pi/180
+                fields['point_fy'][:, col] = sign*v*np.sin(angle)
+                fields['point_fx'][:, col] = sign*v*np.cos(angle)
+            elif isinstance(obj, PointMoment):
+                fields['moment_val'][:, col] = v if obj.ccw else -v
+            else:
+                sign = -1 if obj.inverted else 1
+                if attr in ('start', 'span'):
+                    fields[f'dist_{attr}'][:, col] = v
+                elif attr == 'loadpm':
+                    fields['dist_wstart'][:, col] = sign*v
+                    fields['dist_wend'][:, col] = sign*v
+                elif attr == 'startload':
+                    fields['dist_wstart'][:, col] = sign*v
+                elif attr == 'endload':
+                    fields['dist_wend'][:, col] = sign*v
+
+        return BeamArrays(length, base.support_types, fields['support_pos'], base.hinge_sides, fields['hinge_pos'],
+                          point_pos=fields['point_pos'], point_fy=fields['point_fy'], point_fx=fields['point_fx'],
+                          moment_pos=fields['moment_pos'], moment_val=fields['moment_val'],
+                          dist_start=fields['dist_start'], dist_end=fields['dist_start'] + fields['dist_span'],
+                          dist_wstart=fields['dist_wstart'], dist_wend=fields['dist_wend'])
+
+    def iter_run(self, grid: bool = True, chunk: int = 10000, ndivs: int = 201):
+        """
+        ### Description
+        Same as `run` but yields one `SweepResult` for every `chunk` combinations, so memory stays bounded.
+        """
+        if not self.varied:
+            raise ValueError("Nothing to sweep. Use `vary` to add parameters")
+        values, shape = self.combinations(grid)
+        params = [name for (name, _, _, _) in self.varied]
+        outputs = self.output_labels()
+
+        for start in range(0, len(values), chunk):
+            part = values[start:start+chunk]
+            yield SweepResult(np.column_stack([part, self.evaluate(part, ndivs)]), params, outputs, (len(part),))
+
+    def evaluate(self, values, ndivs: int = 201):
+        """
+        ### Description
+        Reactions and diagram extrema for a batch of parameter `values` of shape `(n, n_params)`.
+
+        Returns array of shape `(n, len(output_labels()))`
+        """
+        arrays = self.batch_arrays(values)
+        require_determinate_arrays(arrays)
+        rx, ry, mom = arrays.solve_reactions()
+        columns = []
+        for i, stype in enumerate(arrays.support_types):
+            if stype != 'roller':
+                columns.append(rx[:, i])
+            columns.append(ry[:, i])
+            if stype == 'fixed':
+                columns.append(mom[:, i])
+        peaks = arrays.extrema(ry, mom, ndivs)
+        columns += [peaks[label] for label in self.output_labels()[len(columns):]]
+        return np.column_stack(columns)
+
+    def run(self, grid: bool = True, chunk: int = 10000, ndivs: int = 201):
+        """
+        ### Description
+        Evaluates reactions and diagram extrema for every combination.
+
+        #### Arguments
+        - `grid:bool = True` = Cartesian product of varied values, else zip them
+        - `chunk:int = 10000` = Number of combinations evaluated together (limits memory)
+        - `ndivs:int = 201` = Stations per beam checked for extrema besides load and support positions
+
+        Returns `SweepResult`
+        """
+        _, shape = self.combinations(grid)
+        parts = list(self.iter_run(grid, chunk, ndivs))
+        return SweepResult(np.concatenate([p.data for p in parts]), parts[0].params, parts[0].outputs, shape)
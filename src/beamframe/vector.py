@@ -0,0 +1,235 @@
+"""
+Module for exact vector export of shear force and bending moment diagrams
+
+Between two breakpoints (supports, loads, hinges, ends of distributed loads) shear force is a polynomial
+of degree at most 2 and bending moment of degree at most 3, and the graph of a cubic over a straight
+x axis is exactly a cubic Bezier curve. Every segment is therefore written as one straight line or one
+Bezier curve, whose control ordinates are found from four samples inside the segment, and jumps at point
+loads and point moments are vertical lines between the one-sided limits. SVG and PDF files are written
+directly: their size grows with the number of loads, not with `ndivs`, and no peak is cut off.
+
+#### Example
+```
+b = Beam(10)
+elements = (Reaction(0, 'h', 'A'), Reaction(10, 'r', 'B'), PointLoad(3, 20, True), UVL(4, 0, 6, 12))
+b.fast_solve(elements)
+export_diagrams(10, elements, 'diagrams.svg')      # or 'diagrams.pdf'
+```
+"""
+import numpy as np
+
+from .beam import Reaction
+from .superposition import BeamArrays
+
+# Bernstein basis of a cubic at four interior parameters; its inverse maps samples to control ordinates
+_T = np.array([1, 3, 5, 7])/8
+_TO_BEZIER = np.linalg.inv(np.column_stack([(1-_T)**3, 3*_T*(1-_T)**2, 3*_T**2*(1-_T), _T**3]))
+
+TITLES = {'sfd': ("Shear Force Diagram", "kN"), 'bmd': ("Bending Moment Diagram", "kNm")}
+COLORS = {'sfd': (1.0, 0.647, 0.0), 'bmd': (0.0, 0.5, 0.0)}
+
+
+def diagram_segments(length: float, loads_list: object, which: str = 'bmd'):
+    """
+    ### Description
+    Exact piecewise Bezier representation of a diagram of a solved beam (reactions are read from
+    `rx_val, ry_val, mom_val` of the `Reaction` objects, as set by `Beam.fast_solve` or any other solver).
+
+    #### Arguments
+    - `length:float` = Length of the beam
+    - `loads_list` = List (or tuple) of beam objects passed to the solver
+    - `which:str = 'bmd'` = `'sfd'` or `'bmd'`
+
+    Returns tuple `(edges, ordinates)`: segment ends of shape `(n + 1,)` and control ordinates of
+    shape `(n, 4)` (the x of the control points are at thirds of each segment)
+    """
+    if which not in TITLES:
+        raise ValueError(f"Unexpected graph type {which}")
+    arrays = BeamArrays.from_elements(length, loads_list)
+    rxns = [e for e in loads_list if isinstance(e, Reaction)]
+    ry = np.array([[float(r.ry_val) for r in rxns]])
+    mom = np.array([[float(r.mom_val) for r in rxns]])
+
+    L = float(length)
+    edges = np.unique(np.clip(arrays.breakpoints()[0], 0, L))
+    edges = edges[np.concatenate([[True], np.diff(edges) > 1e-12*L])]
+    x = edges[:-1, None] + np.diff(edges)[:, None]*_T
+    if which == 'sfd':
+        samples = arrays.shear_at(x.ravel(), ry)[0]
+    else:
+        samples = arrays.moment_at(x.ravel(), ry, mom)[0]
+    return edges, samples.reshape(x.shape) @ _TO_BEZIER.T
+
+
+def diagram_path(length: float, loads_list: object, which: str = 'bmd', tol: float = 1e-9):
+    """
+    ### Description
+    Outline of a diagram as path commands in beam units, starting and ending on the axis:
+    `('M', x, y)`, `('L', x, y)` and `('C', x1, y1, x2, y2, x, y)`. Segments whose control points are
+    collinear within `tol` (relative to the largest ordinate) become straight lines.
+    """
+    edges, ctrl = diagram_segments(length, loads_list, which)
+    scale = max(np.abs(ctrl).max(initial=0.0), 1e-300)
+    path = [('M', edges[0], 0.0)]
+    for (x0, x1), c in zip(zip(edges[:-1], edges[1:]), ctrl):
+        path.append(('L', x0, c[0]))
+        straight = np.allclose(c[1:3], [(2*c[0] + c[3])/3, (c[0] + 2*c[3])/3], rtol=0, atol=tol*scale)
+        if straight:
+            path.append(('L', x1, c[3]))
+        else:
+            path.append(('C', (2*x0 + x1)/3, c[1], (x0 + 2*x1)/3, c[2], x1, c[3]))
+    path.append(('L', edges[-1], 0.0))
+    return _merge_lines(path)
+
+
+def diagram_extrema(edges, ordinates):
+    """
+    ### Description
+    Maximum and minimum of a diagram from `diagram_segments`, from segment ends and the stationary points
+    of every cubic. Returns `((x_max, max), (x_min, min))`
+    """
+    c = np.asarray(ordinates)
+    # derivative of a cubic Bezier is a quadratic with Bernstein coefficients d0, d1, d2
+    d0, d1, d2 = c[:, 1] - c[:, 0], c[:, 2] - c[:, 1], c[:, 3] - c[:, 2]
+    a, b = d0 - 2*d1 + d2, 2*(d1 - d0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        root = np.sqrt(np.maximum(b**2 - 4*a*d0, 0))
+        t = np.column_stack([np.zeros(len(c)), np.ones(len(c)), -d0/b,
+                             (-b + root)/(2*a), (-b - root)/(2*a)])
+    t = np.where(np.isfinite(t) & (t >= 0) & (t <= 1), t, 0.0)
+    values = (c[:, :1]*(1-t)**3 + 3*c[:, 1:2]*t*(1-t)**2 + 3*c[:, 2:3]*t**2*(1-t) + c[:, 3:]*t**3).ravel()
+    x = (edges[:-1, None] + np.diff(edges)[:, None]*t).ravel()
+    i, j = np.argmax(values), np.argmin(values)
+    return (x[i], values[i]), (x[j], values[j])
+
+
+def _merge_lines(path):
+    """Drops zero length lines (no jump between segments) and the middle of collinear line runs"""
+    out = [path[0]]
+    for cmd in path[1:]:
+        last = out[-1][-2:]
+        if cmd[0] == 'L' and np.allclose(cmd[1:], last, rtol=0, atol=1e-12*max(1.0, *np.abs(last))):
+            continue
+        if cmd[0] == 'L' and out[-1][0] == 'L' and len(out) > 1:
+            (xa, ya), (xb, yb), (xc, yc) = out[-2][-2:], last, cmd[1:]
+            if abs((xb - xa)*(yc - ya) - (xc - xa)*(yb - ya)) <= 1e-12*max(1.0, abs(xc - xa)*abs(yc - ya)):
+                out[-1] = cmd
+                continue
+        out.append(cmd)
+    return out
+
+
+def _layout(length: float, loads_list: object, diagrams: tuple, width: float, height: float):
+    """Drawing items in page coordinates (points, y upward): `('path', commands, stroke, fill)` and `('text', ...)`"""
+    items = []
+    margin, panel = 40.0, height/len(diagrams)
+    for k, which in enumerate(diagrams):
+        path = diagram_path(length, loads_list, which)
+        peaks = diagram_extrema(*diagram_segments(length, loads_list, which))
+        lo, hi = min(0.0, peaks[1][1]), max(0.0, peaks[0][1])
+        span = hi - lo or 1.0
+        bottom = height - (k + 1)*panel + 25.0
+        sx = (width - 2*margin)/float(length)
+        sy = (panel - 60.0)/span
+
+        def page(x, y):
+            return margin + x*sx, bottom + (y - lo)*sy
+
+        outline = [(cmd[0],) + sum((page(*cmd[i:i+2]) for i in range(1, len(cmd), 2)), ()) for cmd in path]
+        color = COLORS[which]
+        items.append(('path', outline + [('Z',)], None, tuple(1 - 0.25*(1 - c) for c in color)))
+        items.append(('path', outline, color, None))
+        items.append(('path', [('M',) + page(0, 0), ('L',) + page(length, 0)], (0.0, 0.0, 0.0), None))
+        title, unit = TITLES[which]
+        items.append(('text', margin, bottom + panel - 45.0, 11, f"{title} ({unit})"))
+        for x, value in peaks:
+            if abs(value) > 1e-9*span:
+                px, py = page(x, value)
+                items.append(('text', px, py + (3.0 if value > 0 else -10.0), 8, f"{value:.4g}"))
+    return items
+
+
+def _number(v: float):
+    return f"{v:.3f}".rstrip('0').rstrip('.')
+
+
+def to_svg(items: list, width: float, height: float):
+    """SVG document (string) of drawing items from `_layout`"""
+    def color(c):
+        return 'none' if c is None else 'rgb(' + ','.join(str(round(255*v)) for v in c) + ')'
+
+    body = []
+    for item in items:
+        if item[0] == 'path':
+            d = ' '.join(cmd[0] + ' '.join(_number(v if i % 2 else height - v) for i, v in enumerate(cmd[1:], 1))
+                         for cmd in item[1])
+            body.append(f'<path d="{d}" stroke="{color(item[2])}" fill="{color(item[3])}"/>')
+        else:
+            _, x, y, size, text = item
+            body.append(f'<text x="{_number(x)}" y="{_number(height - y)}" font-size="{size}">{text}</text>')
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{_number(width)}pt" height="{_number(height)}pt" '
+            f'viewBox="0 0 {_number(width)} {_number(height)}" font-family="serif" stroke-width="1">\n' +
+            '\n'.join(body) + '\n</svg>\n')
+
+
+def to_pdf(items: list, width: float, height: float):
+    """Single page PDF document (bytes) of drawing items from `_layout`"""
+    ops = {'M': 'm', 'L': 'l', 'C': 'c', 'Z': 'h'}
+    content = []
+    for item in items:
+        if item[0] == 'path':
+            _, path, stroke, fill = item
+            content.append(' '.join(map(_number, stroke or fill)) + (' RG' if fill is None else ' rg'))
+            content += [' '.join(map(_number, cmd[1:])) + (' ' if len(cmd) > 1 else '') + ops[cmd[0]] for cmd in path]
+            content.append('S' if fill is None else 'f')
+        else:
+            _, x, y, size, text = item
+            text = text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+            content.append(f"0 g BT /F1 {size} Tf {_number(x)} {_number(y)} Td ({text}) Tj ET")
+    stream = '\n'.join(content).encode('latin-1')
+
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>",
+               b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+               f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {_number(width)} {_number(height)}] "
+               "/Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>".encode(),
+               b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Times-Roman >>"]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b''.join(b"%010d 00000 n \n" % o for o in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def export_diagrams(length: float, loads_list: object, filename: str, which: str = 'both',
+                    width: float = 500.0, height: float = None):
+    """
+    ### Description
+    Writes exact shear force and/or bending moment diagrams of a solved beam to an SVG or PDF file.
+
+    #### Arguments
+    - `length:float` = Length of the beam
+    - `loads_list` = List (or tuple) of beam objects with solved `Reaction` objects
+    - `filename:str` = Output path ending in `.svg` or `.pdf`
+    - `which:str = 'both'` = `'sfd'`, `'bmd'` or `'both'`
+    - `width:float = 500.0`, `height:float = None` = Page size in points (default 200 per diagram)
+    """
+    diagrams = {'sfd': ('sfd',), 'bmd': ('bmd',), 'both': ('sfd', 'bmd')}.get(which.lower())
+    if diagrams is None:
+        raise ValueError(f"Unexpected graph type {which}")
+    extension = str(filename).rsplit('.', 1)[-1].lower()
+    if extension not in ('svg', 'pdf'):
+        raise ValueError(f"Unknown vector extension {extension}\n Supported extensions are: ('svg', 'pdf')")
+    height = 200.0*len(diagrams) if height is None else height
+    items = _layout(length, loads_list, diagrams, width, height)
+    if extension == 'svg':
+        with open(filename, 'w') as f:
+            f.write(to_svg(items, width, height))
+    else:
+        with open(filename, 'wb') as f:
+            f.write(to_pdf(items, width, height))
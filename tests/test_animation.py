@@ -0,0 +1,33 @@
+import matplotlib
+import numpy as np
+import pytest
+from PIL import Image
+
+from beamframe.animation import MovingLoadAnimation
+from beamframe.beam import Beam, Reaction
+from beamframe.superposition import BeamArrays
+
+matplotlib.use('Agg')
+
+
+def test_frames_are_solved_in_one_batch_and_saved(tmp_path):
+    b = Beam(10)
+    supports = (Reaction(0, 'h', 'A'), Reaction(10, 'r', 'B'))
+    anim = MovingLoadAnimation(b, supports, offsets=(0, 2), weights=(10, 20), positions=np.linspace(0, 12, 13),
+                               ndivs=101, which='bmd')
+    assert anim.moment.shape == (13, 101)
+
+    # frame 6: axles at 6 and 4
+    arrays = BeamArrays(10, ('hinge', 'roller'), (0, 10), point_pos=(6, 4), point_fy=(-10, -20))
+    _, ry, mom = arrays.solve_reactions()
+    assert np.allclose(anim.moment[6], arrays.moment_at(anim.x, ry, mom)[0])
+    assert np.allclose(anim.moment[[0, -1]], 0)
+
+    frames = list(anim.frames(dpi=50))
+    assert len(frames) == 13 and frames[0].shape[2] == 4
+    assert not np.array_equal(frames[3], frames[6])
+
+    anim.save(tmp_path/'crossing.gif', fps=10, dpi=50)
+    assert Image.open(tmp_path/'crossing.gif').n_frames == 13
+    with pytest.raises(ValueError):
+        anim.save(tmp_path/'crossing.avi')
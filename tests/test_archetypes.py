@@ -0,0 +1,77 @@
+import contextlib
+import io
+
+import numpy as np
+import pytest
+
+from beamframe.archetypes import archetype, closed_form_solve
+from beamframe.beam import UDL, UVL, Beam, Hinge, PointLoad, PointMoment, Reaction
+from beamframe.nonprismatic import nonprismatic_solve
+
+
+def loads():
+    return [PointLoad(3, 20, True, inclination=60), UDL(1, 5, 4), UVL(6, 2, 4, 8), PointMoment(7, 15, ccw=False)]
+
+
+def test_closed_form_matches_general_path():
+    cases = {'simply_supported': [Reaction(0, 'h', 'A'), Reaction(10, 'r', 'B')],
+             'overhanging': [Reaction(2, 'r', 'A'), Reaction(8, 'h', 'B')],
+             'cantilever': [Reaction(10, 'f', 'A')]}
+    for name, supports in cases.items():
+        fast, general = Beam(10), Beam(10)
+        fast_els, general_els = supports + loads(), [Reaction(r.pos, r.type, r.pos_sym) for r in supports] + loads()
+        assert archetype(10, fast_els) == name
+        fast.fast_solve(fast_els)
+        with contextlib.redirect_stdout(io.StringIO()):
+            general.fast_solve(general_els, closed_form=False)
+        # symbolic functions are built from the closed form reactions on first access
+        assert fast._deferred_equations is not None
+        for point in (0.5, 3.5, 7.5):
+            assert np.isclose(float(fast.shear_fn.subs('x', point)), float(general.shear_fn.subs('x', point)))
+            assert np.isclose(float(fast.mom_fn.subs('x', point)), float(general.mom_fn.subs('x', point)))
+        for a, b in zip(fast_els, general_els):
+            if isinstance(a, Reaction):
+                assert np.allclose([a.rx_val, a.ry_val, a.mom_val], [b.rx_val, b.ry_val, b.mom_val])
+        assert np.allclose(fast.shear_values, general.shear_values)
+        assert np.allclose(fast.moment_values, general.moment_values)
+
+    # internal hinges have no closed form here: general path
+    assert archetype(10, [Reaction(0, 'f', 'A'), Hinge(5), Reaction(10, 'r', 'B')] + loads()) is None
+
+
+def test_propped_cantilever():
+    b = Beam(8)
+    elements = [Reaction(0, 'f', 'A'), Reaction(8, 'r', 'B'), UDL(0, 10, 8)]
+    assert closed_form_solve(b, elements) == 'propped'
+    assert np.isclose(elements[1].ry_val, 30) and np.isclose(elements[0].mom_val, 80)
+
+    # dispatched by fast_solve although statically indeterminate, unless EI varies along the beam
+    b = Beam(8)
+    elements = [Reaction(0, 'f', 'A'), Reaction(8, 'r', 'B'), UDL(0, 10, 8)]
+    b.fast_solve(elements)
+    assert np.isclose(elements[1].ry_val, 30) and np.isclose(b.moment_values[b.beam_0], -80)
+    with pytest.raises(ValueError, match='indeterminate'):
+        Beam(8, E=200e6, I=np.array([2e-4, 1e-4])).fast_solve(elements)
+    with pytest.raises(ValueError, match='indeterminate'):
+        Beam(8).fast_solve(elements, closed_form=False)
+
+    # fixed at the right end, prop inside the span, compared with the numerical solution for uniform EI
+    b = Beam(10, E=200e6, I=1e-4)
+    elements = [Reaction(3, 'r', 'A'), Reaction(10, 'f', 'B')] + loads()
+    closed_form_solve(b, elements)
+    closed = [(r.ry_val, r.mom_val) for r in elements[:2]]
+    moment = b.moment_values.copy()
+    result = nonprismatic_solve(b, elements)
+    assert np.allclose(closed, [(r.ry_val, r.mom_val) for r in elements[:2]], rtol=1e-5, atol=1e-6)
+    assert np.allclose(moment, result.moment, atol=1e-4)
+
+
+def test_symbolic_functions_keep_values_of_their_solve():
+    # the same Reaction objects solved again for another beam do not change the first beam's functions
+    ra, rb = Reaction(0, 'h', 'A'), Reaction(10, 'r', 'B')
+    b1, b2 = Beam(10), Beam(10)
+    b1.fast_solve([ra, rb, PointLoad(5, 20, True)])
+    b2.fast_solve([ra, rb, PointLoad(2, 20, True)])
+    assert np.isclose(ra.ry_val, 16)
+    assert np.isclose(float(b1.shear_fn.subs('x', 1)), 10) and np.isclose(b1.solved_rxns[ra.ry_var], 10)
+    assert np.isclose(float(b2.shear_fn.subs('x', 1)), 16)
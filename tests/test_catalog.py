@@ -0,0 +1,36 @@
+import numpy as np
+
+from beamframe.beam import UDL, Beam, Reaction
+from beamframe.catalog import demands, select_section, steel_ipe, timber_rectangles
+from beamframe.patterns import pattern_envelope
+
+
+def test_utilization_matches_per_section_checks():
+    b = Beam(6)
+    d = demands(b, (Reaction(0, 'h', 'A'), Reaction(6, 'r', 'B'), UDL(0, 20, 6)))
+    assert np.isclose(d['moment'], 20*6**2/8)
+    assert np.isclose(d['shear'], 60)
+    assert np.isclose(d['EIy'], 5*20*6**4/384)
+
+    catalog = steel_ipe()
+    result = select_section(catalog, **d)
+    for i in range(len(catalog)):
+        stress = d['moment']/catalog.Z[i]
+        assert np.isclose(result.utilization['bending'][i], stress/catalog.bending_strength)
+        deflection = d['EIy']/(catalog.E*catalog.I[i])
+        assert np.isclose(result.utilization['deflection'][i], deflection/(6/360))
+    # lightest adequate section and every lighter one fails
+    assert result.name == 'IPE330'
+    assert not result.passes[catalog.mass < catalog.mass[result.index]].any()
+    assert list(result.ranking()) == list(range(result.index, len(catalog)))
+
+
+def test_envelope_and_no_passing_section():
+    b = Beam(12)
+    env = pattern_envelope(b, (Reaction(0, 'h', 'A'), Reaction(8, 'r', 'B')), live=1)
+    d = demands(envelope=env)
+    assert np.isclose(d['moment'], 8, rtol=1e-3)
+    catalog = timber_rectangles()
+    result = select_section(catalog, moment=[d['moment'], 1e4], shear=d['shear'])
+    assert result.index is None and not result.passes.any()
+    assert np.allclose(result.utilization['bending'], 1e4/(catalog.Z*catalog.bending_strength))
@@ -0,0 +1,54 @@
+import contextlib
+import io
+
+import numpy as np
+import pytest
+
+from beamframe.beam import UDL, UVL, Beam, Hinge, PointLoad, PointMoment, Reaction
+from beamframe.compiled import compile_elements, compile_topology, compiled_solve
+from beamframe.superposition import BeamArrays
+
+
+def elements(a, w, p):
+    return (Reaction(0, 'f', 'A'), Hinge(6, 'r'), Reaction(10, 'r', 'B'), UDL(0, w, 5),
+            UVL(6, 1, 4, 3), PointLoad(a, p, True, inclination=60), PointMoment(8, 5))
+
+
+def test_batch_matches_superposition_and_cache_is_shared():
+    compile_topology.cache_clear()
+    beams = [elements(a, w, p) for (a, w, p) in [(1, 1, 4), (3, 2, 7), (7.5, 0.5, 1)]]
+    compiled = compile_elements(beams[0])
+    assert compile_elements(beams[1]) is compiled
+    assert compile_topology.cache_info().hits == 1
+
+    x = np.linspace(0, 14, 701)
+    P = compiled.bind(14, beams)
+    R = compiled.solve_reactions(P)
+    V, M = compiled.shear(x, P, R), compiled.moment(x, P, R)
+    assert V.shape == M.shape == (3, 701)
+    for i, els in enumerate(beams):
+        arrays = BeamArrays.from_elements(14, els)
+        rx, ry, mom = arrays.solve_reactions()
+        assert np.allclose(V[i], arrays.shear_at(x, ry)[0])
+        assert np.allclose(M[i], arrays.moment_at(x, ry, mom)[0])
+        assert np.isclose(compiled.horizontal_reaction(P)[i], rx[0, 0])
+
+    with pytest.raises(ValueError):
+        compiled.bind(14, [(Reaction(0, 'h', 'A'), Reaction(14, 'r', 'B'))])
+
+
+def test_compiled_solve_matches_fast_solve():
+    def make():
+        return (Reaction(0, 'h', 'A'), Reaction(5, 'r', 'B'), UDL(0, 2, 3), PointLoad(4, 10, True))
+    fast, fast_els = Beam(5), make()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fast.fast_solve(fast_els, closed_form=False)
+    beam, els = Beam(5), make()
+    compiled_solve(beam, els)
+    assert beam.solved_rxns.keys() == fast.solved_rxns.keys()
+    assert all(np.isclose(beam.solved_rxns[k], float(v)) for k, v in fast.solved_rxns.items())
+    assert np.isclose(float(beam.mom_fn.subs('x', 2)), float(fast.mom_fn.subs('x', 2)))
+    assert np.isclose(els[0].ry_val, fast_els[0].ry_val)
+    assert np.isclose(els[1].ry_val, fast_els[1].ry_val)
+    assert np.allclose(beam.shear_values, fast.shear_values)
+    assert np.allclose(beam.moment_values, fast.moment_values)
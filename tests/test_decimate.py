@@ -0,0 +1,44 @@
+import matplotlib
+import numpy as np
+
+from beamframe.decimate import axes_width, minmax_decimate, minmax_indices
+
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt  # noqa: E402
+
+
+def diagram(n=1_000_001):
+    x = np.linspace(0, 10, n)
+    return x, x*np.sin(3*x) + 5*(x >= 3) - 4*(x >= 7.00001) + 0.3*np.sin(2000*x)
+
+
+def test_peaks_and_jumps_are_kept():
+    x, y = diagram()
+    idx = minmax_indices(x, y, 500, keep=[10])
+    assert len(idx) <= 6*500 + 1 and 10 in idx
+    assert np.all(np.diff(idx) > 0)
+    assert y.argmax() in idx and y.argmin() in idx
+    for a in (3, 7.00001):
+        i = np.searchsorted(x, a)  # first sample after jump
+        assert i - 1 in idx and i in idx
+    small = np.arange(100.0)
+    assert np.array_equal(minmax_indices(small, small, 500), np.arange(100))
+
+
+def test_rendering_is_unchanged():
+    x, y = diagram()
+
+    def render(xs, ys):
+        fig, ax = plt.subplots(dpi=100)
+        ax.plot(xs, ys, color='k')
+        ax.set_xlim(0, 10)
+        ax.set_ylim(-15, 15)
+        fig.canvas.draw()
+        image = np.asarray(fig.canvas.buffer_rgba())[..., 0].copy()
+        width = axes_width(ax)
+        plt.close(fig)
+        return image, width
+
+    full, width = render(x, y)
+    reduced, _ = render(*minmax_decimate(x, y, width))
+    assert (full != reduced).mean() < 0.02
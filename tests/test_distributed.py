@@ -0,0 +1,69 @@
+import os
+import time
+
+import numpy as np
+
+from beamframe.distributed import WorkQueue, run_local, run_worker, solve_shard
+from beamframe.server import solve_batch
+
+
+def models(n, seed=0):
+    rng = np.random.default_rng(seed)
+    out = []
+    for _ in range(n):
+        L = float(rng.uniform(5, 15))
+        out.append({'length': L, 'elements': [
+            {'element': 'Reaction', 'pos': 0, 'type': 'h', 'pos_sym': 'A'},
+            {'element': 'Reaction', 'pos': L, 'type': 'r', 'pos_sym': 'B'},
+            {'element': 'PointLoad', 'pos': float(rng.uniform(0, L)), 'load': 10, 'inverted': True},
+            {'element': 'UDL', 'start': 0, 'loadpm': float(rng.uniform(1, 5)), 'span': L}]})
+    return out
+
+
+def test_local_workers_merge_in_order(tmp_path):
+    batch = models(300)
+    batch[7] = {'length': -1}
+    results = run_local(batch, tmp_path / 'queue', workers=3, shard_size=40)
+    assert results == solve_batch(batch)
+    assert results[7] == {'error': 'Beam length must be positive'}
+    assert WorkQueue(tmp_path / 'queue').status() == {'pending': 0, 'claimed': 0, 'done': 8, 'failed': 0}
+
+    # fast_solve path gives the same reactions
+    fast, arrays = solve_shard(batch[:3], 'fast_solve'), solve_shard(batch[:3])
+    for a, b in zip(fast, arrays):
+        assert np.allclose(list(a['reactions'].values()), list(b['reactions'].values()))
+
+
+def test_retries_and_stale_claims(tmp_path):
+    queue = WorkQueue(tmp_path, lease=0.5, max_attempts=2)
+    batch = models(30)
+    assert queue.submit(batch, shard_size=10) == 3
+
+    # shard 0 fails on every attempt, shard 1 is claimed by a worker that dies
+    for _ in range(2):
+        claim, shard = queue.claim('flaky')
+        assert shard['index'] == 0
+        queue.fail(claim, shard, 'MemoryError')
+    claim, shard = queue.claim('dead')
+    assert shard['index'] == 1 and queue.requeue_stale() == 0
+    old = time.time() - 1
+    os.utime(tmp_path / 'claimed' / claim, (old, old))
+    assert queue.requeue_stale() == 1
+
+    assert run_worker(tmp_path, 'good', poll=0.01) == 2
+    assert queue.status() == {'pending': 0, 'claimed': 0, 'done': 2, 'failed': 1}
+    results = queue.merge()
+    assert all('Shard 0 failed after 2 attempts: MemoryError' in r['error'] for r in results[:10])
+    assert results[10:] == solve_batch(batch[10:])
+
+
+def test_poisoned_model_only_fails_itself(tmp_path):
+    batch = models(20)
+    batch[3]['elements'].append({'element': 'UVL', 'start': 1, 'startload': 1, 'span': 0, 'endload': 2})
+    for method in ('arrays', 'fast_solve'):
+        results = solve_shard(batch, method)
+        assert 'error' in results[3] and all('reactions' in r for k, r in enumerate(results) if k != 3)
+
+    results = run_local(batch, tmp_path / 'queue', workers=1, shard_size=10, method='fast_solve', max_attempts=1)
+    assert 'error' in results[3] and 'reactions' in results[4]
+    assert WorkQueue(tmp_path / 'queue').status()['failed'] == 0
@@ -0,0 +1,39 @@
+import numpy as np
+
+from beamframe.beam import Beam, Reaction
+from beamframe.dynamics import MovingLoadHistory
+
+L, E, I, m = 20, 200e6, 8e-4, 500
+SUPPORTS = (Reaction(0, 'h', 'A'), Reaction(L, 'r', 'B'))
+
+
+def test_slow_crossing_is_quasi_static():
+    b = Beam(L, E=E, I=I, mass=m)
+    history = MovingLoadHistory(b, SUPPORTS, offsets=[0], weights=[100], speed=0.05, sections=[10], k=6, dt=0.01)
+    t, deflection, moment, shear = (np.concatenate(v) for v in zip(*history.iter_chunks(50_000)))
+    a = np.minimum(0.05*t, L)
+    near = np.minimum(a, L - a)
+    static = -100*near*(3*L**2 - 4*near**2)/(48*E*I)
+    assert np.allclose(deflection[:, 0], static, atol=1e-3*abs(static).max())
+    assert np.allclose(moment[:, 0], 100*near/2, atol=1.0)
+    assert np.allclose(shear[(a > 0.5) & (a < 9.5), 0], -100*a[(a > 0.5) & (a < 9.5)]/L, atol=0.5)
+
+
+def test_streaming_chunks_match_and_amplify(tmp_path):
+    b = Beam(L, E=E, I=I, mass=m)
+    history = MovingLoadHistory(b, SUPPORTS, offsets=[0, 4], weights=[100, 100], speed=30, sections=[5, 10], after=2)
+    whole = [np.concatenate(v) for v in zip(*history.iter_chunks(10**6))]
+    out = history.to_memmap(tmp_path/'history.npy', chunk=777)
+    assert out.shape == (history.n_steps, 3, 2)
+    for col in range(3):
+        assert np.allclose(out[:, col], whole[col + 1])
+
+    dynamic, static = history.envelope(chunk=1000), history.static_envelope()
+    assert np.allclose(dynamic['max_moment'], whole[2].max(axis=0))
+    assert np.isclose(static['max_moment'][1], 800)
+    assert dynamic['max_moment'][1] > static['max_moment'][1]
+    # free vibration after the train has left decays at the first natural frequency
+    tail = whole[1][whole[0] > (L + 4)/30, 1]
+    crossings = np.flatnonzero(np.diff(np.sign(tail)) != 0)
+    period = 2*np.mean(np.diff(crossings))*history.dt
+    assert np.isclose(period, 1/history.modes.frequencies[0], rtol=0.02)
@@ -0,0 +1,51 @@
+import numpy as np
+
+from beamframe.beam import UDL, UVL, Beam, Hinge, PointLoad, PointMoment, Reaction
+from beamframe.foundation import foundation_solve
+
+E, I, k = 30e6, 0.02, 20e3
+LAM = (k/(4*E*I))**0.25
+
+
+def test_closed_form_matches_hetenyi_infinite_beam():
+    # long free beam: a central load sees an infinite beam
+    b = Beam(200, ndivs=2011, E=E, I=I, foundation=k)
+    result = foundation_solve(b, [PointLoad(100, 100, inverted=True)])
+    assert result.method == 'closed'
+    mid = np.argmin(np.abs(b.xbeam - 100))
+    assert np.isclose(result.deflection[mid], -100*LAM/(2*k), rtol=1e-9)
+    assert np.isclose(result.moment[mid], 100/(4*LAM), rtol=1e-9)
+    assert np.isclose(result.shear[mid], -50, rtol=1e-9)
+    assert np.isclose(np.trapezoid(result.pressure, b.xbeam), 100, rtol=1e-4)
+    assert b.deflection_values is result.deflection and b.moment_values is result.moment
+
+    # uniform load on a free beam settles uniformly without bending
+    short = Beam(10, E=E, I=I)
+    result = foundation_solve(short, [UDL(0, 10, 10)], modulus=k)
+    x = short.xbeam >= 0
+    assert np.allclose(result.deflection[x], -10/k, rtol=1e-9)
+    assert np.allclose(result.moment, 0, atol=1e-9) and np.allclose(result.shear, 0, atol=1e-9)
+
+
+def test_finite_elements_agree_with_closed_form():
+    for elements in ([PointLoad(3, 100, True), UDL(2, 10, 5), UVL(6, 5, 4, 15), PointMoment(8, 40)],
+                     [Reaction(0, 'f', 'A'), PointLoad(3, 100, True), PointLoad(5, 20, inclination=60),
+                      UDL(0, 10, 12), Reaction(9, 'r', 'B')]):
+        b = Beam(12, E=E, I=I)
+        closed = foundation_solve(b, elements, modulus=k)
+        reactions = [(r.ry_val, r.mom_val) for r in elements if isinstance(r, Reaction)]
+        # a varying modulus (here given as array of constant values) uses finite elements
+        fe = foundation_solve(b, elements, modulus=np.full(5, k))
+        assert (closed.method, fe.method) == ('closed', 'fe')
+        for name in ('deflection', 'slope', 'moment', 'shear'):
+            a, c = getattr(closed, name), getattr(fe, name)
+            assert np.abs(a - c).max() < 1e-5*np.abs(a).max()
+        assert np.allclose(reactions, [(r.ry_val, r.mom_val) for r in elements if isinstance(r, Reaction)])
+    assert np.isclose(elements[0].rx_val, -20*np.cos(np.pi/3))
+
+    # hinge and soft-to-stiff foundation: free end carries no shear or moment
+    b = Beam(12, ndivs=1301, E=E, I=I, foundation=lambda x: k*(1 + x/6))
+    result = foundation_solve(b, [Reaction(0, 'h', 'A'), Hinge(4), PointLoad(4, 50, True), UDL(6, 10, 6)])
+    assert result.method == 'fe'
+    assert abs(result.shear[-1]) < 1e-3 and abs(result.moment[-1]) < 1e-2
+    assert abs(result.moment[np.argmin(np.abs(b.xbeam - 4))]) < 1e-2
@@ -0,0 +1,70 @@
+import threading
+import time
+
+import matplotlib
+import numpy as np
+
+from beamframe.beam import Beam, Hinge, PointLoad, PointMoment, Reaction, UDL, UVL
+from beamframe.interactive import InteractiveBeam
+from beamframe.superposition import BeamArrays
+
+matplotlib.use('Agg')
+
+
+def elements(pos):
+    return [Reaction(0, 'f', 'A'), Reaction(10, 'r', 'B'), Hinge(4, 'l'), UDL(0, 5, 3),
+            UVL(6, 2, 4, 8), PointMoment(7, 15), PointLoad(pos, 30, True, inclination=60)]
+
+
+def test_incremental_update_matches_fast_solve():
+    b = Beam(10)
+    session = InteractiveBeam(b, elements(2))
+    session.update(6, PointLoad(8, 30, True, inclination=60))
+    session.update(3, UDL(5, 4, 1))
+
+    reference = Beam(10)
+    model = elements(8)
+    model[3] = UDL(5, 4, 1)
+    reference.fast_solve(model)
+    assert np.allclose(b.shear_values, reference.shear_values, atol=1e-6)
+    assert np.allclose(b.moment_values, reference.moment_values, atol=1e-6)
+    assert np.allclose(session.ry, [r.ry_val for r in model if isinstance(r, Reaction)])
+    assert np.allclose(session.rx[0], model[-1].load_x*-1)
+
+    # moving a support rebuilds the state
+    session.update(1, Reaction(9, 'r', 'B'))
+    model[1] = Reaction(9, 'r', 'B')
+    arrays = BeamArrays.from_elements(10, model)
+    _, ry, mom = arrays.solve_reactions()
+    assert np.allclose(session.ry, ry[0]) and np.allclose(session.mom, mom[0])
+    assert np.allclose(session.moment, arrays.moment_at(session.x, ry, mom)[0])
+
+
+def test_updates_are_blitted_and_requests_are_debounced():
+    # without a figure pending requests are applied by a background thread once events pause
+    session = InteractiveBeam(Beam(10), elements(2), debounce=0.05)
+    for pos in np.linspace(0, 5, 20):
+        session.request(6, PointLoad(pos, 30, True, inclination=60))
+    assert session.elements[6].pos == 2
+    time.sleep(0.3)
+    assert session.elements[6].pos == 5 and session.flush() == 0
+
+    fig = session.figure(dpi=50)
+    start = time.perf_counter()
+    fig.canvas.draw()
+    full = time.perf_counter() - start
+    (line, _), = session._lines[:1]
+
+    times = []
+    for pos in np.linspace(0, 10, 50):
+        start = time.perf_counter()
+        session.update(6, PointLoad(pos, 30, True, inclination=60))
+        times.append(time.perf_counter() - start)
+    # lines are blitted; only the few events that widen the axis limits redraw the whole figure
+    assert np.median(times) < full
+    assert np.allclose(line.get_ydata(), session.shear)
+
+    # with a figure the canvas times the pause (Agg has no event loop, so flush applies the requests)
+    session.request(6, PointLoad(3, 30, True))
+    assert not isinstance(session._timer, threading.Timer)
+    assert session.flush() == 1 and session.elements[6].pos == 3 and session._timer is None
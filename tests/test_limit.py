@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from beamframe.beam import UDL, Hinge, PointLoad, Reaction
+from beamframe.limit import limit_analysis
+from beamframe.section import ISection, Rectangle
+
+Mp, L, w = 100.0, 8.0, 10.0
+
+
+def test_collapse_of_classical_beams():
+    result = limit_analysis(L, [Reaction(0, 'h', 'A'), Reaction(L, 'r', 'B'), PointLoad(3, 10, True)], Mp)
+    assert np.isclose(result.load_factor, Mp*L/(3*5*10)) and np.allclose(result.hinges, [3])
+
+    result = limit_analysis(L, [Reaction(0, 'f', 'A'), Reaction(L, 'f', 'B'), UDL(0, w, L)], Mp)
+    assert np.isclose(result.load_factor, 16*Mp/(w*L**2), rtol=1e-8)
+    assert np.allclose(result.hinges, [0, 4, 8]) and np.allclose(np.sign(result.rotations), [-1, 1, -1])
+    assert np.isclose(np.sum(Mp*np.abs(result.rotations)), result.load_factor)
+
+    # propped cantilever under UDL: sagging hinge where shear vanishes at L(2 - sqrt(2))
+    result = limit_analysis(L, [Reaction(0, 'f', 'A'), Reaction(L, 'r', 'B'), UDL(0, w, L)], Mp)
+    assert np.isclose(result.load_factor, (6 + 4*np.sqrt(2))*Mp/(w*L**2), rtol=1e-9)
+    assert np.allclose(result.hinges, [0, L*(2 - np.sqrt(2))], rtol=1e-6)
+    assert np.all(np.abs(result.moment) <= result.capacity*(1 + 1e-9))
+
+    # internal hinge needs no plastic hinge; load on a support never causes collapse
+    result = limit_analysis(L, [Reaction(0, 'f', 'A'), Hinge(4), Reaction(L, 'f', 'B'), PointLoad(4, 10, True)], Mp)
+    assert np.isclose(result.load_factor, 2*Mp/(10*4)) and np.allclose(result.hinges, [0, 8])
+    assert limit_analysis(L, [Reaction(0, 'h', 'A'), Reaction(L, 'r', 'B'), PointLoad(0, 10, True)], Mp).load_factor == np.inf
+    with pytest.raises(ValueError, match='unstable'):
+        limit_analysis(L, [Reaction(0, 'r', 'A'), Hinge(4), Reaction(L, 'r', 'B'), PointLoad(2, 10, True)], Mp)
+
+
+def test_segment_capacities_and_plastic_modulus():
+    assert np.isclose(Rectangle(0.2, 0.5).Z_plastic, 0.2*0.5**2/4)
+    section = ISection(0.4, 0.2, 0.02, 0.01)
+    assert np.isclose(section.Z_plastic, 0.2*0.02*0.38 + 0.01*0.36**2/4)
+
+    # two span beam with a weaker section over the second span. First span mechanism with hinges at A,
+    # in the span at a and over B (weaker section governs): 30*lambda = 125/a + 100/(8 - a), minimal at
+    # a = 8/(1 + sqrt(0.8)); second span mechanism (hinges at B and under the load): lambda = 450/240
+    elements = (Reaction(0, 'f', 'A'), Reaction(8, 'r', 'B'), Reaction(14, 'r', 'C'), UDL(0, 30, 8),
+                PointLoad(11, 80, True))
+    result = limit_analysis(14, elements, [(0, 8, 250), (8, 14, 150)])
+    a = 8/(1 + np.sqrt(0.8))
+    assert np.isclose(result.load_factor, (125/a + 100/(8 - a))/30, rtol=1e-9) and result.load_factor < 450/240
+    assert np.allclose(result.hinges, [0, a, 8], rtol=1e-6)
+    strong = limit_analysis(14, elements, 275e3*section.Z_plastic)
+    assert strong.load_factor > result.load_factor
@@ -0,0 +1,61 @@
+import json
+
+import numpy as np
+
+from beamframe.beam import UDL, UVL, Beam, PointLoad, Reaction
+from beamframe.loadcases import LoadCaseStream
+from beamframe.sweep import ParameterSweep
+
+
+def test_csv_run_resumes_after_interruption(tmp_path):
+    rng = np.random.default_rng(3)
+    data = np.column_stack([rng.uniform(0, 10, 2000), rng.uniform(10, 100, 2000), rng.uniform(1, 20, 2000)])
+    path = str(tmp_path/'cases.csv')
+    with open(path, 'w') as f:
+        f.write('x, P, w, comment\n')
+        np.savetxt(f, np.column_stack([data, np.zeros(2000)]), delimiter=',', fmt='%.6f')
+
+    b = Beam(10)
+    ra, rb, p, w = Reaction(0, 'h', 'A'), Reaction(10, 'r', 'B'), PointLoad(5, 0, True), UDL(0, 0, 10)
+    cases = LoadCaseStream(b, (ra, rb, p, w))
+    cases.column('P', p, 'load')
+    cases.column('x', p, 'pos')
+    cases.column('w', w, 'loadpm')
+    output = str(tmp_path/'results.npy')
+    cases.run(path, output, chunk=300, max_chunks=2)
+    with open(output + '.json') as f:
+        state = json.load(f)
+    assert (state['done'], state['rows']) == (600, 2000)
+
+    out = cases.run(path, output, chunk=300)
+    assert out.shape == (2000, len(cases.output_labels()))
+    values = np.round(data[:, [1, 0, 2]], 6)
+    assert np.allclose(out, cases.sweep.evaluate(values, 201))
+    x, P, q = values[:, 1], values[:, 0], values[:, 2]
+    assert np.allclose(out[:, cases.output_labels().index('R_A_y')], P*(10 - x)/10 + 5*q)
+    assert np.array_equal(np.load(output), cases.run(path, output, resume=False))
+
+
+def test_npy_input_with_varying_load(tmp_path):
+    rng = np.random.default_rng(4)
+    data = np.column_stack([rng.uniform(0, 30, 500), rng.uniform(0, 30, 500), rng.uniform(2, 8, 500)])
+    path = str(tmp_path/'cases.npy')
+    np.save(path, data)
+
+    b = Beam(8)
+    u = UVL(0, 10, 8, 20)
+    elements = (Reaction(0, 'f', 'A'), u)
+    cases = LoadCaseStream(b, elements)
+    cases.column('w0', u, 'startload', index=0)
+    cases.column('w1', u, 'endload', index=1)
+    cases.column('span', u, 'span', index=2)
+    out = cases.run(path, str(tmp_path/'results.npy'), chunk=128)
+
+    sweep = ParameterSweep(b, elements)
+    for (name, attr, col) in (('w0', 'startload', 0), ('w1', 'endload', 1), ('span', 'span', 2)):
+        sweep.vary(u, attr, data[:, col], name)
+    expected = sweep.run(grid=False)
+    for label in cases.output_labels():
+        assert np.allclose(out[:, cases.output_labels().index(label)], expected[label])
+    # cantilever: fixing moment of the trapezoidal load
+    assert np.allclose(out[:, cases.output_labels().index('M_A')], (data[:, 0] + 2*data[:, 1])*data[:, 2]**2/6)
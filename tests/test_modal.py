@@ -0,0 +1,32 @@
+import numpy as np
+
+from beamframe.beam import Beam, Hinge, Reaction
+from beamframe.modal import modal_analysis
+
+L, E, I, m = 20, 200e6, 8e-4, 500
+SCALE = np.sqrt(E*1e3*I/m)
+
+
+def test_simply_supported_and_cantilever_frequencies():
+    b = Beam(L, E=E, I=I, mass=m)
+    modes = modal_analysis(b, (Reaction(0, 'h', 'A'), Reaction(L, 'r', 'B')), k=4)
+    n = np.arange(1, 5)
+    assert np.allclose(modes.frequencies, n**2*np.pi/(2*L**2)*SCALE, rtol=1e-6)
+    # mass normalised, first mode is a half sine with hogging curvature at midspan
+    assert np.allclose(modes.vectors @ (modes.fe.M @ modes.vectors.T), np.eye(4), atol=1e-8)
+    x = np.linspace(0, L, 11)
+    assert np.allclose(modes.shape_at(x)[0], np.sqrt(2/(m*L))*np.sin(np.pi*x/L), atol=1e-6)
+    assert np.isclose(modes.moment_at([L/2])[0, 0], -E*I*np.sqrt(2/(m*L))*(np.pi/L)**2, rtol=1e-4)
+
+    cantilever = modal_analysis(b, (Reaction(0, 'f', 'A'),), k=2, nelems=400)
+    assert np.allclose(cantilever.frequencies, np.array([1.8751041, 4.6940911])**2/(2*np.pi*L**2)*SCALE, rtol=1e-5)
+
+
+def test_hinge_over_support_gives_two_simple_spans():
+    b = Beam(L, E=E, I=I, mass=m)
+    single = np.pi/(2*(L/2)**2)*SCALE
+    released = modal_analysis(b, (Reaction(0, 'h', 'A'), Reaction(10, 'r', 'B'), Hinge(10), Reaction(L, 'r', 'C')), k=2)
+    assert np.allclose(released.frequencies, single, rtol=1e-6)
+    continuous = modal_analysis(b, (Reaction(0, 'h', 'A'), Reaction(10, 'r', 'B'), Reaction(L, 'r', 'C')), k=2)
+    assert np.isclose(continuous.frequencies[0], single, rtol=1e-6)
+    assert continuous.frequencies[1] > 1.5*single   # propped cantilever mode
@@ -0,0 +1,56 @@
+import contextlib
+import dataclasses
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from beamframe.beam import UDL, Beam, Hinge, PointLoad, Reaction
+from beamframe.model import BeamModel, solve
+
+
+def elements():
+    return [Reaction(0, 'f', 'A'), Hinge(4, 'r'), Reaction(8, 'r', 'B'), PointLoad(6, 10, True), UDL(0, 2, 4)]
+
+
+def test_solve_matches_fast_solve_and_leaves_inputs_alone():
+    els = elements()
+    model = BeamModel.from_elements(8, els, E=200e6, I=1e-4, ndivs=801)
+    before = [dict(vars(e)) for e in els]
+    solution = solve(model)
+    assert [vars(e) for e in els] == before
+
+    b = Beam(8, ndivs=901)  # non negative stations are 0, 0.01, ..., 8
+    with contextlib.redirect_stdout(io.StringIO()):
+        b.fast_solve(elements())
+    assert solution.reactions['R_A_y'] == pytest.approx(b.reactions_list[0].ry_val)
+    assert solution.reactions['M_A'] == pytest.approx(b.reactions_list[0].mom_val)
+    assert np.allclose(solution.moment, b.moment_values[b.beam_0:])
+    assert abs(solution.deflection[[0, 800]]).max() < 1e-12
+    with pytest.raises(ValueError):
+        solution.moment[0] = 1.0
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        model.length = 9
+
+
+def test_one_model_solved_from_many_threads():
+    model = BeamModel.from_elements(8, elements(), ndivs=201)
+    expected = solve(model)
+    with ThreadPoolExecutor(8) as pool:
+        solutions = list(pool.map(solve, [model]*200))
+    assert all(s.reactions == expected.reactions and np.array_equal(s.moment, expected.moment) for s in solutions)
+
+    moved = dataclasses.replace(model, point_loads=((2, -10, 0),))
+    assert solve(moved).reactions != expected.reactions
+    assert hash(moved) != hash(model)
+
+
+def test_fields_are_coerced_and_indeterminate_models_rejected():
+    model = BeamModel.from_elements(8, elements(), E=np.float64(200e6), I=np.array(1e-4), ndivs=np.int64(11))
+    assert type(model.I) is float and type(model.ndivs) is int and hash(model) == hash(dataclasses.replace(model))
+    with pytest.raises(ValueError, match='constant I'):
+        BeamModel.from_elements(8, elements(), E=200e6, I=np.array([1e-4, 2e-4]))
+    pins = BeamModel(10, supports=[('A', 'h', 0), ('B', 'h', 10)], point_loads=[(5, -10, 0)])
+    with pytest.raises(ValueError, match='indeterminate to degree 1'):
+        solve(pins)
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from beamframe.beam import UDL, UVL, Beam, Hinge, PointLoad, PointMoment, Reaction
+from beamframe.foundation import foundation_solve
+from beamframe.modal import modal_analysis
+from beamframe.model import BeamModel
+from beamframe.nonprismatic import nonprismatic_solve
+from beamframe.optimize import LayoutOptimizer
+from beamframe.pdelta import buckling_load, pdelta_solve
+from beamframe.reliability import Distribution, MonteCarlo
+from beamframe.superposition import BeamArrays
+
+E, I = 30e6, 0.01
+
+
+def test_prismatic_beam_matches_macaulay():
+    elements = (Reaction(0, 'h', 'A'), Reaction(6, 'r', 'B'), Hinge(8), Reaction(12, 'r', 'C'),
+                PointLoad(3, 50, True), PointMoment(7, 30), UVL(8, 5, 4, 12), UDL(1, 10, 4))
+    b = Beam(12, E=E, I=I)
+    result = nonprismatic_solve(b, elements)
+    arrays = BeamArrays.from_elements(12, elements)
+    _, ry, mom = arrays.solve_reactions()
+    x = b.xbeam[b.beam_0:]
+    y, slope = arrays.deflection_at(x, ry, mom, E*I)
+    assert np.allclose([r.ry_val for r in elements if isinstance(r, Reaction)], ry[0])
+    assert np.allclose(result.moment[b.beam_0:], arrays.moment_at(x, ry, mom)[0])
+    assert np.abs(result.deflection[b.beam_0:] - y[0]).max() < 1e-6*np.abs(y).max()
+    assert np.abs(result.slope[b.beam_0:] - slope[0]).max() < 1e-6*np.abs(slope).max()
+    assert b.deflection_values is result.deflection
+
+
+def test_tapered_and_indeterminate_beams():
+    # tapered cantilever: tip deflection by the unit load method, integral of P*(L - x)**2/EI
+    EI = lambda x: E*I*(2 - x/10)
+    b = Beam(10, I=lambda x: I*(2 - x/10), E=E)
+    result = nonprismatic_solve(b, (Reaction(0, 'f', 'A'), PointLoad(10, 10, True)))
+    exact = -100*(100*np.log(2) - 50)/(E*I)
+    assert np.isclose(result.deflection[-1], exact, rtol=1e-6)
+    assert np.allclose(result.EI[b.beam_0:], EI(b.xbeam[b.beam_0:]))
+
+    # fixed ends: prismatic values, and stiffer ends (as array) attract more moment
+    elements = (Reaction(0, 'f', 'A'), Reaction(10, 'f', 'B'), UDL(0, 10, 10))
+    result = nonprismatic_solve(Beam(10, E=E, I=I), elements)
+    assert np.isclose(elements[0].mom_val, 10*100/12, rtol=1e-6) and np.isclose(elements[0].ry_val, 50)
+    assert np.isclose(result.deflection.min(), -10*1e4/(384*E*I), rtol=1e-6)
+    nonprismatic_solve(Beam(10), elements, EI=E*I*np.array([3, 1, 1, 1, 3]))
+    assert elements[0].mom_val > 10*100/12 and np.isclose(elements[0].mom_val, -elements[1].mom_val)
+
+
+def test_array_stiffness_through_beam():
+    # E and I given to Beam as arrays at equally spaced points, the same as the EI keyword
+    I_values = np.array([0.02, 0.01, 0.02])
+    elements = (Reaction(0, 'h', 'A'), Reaction(10, 'r', 'B'), UDL(0, 10, 10))
+    b = Beam(10, E=E, I=I_values)
+    assert b.I is I_values
+    result = nonprismatic_solve(b, elements)
+    reference = nonprismatic_solve(Beam(10), elements, EI=E*I_values)
+    assert np.allclose(result.deflection, reference.deflection)
+
+
+def test_array_stiffness_at_other_entry_points():
+    # solvers for constant EI reject a varying one, checks without stiffness still work
+    p = PointLoad(5, 20, True)
+    elements = (Reaction(0, 'h', 'A'), Reaction(10, 'r', 'B'), p)
+    b = Beam(10, E=E, I=np.array([0.02, 0.01, 0.02]))
+    mc = MonteCarlo(b, elements, moment_capacity=100)
+    mc.random(p, 'load', Distribution('uniform', 20, 20))
+    assert mc.EI is None and np.isclose(mc.demands(np.array([[20.0]]))['moment'][0], 50)
+    entry_points = (lambda: MonteCarlo(b, elements, deflection_limit=0.01),
+                    lambda: LayoutOptimizer(b, elements),
+                    lambda: BeamModel.from_beam(b, elements),
+                    lambda: pdelta_solve(b, elements, axial=10),
+                    lambda: buckling_load(b, elements),
+                    lambda: foundation_solve(b, elements, modulus=1000),
+                    lambda: modal_analysis(b, elements, mass=100))
+    for call in entry_points:
+        with pytest.raises(ValueError, match='constant'):
+            call()
@@ -0,0 +1,44 @@
+import numpy as np
+
+from beamframe.beam import UDL, Beam, PointLoad, Reaction
+from beamframe.optimize import LayoutOptimizer
+
+
+def central_difference(opt, theta, key, h=1e-6):
+    columns = []
+    for k in range(len(theta)):
+        up, down = theta.copy(), theta.copy()
+        up[k] += h
+        down[k] -= h
+        columns.append((opt.gradients(up)[key][0] - opt.gradients(down)[key][0])/(2*h))
+    return np.stack(columns, axis=-1)
+
+
+def test_gradients_match_finite_differences():
+    ra, rb = Reaction(0.5, 'h', 'A'), Reaction(8.3, 'r', 'B')
+    p = PointLoad(3.1, 10, inverted=True, inclination=60)
+    u = UDL(1.2, 4, 2.7)
+    opt = LayoutOptimizer(Beam(10, E=200e6, I=1e-4), (ra, rb, p, u))
+    for (obj, attr) in ((rb, 'pos'), (p, 'pos'), (p, 'load'), (u, 'start'), (u, 'loadpm')):
+        opt.vary(obj, attr, -100, 100)
+    theta = opt.initial()
+    grads = opt.gradients(theta)
+    for key in ('reactions', 'peak_moment', 'peak_deflection'):
+        assert np.allclose(grads[key][1], central_difference(opt, theta, key), rtol=1e-4, atol=1e-8)
+
+
+def test_optimal_overhangs_of_uniformly_loaded_beam():
+    L, w = 10, 1
+    ra, rb = Reaction(1, 'h', 'A'), Reaction(9.5, 'r', 'B')
+    opt = LayoutOptimizer(Beam(L, E=200e6, I=1e-4), (ra, rb, UDL(0, w, L)))
+    opt.vary(ra, 'pos', 0, L/2)
+    opt.vary(rb, 'pos', L/2, L)
+
+    result = opt.optimize('moment')
+    a = (np.sqrt(2) - 1)/2*L  # hogging at supports equals sagging at midspan
+    assert np.allclose(result.theta, [a, L - a], atol=1e-4)
+    assert np.isclose(result.peak, w*a**2/2, rtol=1e-6)
+    assert result.nfev < 50
+
+    opt.apply(result.theta)
+    assert np.isclose(ra.pos, a, atol=1e-4)
@@ -0,0 +1,45 @@
+import itertools
+
+import numpy as np
+
+from beamframe.beam import UDL, Beam, Hinge, PointLoad, Reaction
+from beamframe.patterns import pattern_envelope
+from beamframe.superposition import BeamArrays
+
+
+def test_envelope_matches_all_patterns():
+    b = Beam(14, ndivs=1501)
+    elements = (Reaction(0, 'f', 'A'), Hinge(6, 'r'), Reaction(10, 'r', 'B'), UDL(0, 1, 14), PointLoad(3, 4, True))
+    live = [2, 3, 4]
+    env = pattern_envelope(b, elements, live)
+    assert env.segments.tolist() == [[0, 6], [6, 10], [10, 14]]
+
+    # brute force: every subset of segments loaded
+    patterns = np.array(list(itertools.product([0, 1], repeat=len(env.segments))))
+    w = -patterns*np.asarray(live)
+    dead = BeamArrays.from_elements(b.length, elements)
+    arrays = BeamArrays(b.length, dead.support_types, dead.support_pos[0], dead.hinge_sides, dead.hinge_pos[0],
+                        point_pos=dead.point_pos[0], point_fy=dead.point_fy[0],
+                        dist_start=np.concatenate([dead.dist_start[0], env.segments[:, 0]]),
+                        dist_end=np.concatenate([dead.dist_end[0], env.segments[:, 1]]),
+                        dist_wstart=np.hstack([np.repeat(dead.dist_wstart, len(w), axis=0), w]))
+    _, ry, mom = arrays.solve_reactions()
+    M = arrays.moment_at(env.x, ry, mom)
+    V = arrays.shear_at(env.x, ry)
+    assert np.allclose(env.envelopes['max_moment'], M.max(axis=0))
+    assert np.allclose(env.envelopes['min_moment'], M.min(axis=0))
+    assert np.allclose(env.envelopes['max_shear'], V.max(axis=0))
+    assert np.allclose(env.envelopes['min_shear'], V.min(axis=0))
+
+    # governing pattern reproduces the envelope
+    rows = (patterns[:, None, :] == env.patterns['min_moment'][None]).all(axis=2)
+    assert np.allclose(M.T[rows.T], env.envelopes['min_moment'])
+
+
+def test_overhang_unloaded_for_midspan_sagging():
+    b = Beam(12)
+    env = pattern_envelope(b, (Reaction(0, 'h', 'A'), Reaction(8, 'r', 'B')), live=1, x=np.linspace(0, 12, 1201))
+    assert env.governing('max_moment', 4) == (0,)
+    assert env.governing('min_moment', 8) == (1,)
+    assert np.isclose(env.envelopes['min_moment'].min(), -8)
+    assert np.isclose(env.envelopes['max_moment'].max(), 8)
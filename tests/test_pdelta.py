@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from beamframe.beam import UDL, Beam, PointLoad, Reaction
+from beamframe.pdelta import amplification, buckling_load, pdelta_solve
+
+E, I, L = 200e6, 2e-5, 6.0
+EI = E*I
+EULER = np.pi**2*EI/L**2
+
+
+def test_second_order_matches_beam_column_solutions():
+    # pinned beam, uniform load and axial compression P: M_max = q/k^2 (sec u - 1), u = kL/2
+    q, P = 2.0, 150.0
+    b = Beam(L, ndivs=1001, E=E, I=I)
+    elements = (Reaction(0, 'h', 'A'), Reaction(L, 'r', 'B'), UDL(0, q, L), PointLoad(L, P, inclination=180))
+    result = pdelta_solve(b, elements)
+    k = np.sqrt(P/EI)
+    u = k*L/2
+    assert np.isclose(result.moment.max(), q/k**2*(1/np.cos(u) - 1), rtol=1e-5)
+    assert np.isclose(result.deflection.min(), -5*q*L**4/(384*EI)*12*(2/np.cos(u) - 2 - u**2)/(5*u**4), rtol=1e-5)
+    assert np.isclose(elements[0].rx_val, P) and np.isclose(elements[1].ry_val, q*L/2, rtol=1e-6)
+    assert np.isclose(result.load_factor, EULER/P, rtol=1e-6)
+    assert np.allclose(result.axial[(b.xbeam > 0) & (b.xbeam < L)], P)
+    assert b.moment_values is result.moment
+
+    # cantilever with axial and lateral tip loads: base moment H tan(kL)/k
+    H, P = 10.0, 100.0
+    elements = (Reaction(0, 'f', 'A'), PointLoad(L, P, inclination=180), PointLoad(L, H, True))
+    pdelta_solve(Beam(L, E=E, I=I), elements)
+    k = np.sqrt(P/EI)
+    assert np.isclose(elements[0].mom_val, H*np.tan(k*L)/k, rtol=1e-6)
+
+
+def test_buckling_loads():
+    cases = {('h', 'r'): 1.0, ('f', None): 0.25, ('f', 'h'): 2.0457, ('f', 'f'): 4.0}
+    for (left, right), factor in cases.items():
+        supports = [Reaction(0, left, 'A')] + ([Reaction(L, right, 'B')] if right else [])
+        result = buckling_load(Beam(L, E=E, I=I), supports, k=2)
+        assert np.isclose(result.loads[0], factor*EULER, rtol=1e-4)
+        assert result.loads[1] > result.loads[0] and result.shapes.shape == (2, len(result.x))
+
+    with pytest.raises(ValueError, match='critical load'):
+        pdelta_solve(Beam(L, E=E, I=I), (Reaction(0, 'h', 'A'), Reaction(L, 'r', 'B'),
+                                         PointLoad(L, 1.1*EULER, inclination=180)))
+    assert np.allclose(amplification([0, 0.5, 2], 1), [1, 2, np.inf])
@@ -0,0 +1,44 @@
+from statistics import NormalDist
+
+import numpy as np
+
+from beamframe.beam import UDL, Beam, PointLoad, Reaction
+from beamframe.reliability import Distribution, MonteCarlo
+
+
+def model(**kwargs):
+    b = Beam(10, E=200e6, I=8e-5)
+    p = PointLoad(5, 50, inverted=True)
+    mc = MonteCarlo(b, (Reaction(0, 'h', 'A'), Reaction(10, 'r', 'B'), p, UDL(0, 2, 10)), **kwargs)
+    return mc, p
+
+
+def test_failure_probability_matches_exact_value():
+    mc, p = model(moment_capacity=200)
+    mc.random(p, 'load', Distribution('normal', 60, 10))
+    # M = P L/4 + w L^2/8 at midspan, failure when P > 70
+    exact = 1 - NormalDist(60, 10).cdf(70)
+    result = mc.run(200_000, batch=50_000, seed=7)
+    low, high = result.interval
+    assert result.samples == 200_000 and not result.converged
+    assert low < exact < high
+    assert np.isclose(result.beta, -NormalDist().inv_cdf(result.probability))
+
+    # sampled peaks agree with a per sample check
+    values = mc.sample(np.random.default_rng(0), 5)
+    assert np.allclose(mc.demands(values)['moment'], values[:, 0]*10/4 + 2*100/8)
+
+
+def test_reproducible_across_workers_and_early_stopping():
+    mc, p = model(moment_capacity=230, deflection_limit=0.05, ndivs=21)
+    mc.random(p, 'load', Distribution('gumbel', 50, 8, low=0))
+    mc.random(p, 'pos', Distribution('uniform', 0, 10))
+    serial = mc.run(30_000, batch=5_000, seed=3)
+    pooled = mc.run(30_000, batch=5_000, seed=3, workers=2)
+    assert serial.batches == pooled.batches
+
+    stopped = mc.run(10**7, batch=5_000, seed=3, rel_error=0.2)
+    assert stopped.converged and stopped.samples < 10**7
+    low, high = stopped.interval
+    assert (high - low)/2 <= 0.2*stopped.probability
+    assert stopped.batches == serial.batches[:len(stopped.batches)]
@@ -0,0 +1,47 @@
+import contextlib
+import io
+
+import numpy as np
+
+from beamframe.beam import *
+from beamframe.section import *
+
+
+def test_rectangle_properties():
+    r = Rectangle(0.2, 0.5)
+    assert np.isclose(r.I, 0.2*0.5**3/12)
+    assert np.isclose(r.Z_top, 0.2*0.5**2/6)
+    assert np.isclose(r.Q(0.25), 0.2*0.5**2/8)
+    y, bending, shear = r.fibres(11)
+    assert np.isclose(shear.max(), 1.5/r.area)
+    assert np.isclose(bending[-1], -1/r.Z_top)
+
+
+def test_built_up_sections():
+    i = ISection(0.4, 0.2, 0.02, 0.01)
+    expected = 0.2*0.4**3/12 - 0.19*0.36**3/12
+    assert np.isclose(i.I, expected)
+    box = BoxSection(0.2, 0.4, 0.02, 0.005)
+    assert np.isclose(box.I, 0.2*0.4**3/12 - 0.19*0.36**3/12)
+    t = TSection(0.3, 0.2, 0.05, 0.02)
+    assert t.centroid > 0.15
+
+    # two identical rectangles stacked behave as one deep rectangle
+    stacked = CompositeSection([(Rectangle(0.1, 0.2), 0, 1), (Rectangle(0.1, 0.2), 0.2, 1)])
+    assert np.isclose(stacked.I, Rectangle(0.1, 0.4).I)
+
+
+def test_stress_field_chunks():
+    b = Beam(6)
+    with contextlib.redirect_stdout(io.StringIO()):
+        b.fast_solve((Reaction(0, 'h', 'A'), Reaction(6, 'r', 'B'), UDL(0, 10, 6)))
+    section = ISection(0.4, 0.2, 0.02, 0.01)
+    sigma, tau = stress_field(b, section, nfibres=21)
+    assert sigma.shape == (b.ndivs, 21)
+    # top fibre at midspan is in compression: M/Z
+    assert np.isclose(sigma[:, -1].min(), -b.moment_values.max()/section.Z_top)
+
+    parts = list(iter_stress_field(b, section, nfibres=21, chunk=128, dtype=np.float32))
+    assert parts[0][1].dtype == np.float32
+    assert np.allclose(np.concatenate([p[1] for p in parts]), sigma, rtol=1e-5)
+    assert np.allclose(np.concatenate([p[2] for p in parts]), tau, rtol=1e-5)
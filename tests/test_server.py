@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from beamframe.server import Overloaded, SolveServer, solve_batch, solve_remote
+
+
+def model(load_pos, load=10.0):
+    return {'length': 10, 'diagram': 3, 'elements': [
+        {'element': 'Reaction', 'pos': 0, 'type': 'h', 'pos_sym': 'A'},
+        {'element': 'Reaction', 'pos': 10, 'type': 'r', 'pos_sym': 'B'},
+        {'element': 'PointLoad', 'pos': load_pos, 'load': load, 'inverted': True}]}
+
+
+def test_solve_batch_mixes_layouts_and_errors():
+    cantilever = {'length': 4, 'elements': [
+        {'element': 'Reaction', 'pos': 0, 'type': 'f', 'pos_sym': 'A'},
+        {'element': 'UDL', 'start': 0, 'loadpm': 2, 'span': 4}]}
+    results = solve_batch([model(2.5), cantilever, {'length': 3}, model(5), {'length': 1, 'elements': [{'element': 'Foo'}]}])
+    assert results[0]['reactions'] == pytest.approx({'R_A_x': 0, 'R_A_y': 7.5, 'R_B_y': 2.5})
+    assert results[0]['moment'] == pytest.approx([0, 12.5, 0])
+    assert results[1]['reactions']['M_A'] == pytest.approx(16)
+    assert 'error' in results[2] and 'error' in results[4]
+    assert results[3]['extrema']['max_moment'] == pytest.approx(25)
+
+
+def test_bad_models_only_fail_themselves():
+    def with_element(spec):
+        m = model(5)
+        m['elements'].append(spec)
+        return m
+    pins = model(5)
+    pins['elements'][1]['type'] = 'h'
+    results = solve_batch([model(2.5), with_element({'element': 'Reaction', 'pos': 4, 'type': 5, 'pos_sym': 'C'}),
+                           with_element({'element': 'UVL', 'start': 1, 'startload': 1, 'span': 0, 'endload': 2}),
+                           pins, model(5)])
+    assert results[0]['reactions']['R_A_y'] == pytest.approx(7.5)
+    assert results[1]['error'].startswith('Invalid arguments for Reaction')
+    assert results[2]['error'].startswith('Invalid arguments for UVL')
+    assert 'indeterminate to degree 1' in results[3]['error']
+    assert results[4]['reactions']['R_B_y'] == pytest.approx(5)
+
+
+def test_server_batches_requests_on_localhost():
+    async def run():
+        async with SolveServer(port=0, workers=1, max_delay=0.01) as server:
+            positions = [1 + 0.01*k for k in range(64)]
+            results = await asyncio.gather(*[asyncio.to_thread(solve_remote, model(a), port=server.port)
+                                             for a in positions])
+            listed = await asyncio.to_thread(solve_remote, [model(a) for a in positions], port=server.port)
+            return results, listed, server.stats()
+
+    results, listed, stats = asyncio.run(run())
+    for a, result, other in zip([1 + 0.01*k for k in range(64)], results, listed):
+        assert result['reactions']['R_B_y'] == pytest.approx(a)
+        assert other == result
+    assert stats['latency']['request']['count'] == 65
+    assert max(int(size) for size in stats['batch_sizes']) > 1
+
+
+def test_full_queue_is_rejected():
+    async def run():
+        async with SolveServer(port=0, workers=0, max_queue=4) as server:
+            outcomes = await asyncio.gather(*[server.submit(model(5)) for _ in range(20)],
+                                            return_exceptions=True)
+            with pytest.raises(Overloaded):
+                await asyncio.to_thread(solve_remote, [model(5)]*10, port=server.port)
+            return outcomes, server.rejected
+
+    outcomes, rejected = asyncio.run(run())
+    assert sum(isinstance(o, Overloaded) for o in outcomes) == 16
+    assert rejected == 26
+    assert all(o['extrema']['max_moment'] == pytest.approx(25) for o in outcomes if isinstance(o, dict))
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from beamframe.beam import Beam, Hinge, PointLoad, Reaction
+from beamframe.stability import Classification, classify, classify_arrays
+from beamframe.superposition import BeamArrays
+
+
+def test_classification_by_rank():
+    load = PointLoad(4, 10, True)
+    assert classify(10, [Reaction(0, 'h', 'A'), Reaction(10, 'r', 'B'), load]) == \
+        Classification('determinate', 0, 0)
+    assert classify(10, [Reaction(0, 'f', 'A'), Hinge(5), Reaction(10, 'r', 'B'), load]).kind == 'determinate'
+    assert classify(10, [Reaction(0, 'f', 'A'), Reaction(10, 'f', 'B'), load]) == \
+        Classification('indeterminate', 3, 0)
+    # both pins restrain the beam horizontally: one redundant unless horizontal equilibrium is ignored
+    pins = [Reaction(0, 'h', 'A'), Reaction(10, 'h', 'B'), load]
+    assert classify(10, pins) == Classification('indeterminate', 1, 0)
+    assert classify(10, pins, horizontal=False).kind == 'determinate'
+    # rollers cannot resist an inclined load, a hinge between rollers folds, coincident rollers spin
+    assert classify(10, [Reaction(0, 'r', 'A'), Reaction(10, 'r', 'B'), PointLoad(4, 10, inclination=30)]) == \
+        Classification('mechanism', 0, 1)
+    assert classify(10, [Reaction(0, 'r', 'A'), Hinge(5), Reaction(10, 'r', 'B'), load]).freedom == 1
+    assert classify(10, [Reaction(5, 'r', 'A'), Reaction(5, 'r', 'B'), load]) == Classification('mechanism', 1, 1)
+
+    # a batch with the second support sliding onto the first
+    arrays = BeamArrays(10, ('h', 'r'), [[0, 10], [0, 0], [0, 3]], point_pos=[[4]], point_fy=[[-10]])
+    result = classify_arrays(arrays, horizontal=False)
+    assert list(result['kind']) == ['determinate', 'mechanism', 'determinate']
+
+
+def test_fast_solve_rejects_before_solving():
+    with pytest.raises(ValueError, match='indeterminate to degree 1'):
+        Beam(10).fast_solve([Reaction(0, 'h', 'A'), Reaction(10, 'h', 'B'), PointLoad(4, 10, True)])
+    with pytest.raises(ValueError, match='unstable'):
+        Beam(10).fast_solve([Reaction(0, 'r', 'A'), Reaction(10, 'r', 'B'), PointLoad(4, 10, inclination=30)])
+    b = Beam(10)
+    ra, rb = Reaction(0, 'h', 'A'), Reaction(10, 'r', 'B')
+    b.fast_solve([ra, rb, PointLoad(4, 10, True)])
+    assert np.isclose(ra.ry_val, 6) and np.isclose(rb.ry_val, 4)
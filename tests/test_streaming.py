@@ -0,0 +1,42 @@
+import contextlib
+import io
+import tracemalloc
+
+import numpy as np
+
+from beamframe.beam import UDL, UVL, Beam, PointLoad, PointMoment, Reaction
+from beamframe.streaming import diagram_to_memmap, iter_diagram
+
+
+def elements():
+    return [Reaction(0, 'h', 'A'), Reaction(10, 'r', 'B'), UDL(0, 5, 10), PointLoad(3.005, 10, True),
+            UVL(5, 2, 2, 6), PointMoment(7.005, 20)]
+
+
+def test_chunks_match_fast_solve():
+    # stations 0, 0.01, ..., 10 are the non negative part of this beam's xbeam
+    b = Beam(10, ndivs=1101)
+    with contextlib.redirect_stdout(io.StringIO()):
+        b.fast_solve(elements())
+    chunks = list(iter_diagram(b, elements(), ndivs=1001, chunk=128, workers=2))
+    assert [len(x) for (x, _, _) in chunks][:2] == [128, 128]
+    x, V, M = (np.concatenate(parts) for parts in zip(*chunks))
+    assert np.allclose(x, b.xbeam[b.beam_0:])
+    assert np.allclose(V, b.shear_values[b.beam_0:])
+    assert np.allclose(M, b.moment_values[b.beam_0:])
+
+
+def test_memory_is_bounded_by_chunk(tmp_path):
+    b = Beam(10)
+    tracemalloc.start()
+    for _ in iter_diagram(b, elements(), ndivs=10**6, chunk=10**4):
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert peak < 2*10**6  # values of all stations would need 24 MB
+
+    out = diagram_to_memmap(tmp_path/'diagram.npy', b, elements(), ndivs=10**5, chunk=10**4, workers=2)
+    x, V, M = next(iter_diagram(b, elements(), ndivs=10**5))
+    stored = np.load(tmp_path/'diagram.npy', mmap_mode='r')
+    assert stored.shape == out.shape == (10**5, 3)
+    assert np.array_equal(stored[:, 2], M) and stored[-1, 0] == 10
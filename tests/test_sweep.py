@@ -0,0 +1,55 @@
+import contextlib
+import io
+
+import numpy as np
+
+from beamframe.beam import *
+from beamframe.sweep import ParameterSweep
+
+
+def solve(length, elements):
+    b = Beam(length, ndivs=20001)
+    with contextlib.redirect_stdout(io.StringIO()):
+        b.fast_solve(elements)
+    return b
+
+
+def test_sweep_matches_fast_solve():
+    b = Beam(10)
+    ra, rb = Reaction(0, 'h', 'A'), Reaction(8, 'r', 'B')
+    p = PointLoad(5, 10, inverted=True)
+    udl = UDL(0, 4, 6)
+    sweep = ParameterSweep(b, (ra, rb, p, udl))
+    sweep.vary(rb, 'pos', [6, 8, 10])
+    sweep.vary(p, 'pos', [1, 9.5])
+    sweep.vary(udl, 'loadpm', [2, 4])
+    result = sweep.run(chunk=5)
+
+    assert result.shape == (3, 2, 2)
+    assert len(result) == 12
+    assert result.columns[:3] == ('B.pos', 'PointLoad0.pos', 'UDL0.loadpm')
+
+    for row in range(len(result)):
+        rb_pos, p_pos, w = result.data[row, :3]
+        ref = solve(10, (Reaction(0, 'h', 'A'), Reaction(rb_pos, 'r', 'B'),
+                         PointLoad(p_pos, 10, inverted=True), UDL(0, w, 6)))
+        assert np.isclose(result['R_A_y'][row], ref.reactions_list[0].ry_val)
+        assert np.isclose(result['R_B_y'][row], ref.reactions_list[1].ry_val)
+        assert np.isclose(result['max_moment'][row], ref.moment_values.max(), atol=1e-2)
+        assert np.isclose(result['min_moment'][row], ref.moment_values.min(), atol=1e-2)
+        assert np.isclose(result['min_shear'][row], ref.shear_values.min(), atol=1e-2)
+
+
+def test_zipped_sweep_over_length():
+    b = Beam(5)
+    ra = Reaction(0, 'f', 'A')
+    p = PointLoad(5, 2, inverted=True)
+    sweep = ParameterSweep(b, (ra, p))
+    lengths = np.linspace(1, 5, 50)
+    sweep.vary(b, 'length', lengths)
+    sweep.vary(p, 'pos', lengths)
+    result = sweep.run(grid=False)
+    # cantilever with tip load
+    assert np.allclose(result['M_A'], 2*lengths)
+    assert np.allclose(result.grid('min_moment'), -2*lengths)
+    assert result.to_records()['beam.length'][0] == 1
@@ -0,0 +1,56 @@
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from beamframe.beam import UDL, UVL, Beam, PointLoad, PointMoment, Reaction
+from beamframe.superposition import BeamArrays
+from beamframe.vector import diagram_extrema, diagram_path, diagram_segments, export_diagrams
+
+
+def solved():
+    elements = (Reaction(0, 'h', 'A'), Reaction(10, 'r', 'B'), PointLoad(3, 20, True), UVL(4, 0, 6, 12),
+                UDL(1, 5, 4), PointMoment(2, 15))
+    Beam(10).fast_solve(elements)
+    return elements
+
+
+def test_bezier_segments_are_exact():
+    elements = solved()
+    arrays = BeamArrays.from_elements(10, elements)
+    ry = np.array([[r.ry_val for r in elements[:2]]])
+    mom = np.zeros_like(ry)
+    for which in ('sfd', 'bmd'):
+        edges, ctrl = diagram_segments(10, elements, which)
+        t = np.linspace(0, 1, 11)[1:-1]
+        x = edges[:-1, None] + np.diff(edges)[:, None]*t
+        bezier = (ctrl[:, :1]*(1-t)**3 + 3*ctrl[:, 1:2]*t*(1-t)**2 + 3*ctrl[:, 2:3]*t**2*(1-t) + ctrl[:, 3:]*t**3)
+        exact = arrays.shear_at(x.ravel(), ry) if which == 'sfd' else arrays.moment_at(x.ravel(), ry, mom)
+        assert np.allclose(bezier.ravel(), exact[0], rtol=0, atol=1e-10)
+
+    # jump of 20 kN at the point load is a vertical line of the outline
+    path = diagram_path(10, elements, 'sfd')
+    jumps = [(a[-1], b[-1]) for a, b in zip(path, path[1:]) if b[0] == 'L' and a[-2] == b[-2] == 3]
+    assert len(jumps) == 1 and np.isclose(jumps[0][0] - jumps[0][1], 20)
+    assert len(path) < 3*len(arrays.breakpoints()[0])
+
+    # peak moment between samples: where the exact shear crosses zero
+    (x, peak), _ = diagram_extrema(*diagram_segments(10, elements, 'bmd'))
+    assert np.isclose(arrays.shear_at([x], ry)[0, 0], 0, atol=1e-9)
+    assert peak >= arrays.moment_at(np.linspace(0, 10, 10001), ry, mom).max()
+
+
+def test_export_svg_and_pdf(tmp_path):
+    elements = solved()
+    export_diagrams(10, elements, tmp_path / 'd.svg')
+    root = ET.parse(tmp_path / 'd.svg').getroot()
+    paths = [p.get('d') for p in root.iter('{http://www.w3.org/2000/svg}path')]
+    assert len(paths) == 6 and any('C' in d for d in paths)
+
+    export_diagrams(10, elements, tmp_path / 'd.pdf', which='bmd')
+    pdf = (tmp_path / 'd.pdf').read_bytes()
+    assert pdf.startswith(b'%PDF') and b' c\n' in pdf
+    xref = int(pdf.rsplit(b'startxref\n', 1)[1].split()[0])
+    assert pdf[xref:].startswith(b'xref')
+    offsets = [int(line.split()[0]) for line in pdf[xref:].split(b'\n')[3:8]]
+    assert all(pdf[o:].startswith(b'%d 0 obj' % i) for i, o in enumerate(offsets, 1))
+    assert len(pdf) < 3000